@@ -11,17 +11,72 @@ GEMINI_API_KEY    = os.getenv("GEMINI_API_KEY")
 DEEPSEEK_API_KEY  = os.getenv("DEEPSEEK_API_KEY")
 AI_PROVIDER       = os.getenv("AI_PROVIDER", "gemini")
 
+# Endpoints dos provedores de IA (apontar para src.sim.llm_server em testes offline)
+DEEPSEEK_BASE_URL   = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")   # ex: http://127.0.0.1:8089
+
+# Sites raspados (apontar para src.sim.sites no teste de carga)
+DROPPING_ODDS_BASE_URL = os.getenv("DROPPING_ODDS_BASE_URL", "https://dropping-odds.com").rstrip("/")
+EXCAPPER_BASE_URL      = os.getenv("EXCAPPER_BASE_URL", "https://www.excapper.com").rstrip("/") + "/"
+
+# ── Telegram (notificador assíncrono) ──────────────────────────────────────
+TELEGRAM_API_URL          = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_GLOBAL_RATE      = 30.0    # Mensagens/s no total (limite do Bot API)
+TELEGRAM_CHAT_RATE        = 1.0     # Mensagens/s por chat
+TELEGRAM_CHAT_PER_MIN     = 20      # Mensagens/min por chat (grupos/canais)
+TELEGRAM_MAX_RETRIES      = 5       # Tentativas extras em 429/5xx/erro de rede
+TELEGRAM_QUEUE_MAX        = 500     # Fila de saída (acima disso descarta)
+TELEGRAM_WORKERS          = 4       # Envios simultâneos
+ALERT_COALESCE_WINDOW_SEC = 1200    # Janela para agrupar alertas do mesmo jogo
+ALERT_COALESCE_MODE       = "edit"  # "edit" (edita a msg original) ou "reply" (delta em resposta)
+
 # ── Diretórios e Arquivos ──────────────────────────────────────────────────
 BASE_DIR          = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR          = os.path.join(BASE_DIR, "data")
+DATA_DIR          = os.getenv("KAIROS_DATA_DIR") or os.path.join(BASE_DIR, "data")
 SENT_ALERTS_FILE  = os.path.join(DATA_DIR, "sent_alerts.json")
+DB_FILE           = os.path.join(DATA_DIR, "kairos.db")
+MANIPULATION_RULES_FILE = os.path.join(DATA_DIR, "manipulation_rules.json")  # opcional: regras extras (core/rules.py)
+
+# ── Assinaturas (fan-out de alertas) ───────────────────────────────────────
+SUBSCRIPTIONS_FILE  = os.path.join(DATA_DIR, "subscriptions.json")  # ausente → só TELEGRAM_CHAT_ID
+ALERTS_JSONL_FILE   = os.path.join(DATA_DIR, "alerts.jsonl")        # destino padrão do sink "jsonl"
+WEBHOOK_TIMEOUT_SEC = 10        # Timeout por POST de webhook (3 tentativas)
 
 # ── Gatilhos de Queda de Odds (DroppingOdds) ───────────────────────────────
 DROP_MIN_PCT          = 5.0     # Mínimo para ser listado como alerta
 DROP_STRONG_PCT       = 10.0    # Considerado queda forte
 DROP_ALERT_PCT        = 15.0    # Drop crítico (vermelho)
+DROP_HISTORY_WINDOW   = 5       # Passos da janela recente (velocidade/aceleração do histórico)
 AI_TRIGGER_DROP       = 5.5     # Mínimo para enviar para análise da IA
-CYCLE_SLEEP_SEC       = 90      # Pausa entre ciclos de varredura
+AI_BATCH_SIZE         = 6       # Partidas por requisição à IA (1 = sem lote)
+AI_PROMPT_MODE        = os.getenv("AI_PROMPT_MODE", "full")  # "full" ou "compact"
+AI_PROMPT_TOKEN_BUDGET = 1200   # Orçamento de tokens por prompt no modo compacto
+CYCLE_SLEEP_SEC       = 90      # Intervalo entre listagens de jogos ao vivo
+
+# ── Agendador por Urgência (core/scheduler.py) ─────────────────────────────
+SCHED_LIVE_BASE_SEC       = 90     # Intervalo base de um jogo ao vivo "morno"
+SCHED_PRE_BASE_SEC        = 600    # Intervalo base de um jogo pré-live
+SCHED_MIN_INTERVAL_SEC    = 5      # Jogo mais quente: no máx. 1 visita a cada 5s
+SCHED_MAX_INTERVAL_SEC    = 900    # Jogo mais frio: ao menos 1 visita a cada 15 min
+SCHED_VELOCITY_REF        = 0.5    # Pontos % de drop por minuto que dobram a urgência
+SCHED_TIER_WEIGHT         = {"OCEAN": 1.3, "MID": 1.0, "LAKE": 1.0, "YOUTH": 0.7}
+SCHED_PAGE_BUDGET_PER_MIN = int(os.getenv("SCHED_PAGE_BUDGET_PER_MIN", "180"))  # Carregamentos de página/min (todos os jogos)
+SCHED_PAGES_PER_VISIT     = 7      # Evento + 5 abas do DroppingOdds + Excapper
+SCHED_TICK_SEC            = 2.0    # Intervalo máx. entre checagens do agendador
+
+# ── Pré-Score Local (filtro antes da IA) ───────────────────────────────────
+PRESCORE_MODEL_FILE   = os.path.join(DATA_DIR, "prescore_model.json")
+PRESCORE_MIN_SCORE    = 0.20    # Abaixo disso o jogo não vai para a IA
+PRESCORE_TARGET_RECALL = 0.95   # Recall alvo usado no relatório de replay
+
+# ── Pipeline em Estágios (dropping_flow) ───────────────────────────────────
+PIPELINE_QUEUE_MAX       = 50    # Capacidade de cada fila entre estágios (backpressure)
+PIPELINE_DETAIL_WORKERS  = 3     # Páginas de jogo do DroppingOdds em paralelo
+PIPELINE_EXCAPPER_WORKERS = 2    # Páginas do Excapper em paralelo
+PIPELINE_AI_WORKERS      = 2     # Requisições de IA simultâneas
+PIPELINE_AI_BATCH_WAIT   = 3.0   # Espera máx. (s) para completar um lote de IA
+SHARD_VNODES             = 64    # Nós virtuais por worker no anel de hashing (--workers N)
+SHARD_TASK_TIMEOUT_SEC   = 180   # Tempo máx. de um jogo dentro de um worker
 
 # ── Limites Estratégicos (Smart Money / Excapper) ──────────────────────────
 MIN_MATCH_VOLUME_EUR  = 100.0   # Volume mínimo para o jogo existir no radar
@@ -34,6 +89,9 @@ PRESSURE_EXPLOSIVE    = 1.0     # APPM explosivo (perigo iminente)
 PRESSURE_DIVERGENCE   = 0.4     # Limiar para detectar fluxo sem pressão de campo
 LOW_PRESSURE_LIMIT    = 0.2     # "Cesto de Lixo" - sem reação do time
 LATE_GAME_MIN         = 80      # Minutos finais para análise de encerramento
+SOKKERPRO_FIXTURES_FILE   = os.path.join(DATA_DIR, "sokkerpro_fixtures.json")  # times → URL do jogo
+SOKKERPRO_FIXTURE_GRACE_H = 6   # Entrada vale até o fim do dia em que foi resolvida + N horas
+SOKKERPRO_JSON_WAIT_SEC   = 2.0  # Espera pelas respostas JSON do painel antes de cair no DOM
 
 # ── Configuração de Navegação ──────────────────────────────────────────────
 USER_AGENT = (
@@ -43,3 +101,32 @@ USER_AGENT = (
 )
 HEADLESS = True
 VIEWPORT = {"width": 1366, "height": 768}
+
+# Pool de páginas (core/browser_pool.py)
+BROWSER_POOL_PAGES      = 6       # Páginas simultâneas por navegador
+BROWSER_MAX_NAVIGATIONS = 400     # Recicla o contexto após N navegações
+BROWSER_MAX_RSS_MB      = 1500    # Recicla o contexto acima deste RSS (0 = desliga)
+BROWSER_RSS_CHECK_SEC   = 30      # Intervalo entre leituras de RSS (/proc)
+BROWSER_WARM_PAGES      = 2       # Páginas abertas na partida, em paralelo com o carregamento de estado
+EXCAPPER_CACHE_TTL_SEC  = 30      # Fluxo Excapper reaproveitado entre fluxos/visitas
+
+# ── Probabilidades Implícitas (core/implied.py) ────────────────────────────
+IMPLIED_MOVE_MIN    = 0.04   # Deslocamento mínimo de prob. implícita (4 p.p.) para exigir confirmação
+IMPLIED_MATCH_RATIO = 0.25   # A tabela irmã precisa mover ao menos 25% disso, na mesma direção
+OVERROUND_MAX_DEV   = 0.05   # Overround 5 p.p. acima da mediana do ciclo → atípico
+
+# ── Identidade de Jogos entre Fontes (core/identity.py) ───────────────────
+IDENTITY_MIN_SCORE     = 0.60   # Similaridade (Dice de trigramas) mínima para contar como candidato
+IDENTITY_CONFIRM_SCORE = 0.85   # Mínimo para casar dois jogos (gravado direto como vínculo confirmado)
+
+# ── Snapshots Comprimidos (core/snapshot_codec.py) ────────────────────────
+SNAPSHOT_COMPRESS     = os.getenv("SNAPSHOT_COMPRESS", "1") != "0"   # market_data em zlib (0 = JSON texto)
+SNAPSHOT_ZLIB_LEVEL   = 6       # 1 (rápido) a 9 (menor)
+SNAPSHOT_DICT_SIZE    = 32768   # Dicionário compartilhado (zdict): a janela do deflate é de 32 KB
+SNAPSHOT_DICT_SAMPLES = 300     # Snapshots mais recentes usados no treino do dicionário
+
+# ── Observabilidade ────────────────────────────────────────────────────────
+METRICS_HOST = "127.0.0.1"                            # Endpoint só local
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # GET /metrics (0 = desliga)
+PROFILE_CYCLES = 3      # Ciclos perfilados por SIGUSR1 / POST /profile (core/profiler.py)
+PROFILE_TOP_N  = 40     # Linhas por seção nos relatórios de perfil
@@ -0,0 +1,117 @@
+"""
+alert_threads.py — Coalescência de Alertas por Jogo (v1.0)
+
+Quando o mesmo jogo continua caindo entre ciclos, o hash do alerta muda
+(placar / tabela / faixa de drop) e cada mudança virava uma mensagem nova.
+Aqui cada jogo tem uma "thread" por chat:
+  - 1º alerta: sendMessage normal; o message_id é salvo no kairos.db
+  - dentro da janela (ALERT_COALESCE_WINDOW_SEC desde a última atualização):
+      modo "edit"  → editMessageText na mensagem original (texto completo novo)
+      modo "reply" → resposta à mensagem original só com o delta
+  - fora da janela: nova mensagem e nova thread
+Enquanto a 1ª mensagem da thread está na fila (message_id ainda
+desconhecido), os alertas seguintes do mesmo jogo/chat ficam retidos e
+saem como atualização assim que ela é entregue.
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .notifier import TelegramNotifier
+from .storage import KairosDB
+from ..config import ALERT_COALESCE_WINDOW_SEC, ALERT_COALESCE_MODE
+
+
+class AlertThreads:
+    def __init__(
+        self,
+        db: KairosDB,
+        notifier: TelegramNotifier,
+        window_sec: float = ALERT_COALESCE_WINDOW_SEC,
+        mode: str = ALERT_COALESCE_MODE,
+    ):
+        self.db         = db
+        self.notifier   = notifier
+        self.window_sec = window_sec
+        self.mode       = mode
+        # (thread_key, chat_id) com a mensagem inicial na fila → publicações retidas
+        self._pending: Dict[Tuple[str, str], List[tuple]] = {}
+
+    def publish(
+        self,
+        thread_key: str,
+        full_text: str,
+        state: Dict,
+        delta_builder: Callable[[Dict, Dict], str],
+        chat_id: Optional[str] = None,
+        on_sent: Optional[Callable] = None,
+        on_failed: Optional[Callable] = None,
+    ) -> bool:
+        """
+        Enfileira o alerta como mensagem nova, edição ou resposta com delta.
+        `state` é o resumo do alerta atual; `delta_builder(anterior, atual)`
+        gera o texto compacto usado no modo "reply".
+        """
+        chat_id = str(chat_id or self.notifier.default_chat_id)
+        held = self._pending.get((thread_key, chat_id))
+        if held is not None:
+            held.append((thread_key, full_text, state, delta_builder, chat_id, on_sent, on_failed))
+            return True
+        thread  = self.db.get_alert_thread(thread_key, chat_id)
+        now     = time.time()
+
+        if not thread or now - thread["last_update_at"] > self.window_sec:
+            return self._send_new(thread_key, chat_id, full_text, state, on_sent, on_failed)
+
+        def _updated(result):
+            self.db.update_alert_thread(thread_key, chat_id, state, time.time())
+            if on_sent:
+                on_sent(result)
+
+        def _update_failed(error):
+            # Mensagem apagada / antiga demais para editar → recomeça a thread
+            print(f"    [!] [TG] Atualização da thread {thread_key} falhou ({error}). Enviando nova mensagem.")
+            self._send_new(thread_key, chat_id, full_text, state, on_sent, on_failed)
+
+        n = thread["updates"] + 1
+        if self.mode == "reply":
+            text  = delta_builder(thread["last_state"], state)
+            extra = {"reply_parameters": {"message_id": thread["message_id"], "allow_sending_without_reply": True}}
+            return self.notifier.enqueue(
+                text, chat_id=chat_id, extra=extra, on_sent=_updated, on_failed=_update_failed,
+            )
+
+        text = full_text + f"\n♻️ <i>Atualizado {time.strftime('%H:%M:%S')} ({n}ª atualização)</i>"
+        return self.notifier.enqueue(
+            text, chat_id=chat_id, method="editMessageText",
+            extra={"message_id": thread["message_id"]},
+            on_sent=_updated, on_failed=_update_failed,
+        )
+
+    def _send_new(self, thread_key, chat_id, text, state, on_sent, on_failed) -> bool:
+        key = (thread_key, chat_id)
+
+        def _started(result):
+            message_id = (result or {}).get("message_id")
+            if message_id:
+                self.db.start_alert_thread(thread_key, chat_id, message_id, state, time.time())
+            if on_sent:
+                on_sent(result)
+            self._release(key)
+
+        def _failed(error):
+            if on_failed:
+                on_failed(error)
+            self._release(key)
+
+        self._pending[key] = []
+        queued = self.notifier.enqueue(text, chat_id=chat_id, on_sent=_started, on_failed=_failed)
+        if not queued:
+            self._release(key)
+        return queued
+
+    def _release(self, key: Tuple[str, str]):
+        """Mensagem inicial entregue (ou perdida): publica o que ficou retido, na ordem."""
+        for args in self._pending.pop(key, []):
+            if not self.publish(*args) and args[6]:
+                args[6](None)
@@ -2,20 +2,455 @@
 analyzer.py — Módulo de Análise IA do Kairos (v3.1)
 Suporta: Gemini, DeepSeek, Claude (stub)
 Inclui prompt enriquecido com contexto Smart Money, tier de liga e dados cruzados.
+Modo lote: várias partidas em uma única requisição, com cabeçalho de
+instruções compartilhado e resposta em array JSON indexado por partida.
+Modo compacto: omite seções vazias, usa tabelas densas e respeita um
+orçamento de tokens com truncamento por prioridade.
+Provedores são criados sob demanda: o SDK do Gemini (~1s de import) só é
+carregado se o Gemini for de fato usado.
 """
 
-import google.generativeai as genai
 import asyncio
 import json
+import math
+import time
 from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from . import metrics
+from ..config import AI_PROMPT_MODE, AI_PROMPT_TOKEN_BUDGET, DEEPSEEK_BASE_URL, GEMINI_API_ENDPOINT
+
+
+PROMPT_INTRO = (
+    "Você é o KAIROS — sistema de análise de Smart Money, drops de odds e fluxo institucional.\n"
+    "Sua missão é cruzar dados de DroppingOdds (drops de odds) com fluxo de dinheiro (Excapper)\n"
+    "para gerar análises profissionais e acionáveis, detectando movimentos de insiders e sharp bettors.\n\n"
+)
+
+MISSION_LIVE = (
+    "MISSÃO DE ANÁLISE (LIVE):\n"
+    "1. DROPS: Analise os drops de odds nas tabelas do DroppingOdds — são moves de sharp ou mercado natural?\n"
+    "2. FLUXO vs DROP: O fluxo de dinheiro do Excapper confirma os drops detectados? Os dois apontam para a mesma direção?\n"
+    "3. TIMING: O minuto do jogo é crítico? (pressão no 75+, HT, final de set)?\n"
+    "4. CROSS-TABLE: Se drops aparecem em múltiplas tabelas (1X2 + Total) simultaneamente, é sinal mais forte.\n"
+    "5. SMART MONEY: Os sinais de desproporção, pico tardio ou drop HT são convergentes com o drop?\n"
+    "6. VEREDITO: Movimento de 'Sharp Bettor' (insider/sindicato) ou correção natural de mercado?\n"
+)
+
+MISSION_PRE = (
+    "MISSÃO DE ANÁLISE (PRÉ-JOGO):\n"
+    "1. DROPS PRÉ-JOGO: A queda de odd nas tabelas sem jogo iniciado indica insider ou modelo quant?\n"
+    "2. CROSS-TABLE: Múltiplos mercados com drop simultâneo (1X2 + Total + HT) reforçam o sinal.\n"
+    "3. FLUXO EXCAPPER: O dinheiro confirma a direção dos drops? Qual mercado recebe mais volume?\n"
+    "4. CONTEXTO: H2H e médias históricas justificam o movimento?\n"
+    "5. VEREDITO: É movimento de sindicato (Oceano) ou apostador sharp isolado (Piscina)?\n"
+)
+
+# Campos do veredito — compartilhados entre o modo individual e o modo lote
+OUTPUT_FIELDS = (
+    '  "category": "#KAIROS_ANALYSIS",\n'
+    '  "verdict": "SHARP_ACTION / INSTITUTIONAL_FLOW / NOISE / SUSPICIOUS",\n'
+    '  "risk": "Baixo / Médio / Alto",\n'
+    '  "confidence": <número inteiro 1-10>,\n'
+    '  "reasoning": "<análise técnica direta, max 500 chars. Mencione a correlação fluxo×campo e o sinal mais forte>",\n'
+    '  "betting_tip": "<ação exata: ex: BACK OVER 2.5 / LAY Home / BACK Away AH +0.5>",\n'
+    '  "suggested_odd": "<odd mínima aceitável ou \'Live\' se muito volátil>",\n'
+    '  "stake_suggestion": "<percentual da banca ou \'Mínimo\' / \'Normal\' / \'Alto\'>",\n'
+    '  "alert_headline": "<frase de impacto de até 80 chars para cabeçalho do alerta>"\n'
+)
+
+OUTPUT_SCHEMA = (
+    "FORMATO DE SAÍDA (JSON ESTRITO — sem texto fora das chaves):\n"
+    "{\n"
+    f"{OUTPUT_FIELDS}"
+    "}"
+)
+
+BATCH_OUTPUT_SCHEMA = (
+    "FORMATO DE SAÍDA (ARRAY JSON ESTRITO — sem texto fora dos colchetes):\n"
+    "Um objeto por partida, na mesma ordem, identificado pelo campo match_key:\n"
+    "[\n"
+    "{\n"
+    '  "match_key": "<chave exata informada em PARTIDA [..]>",\n'
+    f"{OUTPUT_FIELDS}"
+    "},\n"
+    "...\n"
+    "]"
+)
+
+# ── Prompt Compacto ────────────────────────────────────────────────────────────
+COMPACT_INTRO = (
+    "KAIROS: analista de Smart Money. Cruze drops de odds (DroppingOdds) com fluxo de dinheiro "
+    "(Excapper) e classifique o movimento (insider/sharp vs. mercado natural).\n"
+)
+
+COMPACT_MISSION_LIVE = (
+    "LIVE: drops são sharp ou correção natural? O fluxo confirma a direção? Minuto crítico (HT/75+)? "
+    "Drops em várias tabelas e sinais SM convergentes reforçam.\n"
+)
+
+COMPACT_MISSION_PRE = (
+    "PRÉ-JOGO: drop indica insider ou modelo quant? Várias tabelas reforçam. O fluxo confirma? "
+    "Sindicato (Oceano) ou sharp isolado (Piscina)?\n"
+)
+
+COMPACT_FIELDS = (
+    '"category":"#KAIROS_ANALYSIS","verdict":"SHARP_ACTION|INSTITUTIONAL_FLOW|NOISE|SUSPICIOUS",'
+    '"risk":"Baixo|Médio|Alto","confidence":1-10,"reasoning":"<=500 chars, correlação fluxo×campo e sinal mais forte",'
+    '"betting_tip":"ex: BACK OVER 2.5","suggested_odd":"odd mínima ou Live",'
+    '"stake_suggestion":"Mínimo|Normal|Alto","alert_headline":"<=80 chars"'
+)
+
+COMPACT_SCHEMA = "Responda SOMENTE JSON: {" + COMPACT_FIELDS + "}"
+
+COMPACT_BATCH_SCHEMA = (
+    "Responda SOMENTE um array JSON, um objeto por partida: "
+    '[{"match_key":"<chave de PARTIDA [..]>",' + COMPACT_FIELDS + "}, ...]"
+)
+
+# Abreviações dos sinais de classe do DroppingOdds
+SIGNAL_ABBREV = {
+    "CRITICAL_DROP_RED3": "RED3",
+    "STRONG_DROP_RED2":   "RED2",
+    "PENALTY_EVENT":      "PEN",
+    "RED_CARD_EVENT":     "RC",
+}
+
+
+def _history_at(when, unit: str) -> str:
+    if when is None:
+        return "-"
+    return f"{when}'" if unit == "min" else f"#{when}"
+
+
+def format_drop_history(history: Optional[Dict], compact: bool = False) -> str:
+    """Features do histórico completo de um drop (velocidade, aceleração, maior passo, mudança)."""
+    if not history or history.get("points", 0) < 2:
+        return "-|-|-|-" if compact else ""
+    unit = history.get("unit", "min")
+    step_at = _history_at(history.get("max_step_at"), unit)
+    change_at = _history_at(history.get("change_at"), unit)
+    if compact:
+        return (f"{history['velocity']:.2f}|{history['acceleration']:+.2f}|"
+                f"{history['max_step']:.1f}@{step_at}|{change_at}")
+    return (
+        f" | Vel: {history['velocity']:.2f}%/{unit} (acel {history['acceleration']:+.2f})"
+        f" | Maior passo: {history['max_step']:.1f}% @{step_at} | Mudança: {change_at}"
+    )
+
+
+CHARS_PER_TOKEN = 3.2   # Estimativa conservadora para texto PT com números/símbolos
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa local e barata de tokens (sem tokenizer)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _fit_sections(sections: List[Tuple[int, str, List[str], int]], budget: int) -> str:
+    """
+    Monta as seções respeitando o orçamento de tokens.
+    Cada seção: (prioridade, cabeçalho, linhas, mínimo_de_linhas).
+    1ª passada: cabeçalho + mínimo de linhas de cada seção, por prioridade
+                (menor número primeiro) — seção que não cabe é omitida.
+    2ª passada: completa as tabelas com as linhas restantes, também por prioridade.
+    Linhas cortadas são sempre as do fim (as tabelas vêm ordenadas por relevância).
+    """
+    ordered = sorted(sections, key=lambda x: x[0])
+    kept    = [None] * len(ordered)   # nº de linhas mantidas (None = seção omitida)
+    used    = 0
+
+    for i, (_, header, lines, min_lines) in enumerate(ordered):
+        n = min(min_lines, len(lines))
+        cost = estimate_tokens(header) + 1 + sum(estimate_tokens(l) + 1 for l in lines[:n])
+        if used + cost <= budget:
+            kept[i] = n
+            used += cost
+
+    note_cost = estimate_tokens("(+999 linhas omitidas)") + 1
+    for i, (_, _, lines, _) in enumerate(ordered):
+        if kept[i] is None:
+            continue
+        while kept[i] < len(lines):
+            line_cost = estimate_tokens(lines[kept[i]]) + 1
+            # Reserva espaço para a nota de omissão se ainda sobrarem linhas
+            reserve = note_cost if kept[i] + 1 < len(lines) else 0
+            if used + line_cost + reserve > budget:
+                break
+            kept[i] += 1
+            used += line_cost
+
+    text = ""
+    for (_, header, lines, _), n in zip(ordered, kept):
+        if n is None:
+            continue
+        text += header + "\n" + "".join(l + "\n" for l in lines[:n])
+        if n < len(lines):
+            text += f"(+{len(lines) - n} linhas omitidas)\n"
+    return text
+
+
+# Max. de tokens de saída por partida (o lote escala até o teto do provedor)
+OUTPUT_TOKENS_PER_MATCH = 1024
+OUTPUT_TOKENS_CAP       = 8192
+
+
+def parse_batch_response(raw: str, keys: List[str]) -> Dict[str, str]:
+    """
+    Extrai o array JSON do modo lote e devolve {match_key: json_do_veredito}.
+    Partidas ausentes ou malformadas simplesmente não aparecem no resultado.
+    """
+    start = raw.find("[")
+    end   = raw.rfind("]") + 1
+    if start == -1 or end <= 0:
+        return {}
+    try:
+        items = json.loads(raw[start:end])
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    wanted  = set(keys)
+    results = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        key = str(item.pop("match_key", ""))
+        if key in wanted and "verdict" in item:
+            results[key] = json.dumps(item, ensure_ascii=False)
+    return results
 
 
 class BaseAIProvider(ABC):
     @abstractmethod
-    async def analyze(self, snapshot: dict) -> str:
+    async def _generate(self, prompt: str, max_output_tokens: int = OUTPUT_TOKENS_PER_MATCH) -> str:
+        """Envia o prompt ao modelo e devolve o texto bruto (ou JSON com 'error')."""
         pass
 
+    # "full" (prompt detalhado) ou "compact" (tabelas densas + orçamento de tokens)
+    prompt_mode  = AI_PROMPT_MODE
+    token_budget = AI_PROMPT_TOKEN_BUDGET
+
+    async def _timed_generate(self, prompt: str, kind: str, max_output_tokens: int = OUTPUT_TOKENS_PER_MATCH) -> str:
+        """`_generate` com métricas: latência e resultado (ok / error) por provedor e tipo de chamada."""
+        provider = type(self).__name__.replace("Provider", "").lower()
+        t0 = time.perf_counter()
+        raw = ""
+        try:
+            raw = await self._generate(prompt, max_output_tokens=max_output_tokens)
+            return raw
+        finally:
+            metrics.AI_SECONDS.observe(time.perf_counter() - t0, provider=provider, kind=kind)
+            status = "error" if not raw or raw.lstrip().startswith('{"error"') else "ok"
+            metrics.AI_CALLS.inc(provider=provider, kind=kind, status=status)
+
+    async def analyze(self, snapshot: dict) -> str:
+        return await self._timed_generate(self._prepare_prompt(snapshot), "single")
+
+    async def analyze_batch(self, snapshots: Dict[str, dict]) -> Dict[str, str]:
+        """
+        Analisa várias partidas em uma única requisição.
+        Se o array não puder ser lido (ou faltar alguma partida), cai para
+        a análise individual apenas das partidas pendentes.
+        """
+        if len(snapshots) == 1:
+            key, snap = next(iter(snapshots.items()))
+            return {key: await self.analyze(snap)}
+
+        keys = list(snapshots)
+        prompt = self._prepare_batch_prompt(list(snapshots.items()))
+        max_tokens = min(OUTPUT_TOKENS_CAP, OUTPUT_TOKENS_PER_MATCH * len(keys))
+        raw = await self._timed_generate(prompt, "batch", max_output_tokens=max_tokens)
+
+        results = parse_batch_response(raw, keys)
+        missing = [k for k in keys if k not in results]
+        if missing:
+            print(f"    [!] Lote: {len(missing)}/{len(keys)} partidas sem veredito válido. Fallback individual...")
+            fallback = await asyncio.gather(*(self.analyze(snapshots[k]) for k in missing))
+            results.update(zip(missing, fallback))
+        return results
+
     def _prepare_prompt(self, snapshot: dict) -> str:
+        if self.prompt_mode == "compact":
+            return self._prepare_compact_prompt(snapshot)
+        mission = MISSION_LIVE if snapshot.get("is_live", False) else MISSION_PRE
+        return (
+            PROMPT_INTRO
+            + self._match_context(snapshot)
+            + f"{mission}\n"
+            + OUTPUT_SCHEMA
+        )
+
+    def _prepare_batch_prompt(self, items: List[Tuple[str, dict]]) -> str:
+        """Cabeçalho e formato de saída uma única vez; só o contexto se repete por partida."""
+        statuses = {bool(snap.get("is_live", False)) for _, snap in items}
+
+        if self.prompt_mode == "compact":
+            budget = self._compact_context_budget()
+            return (
+                COMPACT_INTRO
+                + f"LOTE: {len(items)} partidas independentes.\n"
+                + "".join(f"## PARTIDA [{key}]\n" + self._compact_match_context(snap, budget) for key, snap in items)
+                + (COMPACT_MISSION_LIVE if True in statuses else "")
+                + (COMPACT_MISSION_PRE if False in statuses else "")
+                + COMPACT_BATCH_SCHEMA
+            )
+
+        missions = ""
+        if True in statuses:
+            missions += MISSION_LIVE + "\n"
+        if False in statuses:
+            missions += MISSION_PRE + "\n"
+
+        body = ""
+        for key, snap in items:
+            body += f"##### PARTIDA [{key}] #####\n" + self._match_context(snap)
+
+        return (
+            PROMPT_INTRO
+            + f"ANÁLISE EM LOTE: {len(items)} partidas independentes. Avalie cada uma separadamente.\n\n"
+            + body
+            + "Aplique a missão correspondente ao STATUS de cada partida.\n\n"
+            + missions
+            + BATCH_OUTPUT_SCHEMA
+        )
+
+    def _compact_context_budget(self) -> int:
+        """Tokens disponíveis para o contexto da partida após as instruções fixas."""
+        fixed = estimate_tokens(COMPACT_INTRO + COMPACT_MISSION_LIVE + COMPACT_SCHEMA)
+        return max(self.token_budget - fixed, 120)
+
+    def _prepare_compact_prompt(self, snapshot: dict) -> str:
+        mission = COMPACT_MISSION_LIVE if snapshot.get("is_live", False) else COMPACT_MISSION_PRE
+        return (
+            COMPACT_INTRO
+            + self._compact_match_context(snapshot, self._compact_context_budget())
+            + mission
+            + COMPACT_SCHEMA
+        )
+
+    def _compact_match_context(self, snapshot: dict, budget: int) -> str:
+        """
+        Contexto denso da partida. Só entram seções com dados reais; a ordem
+        de prioridade define o que sobrevive ao orçamento:
+          0 partida/status · 1 drops · 2 fluxo principal · 3 Smart Money
+          4 campo live · 5 outros mercados Excapper · 6 anomalias/labels · 7 histórico
+        """
+        is_live = snapshot.get("is_live", False)
+        status  = "LIVE" if is_live else "PRE"
+        sections = []
+
+        sm         = snapshot.get("smart_money_result") or {}
+        sm_tier    = (sm.get("league_profile") or {}).get("tier", "?")
+        league     = snapshot.get("league", "")
+        header     = (
+            f"{snapshot['match_name']} | {status} {snapshot.get('current_minute', 0)}' "
+            f"| placar {snapshot.get('live_score', 'N/A')} | tier {sm_tier}"
+            + (f" | {league}" if league else "")
+        )
+        sections.append((0, header, [], 0))
+
+        # ── Drops (tabela densa, já ordenada por queda) ─────────────────────
+        do_drops = snapshot.get("dropping_odds_drops") or []
+        if do_drops:
+            rows = []
+            for d in do_drops:
+                sig = ",".join(SIGNAL_ABBREV.get(x, x) for x in d.get("signals", []))
+                rows.append(
+                    f"{d.get('table', '?')}|{d.get('selection', '?')}|{d.get('open_odd', 0):.2f}|"
+                    f"{d.get('current_odd', 0):.2f}|{d.get('drop_pct', 0):.1f}|{sig}|"
+                    + format_drop_history(d.get("history"), compact=True)
+                )
+            sections.append((1, "DROPS tabela|sel|abertura|atual|queda%|sinais|vel%/min|acel|maior passo@|mudança", rows, 1))
+        market_flags = snapshot.get("market_flags") or []
+        if market_flags:
+            sections.append((1, "PROB. IMPLÍCITA sinal|tabela|sel|Δp ou overround", [
+                f"{f['flag']}|{f['table']}|{f.get('selection', '-')}|{f.get('move', f.get('value', 0)):+.3f}"
+                for f in market_flags
+            ], 1))
+
+        # ── Fluxo Excapper principal ────────────────────────────────────────
+        pri_flow = snapshot.get("primary_excapper_flow") or []
+        if pri_flow:
+            rows = [
+                f"{e.get('time', '')}|{e.get('score', '')}|{e.get('selection', '')}|"
+                f"{float(e.get('change_eur', 0) or 0):.0f}|{e.get('odds', '')}|{e.get('change_pct', '')}"
+                for e in pri_flow
+            ]
+            sections.append((
+                2, f"FLUXO {snapshot.get('primary_excapper_market', '')}: min|placar|sel|eur|odd|var", rows, 2
+            ))
+        else:
+            sections.append((2, "FLUXO: indisponível", [], 0))
+
+        # ── Smart Money (só sinais/filtros reais) ──────────────────────────
+        sm_rows = [f"{sig.get('label')}: {sig.get('description', '')}" for sig in sm.get("signals", [])]
+        sm_rows += [f"FILTRO: {r}" for r in sm.get("filter_reasons", [])]
+        if sm_rows:
+            sections.append((3, "SMART MONEY", sm_rows, 1))
+
+        # ── Campo live (SokkerPro) ─────────────────────────────────────────
+        sp_live = snapshot.get("sokkerpro_live")
+        if is_live and sp_live:
+            def _pair(key):
+                v = sp_live.get(key, {})
+                return f"{v.get('home', '?')}x{v.get('away', '?')}"
+            strat = snapshot.get("strategic_context") or {}
+            sections.append((4, "CAMPO casa x fora", [
+                f"appm5 {_pair('appm_5m')} | appm10 {_pair('appm_10m')} | "
+                f"ap {_pair('ataques_perigosos')} | posse {_pair('posse')}",
+                f"liquidez {'OCEANO' if strat.get('is_ocean') else 'PISCINA'} | "
+                f"appm_med {strat.get('avg_appm', 0):.2f} | "
+                f"divergencia {'SIM' if strat.get('is_divergence') else 'NAO'}",
+            ], 1))
+
+        # ── Outros mercados Excapper (último movimento de cada) ────────────
+        exc_markets = snapshot.get("excapper_markets") or {}
+        pri_market  = snapshot.get("primary_excapper_market", "")
+        rows = []
+        for mname, mdata in exc_markets.items():
+            flow = mdata.get("flow") or []
+            if mname != pri_market and flow:
+                e = flow[0]
+                rows.append(
+                    f"{mname}|{e.get('selection', '')}|{float(e.get('change_eur', 0) or 0):.0f}|"
+                    f"{e.get('odds', '')}|{e.get('change_pct', '')}"
+                )
+        if rows:
+            sections.append((5, "MERCADOS mercado|sel|eur|odd|var", rows, 1))
+
+        # ── Anomalias e labels (quando não repetem a tabela de drops) ──────
+        if not do_drops:
+            primary = snapshot.get("primary_anomaly") or {}
+            rows = []
+            for anom in snapshot.get("all_anomalies") or ([primary] if primary else []):
+                det = anom.get("details", {})
+                rows.append(
+                    f"{anom.get('market')}|{anom.get('selection')}|{det.get('change_eur', 0)}|"
+                    f"{det.get('odds', '')}|{det.get('change_pct', '')}|{det.get('score', '')}"
+                )
+            if rows:
+                sections.append((6, "ANOMALIAS mercado|sel|eur|odd|var|placar", rows, 1))
+            if primary.get("reason"):
+                sections.append((6, f"RAZÃO: {primary['reason']}", [], 0))
+        labels = [
+            l for l in (snapshot.get("strategic_context") or {}).get("manipulation_labels", [])
+            if not str(l).startswith("DROP_")  # já representados na tabela de drops
+        ]
+        if labels:
+            sections.append((6, "LABELS", labels, 1))
+
+        # ── Histórico pré-live ─────────────────────────────────────────────
+        sp_pre = snapshot.get("sokkerpro_pre")
+        if sp_pre:
+            sections.append((7, (
+                f"HISTÓRICO gols {sp_pre.get('avg_goals', '?')} | cantos {sp_pre.get('avg_corners', '?')}"
+            ), [], 0))
+
+        return _fit_sections(sections, budget)
+
+    def _match_context(self, snapshot: dict) -> str:
         is_live   = snapshot.get("is_live", False)
         status    = "🔴 LIVE" if is_live else "🔵 PRÉ-JOGO"
         score     = snapshot.get("live_score", "N/A")
@@ -53,12 +488,21 @@ class BaseAIProvider(ABC):
                 drop_ctx += (
                     f"  • [{drop.get('table', 'N/A')}] {drop.get('selection', 'N/A')} → "
                     f"Abertura: {drop.get('open_odd', 0):.2f} | Atual: {drop.get('current_odd', 0):.2f} | "
-                    f"Queda: -{drop.get('drop_pct', 0):.1f}% {drop.get('severity', '')}{sig_text}\n"
+                    f"Queda: -{drop.get('drop_pct', 0):.1f}% {drop.get('severity', '')}{sig_text}"
+                    f"{format_drop_history(drop.get('history'))}\n"
                 )
         elif do_context_text:
             drop_ctx = f"CONTEXTO DROPPINGODDS:\n{do_context_text}\n"
         else:
             drop_ctx = ""
+        for flag in snapshot.get("market_flags") or []:
+            if "move" in flag:
+                drop_ctx += (
+                    f"  [!] {flag['flag']}: {flag['table']} {flag['selection']} ganhou "
+                    f"{flag['move'] * 100:.1f} p.p. de prob. implícita, a tabela irmã só {flag['confirm'] * 100:.1f} p.p.\n"
+                )
+            else:
+                drop_ctx += f"  [!] {flag['flag']}: overround de {flag['table']} em {flag['value'] * 100:.1f}%\n"
 
         # ── Fluxo Excapper (fluxo de dinheiro associado) ──────────────────────
         exc_markets = snapshot.get("excapper_markets", {})
@@ -155,51 +599,7 @@ class BaseAIProvider(ABC):
             for lbl in manip_labels:
                 strat_ctx += f"    — {lbl}\n"
 
-        # ── SISTEMA DE PROMPT ───────────────────────────────────────────────
-        # Ajusta instruções conforme o status do jogo
-        has_dropping_data = bool(do_drops)
-        has_excapper_flow = bool(pri_flow)
-
-        if is_live:
-            mission = (
-                "MISSÃO DE ANÁLISE (LIVE):\n"
-                "1. DROPS: Analise os drops de odds nas tabelas do DroppingOdds — são moves de sharp ou mercado natural?\n"
-                "2. FLUXO vs DROP: O fluxo de dinheiro do Excapper confirma os drops detectados? Os dois apontam para a mesma direção?\n"
-                "3. TIMING: O minuto do jogo é crítico? (pressão no 75+, HT, final de set)?\n"
-                "4. CROSS-TABLE: Se drops aparecem em múltiplas tabelas (1X2 + Total) simultaneamente, é sinal mais forte.\n"
-                "5. SMART MONEY: Os sinais de desproporção, pico tardio ou drop HT são convergentes com o drop?\n"
-                "6. VEREDITO: Movimento de 'Sharp Bettor' (insider/sindicato) ou correção natural de mercado?\n"
-            )
-        else:
-            mission = (
-                "MISSÃO DE ANÁLISE (PRÉ-JOGO):\n"
-                "1. DROPS PRÉ-JOGO: A queda de odd nas tabelas sem jogo iniciado indica insider ou modelo quant?\n"
-                "2. CROSS-TABLE: Múltiplos mercados com drop simultâneo (1X2 + Total + HT) reforçam o sinal.\n"
-                "3. FLUXO EXCAPPER: O dinheiro confirma a direção dos drops? Qual mercado recebe mais volume?\n"
-                "4. CONTEXTO: H2H e médias históricas justificam o movimento?\n"
-                "5. VEREDITO: É movimento de sindicato (Oceano) ou apostador sharp isolado (Piscina)?\n"
-            )
-
-        # Instrução de formato — mais campos para enriquecer o alerta
-        output_schema = (
-            "FORMATO DE SAÍDA (JSON ESTRITO — sem texto fora das chaves):\n"
-            "{\n"
-            '  "category": "#KAIROS_ANALYSIS",\n'
-            '  "verdict": "SHARP_ACTION / INSTITUTIONAL_FLOW / NOISE / SUSPICIOUS",\n'
-            '  "risk": "Baixo / Médio / Alto",\n'
-            '  "confidence": <número inteiro 1-10>,\n'
-            '  "reasoning": "<análise técnica direta, max 500 chars. Mencione a correlação fluxo×campo e o sinal mais forte>",\n'
-            '  "betting_tip": "<ação exata: ex: BACK OVER 2.5 / LAY Home / BACK Away AH +0.5>",\n'
-            '  "suggested_odd": "<odd mínima aceitável ou \'Live\' se muito volátil>",\n'
-            '  "stake_suggestion": "<percentual da banca ou \'Mínimo\' / \'Normal\' / \'Alto\'>",\n'
-            '  "alert_headline": "<frase de impacto de até 80 chars para cabeçalho do alerta>"\n'
-            "}"
-        )
-
         return (
-            "Você é o KAIROS — sistema de análise de Smart Money, drops de odds e fluxo institucional.\n"
-            "Sua missão é cruzar dados de DroppingOdds (drops de odds) com fluxo de dinheiro (Excapper)\n"
-            "para gerar análises profissionais e acionáveis, detectando movimentos de insiders e sharp bettors.\n\n"
             f"═══════════════════════════════════════\n"
             f"PARTIDA: {snapshot['match_name']}\n"
             f"STATUS: {status} | Minuto: {match_min}' | Placar: {score}\n"
@@ -211,15 +611,23 @@ class BaseAIProvider(ABC):
             f"{strat_ctx}\n"
             f"{sp_ctx}\n"
             f"{pre_ctx}\n"
-            f"{mission}\n"
-            f"{output_schema}"
         )
 
 
 # ── Gemini ─────────────────────────────────────────────────────────────────────
 class GeminiProvider(BaseAIProvider):
     def __init__(self, api_key):
-        genai.configure(api_key=api_key)
+        import google.generativeai as genai   # Import pesado: só quando o Gemini é usado
+        self.genai = genai
+        if GEMINI_API_ENDPOINT:
+            # Endpoint alternativo (ex: servidor stub local) via transporte REST
+            genai.configure(
+                api_key=api_key,
+                transport="rest",
+                client_options={"api_endpoint": GEMINI_API_ENDPOINT},
+            )
+        else:
+            genai.configure(api_key=api_key)
         self.model_names = [
             "models/gemini-2.0-flash",
             "models/gemini-flash-latest",
@@ -227,18 +635,17 @@ class GeminiProvider(BaseAIProvider):
         ]
         self.current_idx = 0
 
-    async def analyze(self, snapshot: dict) -> str:
-        prompt = self._prepare_prompt(snapshot)
+    async def _generate(self, prompt: str, max_output_tokens: int = OUTPUT_TOKENS_PER_MATCH) -> str:
         for _ in range(len(self.model_names)):
             model_name = self.model_names[self.current_idx]
             try:
                 print(f"    [*] [Gemini] Tentando {model_name}...")
-                model = genai.GenerativeModel(
+                model = self.genai.GenerativeModel(
                     model_name,
                     generation_config={
                         "temperature": 0.3,     # mais determinístico para JSON
                         "top_p": 0.9,
-                        "max_output_tokens": 1024,
+                        "max_output_tokens": max_output_tokens,
                     }
                 )
                 response = await asyncio.to_thread(model.generate_content, prompt)
@@ -254,11 +661,10 @@ class GeminiProvider(BaseAIProvider):
 class DeepSeekProvider(BaseAIProvider):
     def __init__(self, api_key):
         self.api_key  = api_key
-        self.base_url = "https://api.deepseek.com"
+        self.base_url = DEEPSEEK_BASE_URL.rstrip("/")
 
-    async def analyze(self, snapshot: dict) -> str:
+    async def _generate(self, prompt: str, max_output_tokens: int = OUTPUT_TOKENS_PER_MATCH) -> str:
         import aiohttp
-        prompt = self._prepare_prompt(snapshot)
         print("    [*] [DeepSeek] Iniciando análise...")
         try:
             async with aiohttp.ClientSession() as session:
@@ -269,13 +675,14 @@ class DeepSeekProvider(BaseAIProvider):
                             "role": "system",
                             "content": (
                                 "Você é um analista expert em Smart Money e fluxo institucional de apostas esportivas. "
-                                "Responda SOMENTE com o JSON solicitado, sem nenhum texto adicional fora das chaves."
+                                "Responda SOMENTE com o JSON solicitado (objeto ou array), sem nenhum texto adicional."
                             )
                         },
                         {"role": "user", "content": prompt},
                     ],
                     "stream": False,
                     "temperature": 0.2,
+                    "max_tokens": max_output_tokens,
                 }
                 headers = {
                     "Authorization": f"Bearer {self.api_key}",
@@ -300,7 +707,7 @@ class DeepSeekProvider(BaseAIProvider):
 
 # ── Claude (stub) ──────────────────────────────────────────────────────────────
 class ClaudeProvider(BaseAIProvider):
-    async def analyze(self, snapshot: dict) -> str:
+    async def _generate(self, prompt: str, max_output_tokens: int = OUTPUT_TOKENS_PER_MATCH) -> str:
         return json.dumps({
             "category": "#KAIROS_ANALYSIS",
             "verdict": "NOISE",
@@ -315,19 +722,44 @@ class ClaudeProvider(BaseAIProvider):
 
 
 # ── KairosAnalyzer (interface pública) ─────────────────────────────────────────
+PROVIDER_FACTORIES = {
+    "gemini":   GeminiProvider,
+    "deepseek": DeepSeekProvider,
+    "claude":   lambda api_key: ClaudeProvider(),
+}
+
+
 class KairosAnalyzer:
     def __init__(self, api_key, provider_type="gemini"):
-        self.providers = {
-            "gemini":   GeminiProvider(api_key),
-            "deepseek": DeepSeekProvider(api_key),
-            "claude":   ClaudeProvider(),
-        }
-        self.provider = self.providers.get(provider_type, self.providers["gemini"])
+        self.api_key = api_key
+        self.provider_type = provider_type if provider_type in PROVIDER_FACTORIES else "gemini"
+        self.providers: Dict[str, BaseAIProvider] = {}   # Criados no primeiro uso
+        self._keys: Dict[str, str] = {}
         print(f"[*] Analisador iniciado com provedor: {provider_type.upper()}")
 
+    def get_provider(self, name: str) -> BaseAIProvider:
+        provider = self.providers.get(name)
+        if provider is None:
+            provider = PROVIDER_FACTORIES[name](self._keys.get(name, self.api_key))
+            self.providers[name] = provider
+        return provider
+
+    @property
+    def provider(self) -> BaseAIProvider:
+        return self.get_provider(self.provider_type)
+
+    def load(self) -> BaseAIProvider:
+        """Cria o provedor ativo agora (ex: numa thread durante a partida, fora do loop)."""
+        return self.provider
+
     def set_deepseek_key(self, key):
+        self._keys["deepseek"] = key
         if "deepseek" in self.providers:
             self.providers["deepseek"].api_key = key
 
     async def analyze_cross_market(self, snapshot: dict) -> str:
         return await self.provider.analyze(snapshot)
+
+    async def analyze_batch(self, snapshots: Dict[str, dict]) -> Dict[str, str]:
+        """Modo lote: {match_key: snapshot} → {match_key: resposta bruta da IA}."""
+        return await self.provider.analyze_batch(snapshots)
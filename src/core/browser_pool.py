@@ -0,0 +1,273 @@
+"""
+browser_pool.py — Pool de Páginas com Reciclagem e Guarda de Memória (v1.0)
+
+Rodando 24/7, o Chromium acumula memória quando o mesmo contexto vive para
+sempre e cada jogo abre/fecha uma página nova. O pool:
+  - reaproveita páginas "quentes" (sem custo de new_page a cada jogo)
+  - recicla o contexto após N navegações ou quando o RSS do Chromium passa
+    do limite (o contexto antigo fecha quando a última página volta)
+  - reinicia o navegador de forma transparente se ele cair
+  - limita páginas simultâneas (quem pede além do limite espera)
+
+Uso:
+    async with async_playwright() as p:
+        pool = BrowserPool(p, context_options={...})
+        async with pool.page() as page:
+            await page.goto(...)
+        print(pool.stats_line())
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from ..config import (
+    HEADLESS, BROWSER_POOL_PAGES, BROWSER_MAX_NAVIGATIONS,
+    BROWSER_MAX_RSS_MB, BROWSER_RSS_CHECK_SEC,
+)
+
+
+# Mensagens do Playwright que indicam página/navegador morto (não erro de scraping)
+CRASH_MARKERS = ("Target closed", "Target page, context or browser has been closed", "crashed", "Browser closed")
+
+
+def process_tree_rss_mb(root_pid: Optional[int] = None) -> float:
+    """
+    RSS (MB) do processo `root_pid` e de todos os descendentes, via /proc.
+    Inclui o driver do Playwright e os processos do Chromium. 0.0 fora do Linux.
+    """
+    root_pid = root_pid or os.getpid()
+    try:
+        pids = [int(d) for d in os.listdir("/proc") if d.isdigit()]
+    except OSError:
+        return 0.0
+
+    children: Dict[int, List[int]] = {}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                stat = f.read()
+            # O nome do processo pode ter espaços; o ppid vem depois do último ')'
+            ppid = int(stat[stat.rindex(b")") + 2:].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(pid)
+
+    total_kb, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024.0
+
+
+class _Generation:
+    """Um contexto do navegador e suas páginas; aposentado quando precisa reciclar."""
+
+    def __init__(self, context, number: int):
+        self.context     = context
+        self.number      = number
+        self.navigations = 0
+        self.leased      = 0
+        self.retired     = False
+        self.idle: List = []
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        playwright,
+        context_options: Optional[Dict] = None,
+        max_pages: int = BROWSER_POOL_PAGES,
+        max_navigations: int = BROWSER_MAX_NAVIGATIONS,
+        max_rss_mb: float = BROWSER_MAX_RSS_MB,
+        rss_check_sec: float = BROWSER_RSS_CHECK_SEC,
+        headless: bool = HEADLESS,
+    ):
+        self.playwright      = playwright
+        self.context_options = context_options or {}
+        self.max_navigations = max_navigations
+        self.max_rss_mb      = max_rss_mb
+        self.rss_check_sec   = rss_check_sec
+        self.headless        = headless
+
+        self.browser = None
+        self.gen: Optional[_Generation] = None
+        self._gen_seq    = 0
+        self._slots      = asyncio.Semaphore(max_pages)
+        self._owner: Dict = {}   # página emprestada → geração (contexto) de origem
+        self._lock       = asyncio.Lock()
+        self._last_rss_check = 0.0
+        self.rss_mb      = 0.0
+        self.metrics = {
+            "leases":          0,
+            "reused":          0,
+            "new_pages":       0,
+            "navigations":     0,
+            "recycled_navs":   0,
+            "recycled_rss":    0,
+            "browser_restarts": 0,
+            "page_crashes":    0,
+        }
+
+    # ── Navegador / contexto ───────────────────────────────────────────────────
+    async def _launch(self):
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        await self._new_generation()
+
+    async def _new_generation(self):
+        if self.gen:
+            self.gen.retired = True
+            await self._maybe_close(self.gen)
+        self._gen_seq += 1
+        self.gen = _Generation(await self.browser.new_context(**self.context_options), self._gen_seq)
+
+    async def _maybe_close(self, gen: _Generation):
+        """Fecha o contexto aposentado quando nenhuma página dele está emprestada."""
+        if gen.retired and gen.leased == 0:
+            try:
+                await gen.context.close()
+            except Exception:
+                pass
+            gen.idle.clear()
+
+    async def _ensure_ready(self):
+        async with self._lock:
+            if self.browser is None:
+                await self._launch()
+                return
+            if not self.browser.is_connected():
+                print("[!] [POOL] Navegador caiu. Reiniciando...")
+                self.metrics["browser_restarts"] += 1
+                self.gen = None  # Páginas/contexto do navegador antigo são descartados
+                await self._launch()
+                return
+
+            if self.gen.navigations >= self.max_navigations:
+                print(f"[*] [POOL] Reciclando contexto #{self.gen.number} após {self.gen.navigations} navegações.")
+                self.metrics["recycled_navs"] += 1
+                await self._new_generation()
+            elif self.max_rss_mb and time.monotonic() - self._last_rss_check >= self.rss_check_sec:
+                self._last_rss_check = time.monotonic()
+                self.rss_mb = await asyncio.to_thread(process_tree_rss_mb)
+                if self.rss_mb > self.max_rss_mb:
+                    print(f"[!] [POOL] RSS {self.rss_mb:.0f}MB > {self.max_rss_mb:.0f}MB. Reciclando contexto #{self.gen.number}.")
+                    self.metrics["recycled_rss"] += 1
+                    await self._new_generation()
+
+    # ── Empréstimo de páginas ──────────────────────────────────────────────────
+    async def _acquire_page(self, gen: _Generation):
+        while gen.idle:
+            page = gen.idle.pop()
+            if not page.is_closed():
+                self.metrics["reused"] += 1
+                return page
+        page = await gen.context.new_page()
+        self.metrics["new_pages"] += 1
+
+        def _on_nav(frame, page=page, gen=gen):
+            if frame == page.main_frame and frame.url != "about:blank":
+                gen.navigations += 1
+                self.metrics["navigations"] += 1
+
+        def _on_crash(_page):
+            self.metrics["page_crashes"] += 1
+            print("[!] [POOL] Página do Chromium travou (crash). Será descartada.")
+
+        page.on("framenavigated", _on_nav)
+        page.on("crash", _on_crash)
+        return page
+
+    async def acquire(self):
+        """Empresta uma página (prefira `page()`; devolva sempre com `release`)."""
+        await self._slots.acquire()
+        try:
+            await self._ensure_ready()
+            gen = self.gen
+            page = await self._acquire_page(gen)
+        except BaseException:
+            self._slots.release()
+            raise
+        gen.leased += 1
+        self._owner[page] = gen
+        self.metrics["leases"] += 1
+        return page
+
+    async def release(self, page, healthy: bool = True):
+        """Devolve a página ao pool (ou descarta, se morreu ou o contexto foi aposentado)."""
+        gen = self._owner.pop(page, None)
+        try:
+            if gen is None:
+                return
+            gen.leased -= 1
+            if healthy and not page.is_closed() and not gen.retired and gen is self.gen:
+                gen.idle.append(page)
+                return
+            try:
+                await page.close()
+            except Exception:
+                pass
+            await self._maybe_close(gen)
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def page(self):
+        """Empresta uma página pelo tempo do bloco `async with`."""
+        page = await self.acquire()
+        healthy = True
+        try:
+            yield page
+        except Exception as e:
+            if any(m in str(e) for m in CRASH_MARKERS):
+                healthy = False
+            raise
+        finally:
+            await self.release(page, healthy)
+
+    async def warm(self, pages: int = 1):
+        """Sobe navegador e contexto e deixa `pages` páginas ociosas prontas (partida a frio)."""
+        leased = []
+        try:
+            for _ in range(pages):
+                leased.append(await self.acquire())
+        finally:
+            for page in leased:
+                await self.release(page)
+
+    async def close(self):
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+            self.gen = None
+
+    # ── Métricas ───────────────────────────────────────────────────────────────
+    def stats(self) -> Dict:
+        return dict(
+            self.metrics,
+            context=self.gen.number if self.gen else 0,
+            context_navigations=self.gen.navigations if self.gen else 0,
+            idle_pages=len(self.gen.idle) if self.gen else 0,
+            rss_mb=round(self.rss_mb, 1),
+        )
+
+    def stats_line(self) -> str:
+        st = self.stats()
+        return (
+            f"[POOL] contexto #{st['context']} ({st['context_navigations']}/{self.max_navigations} nav) | "
+            f"empréstimos {st['leases']} (reuso {st['reused']}, novas {st['new_pages']}) | "
+            f"ociosas {st['idle_pages']} | reciclagens nav {st['recycled_navs']} rss {st['recycled_rss']} | "
+            f"restarts {st['browser_restarts']} | crashes {st['page_crashes']} | RSS {st['rss_mb']}MB"
+        )
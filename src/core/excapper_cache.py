@@ -0,0 +1,81 @@
+"""
+excapper_cache.py — Cache do Fluxo Excapper por Jogo (v1.0)
+
+Os dois fluxos (dropping e legacy) leem a mesma página de jogo do Excapper.
+O cache guarda o resultado de `get_match_flow` por game_id durante um TTL
+curto e junta pedidos simultâneos do mesmo jogo numa única navegação, então
+cada página é carregada no máximo uma vez por janela, seja qual for o fluxo.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict
+
+from .browser_pool import BrowserPool
+from ..scrapers.excapper import ExcapperScraper
+from ..config import EXCAPPER_CACHE_TTL_SEC
+
+
+class ExcapperCache:
+    def __init__(self, scraper: ExcapperScraper, pool: BrowserPool, ttl: float = EXCAPPER_CACHE_TTL_SEC):
+        self.scraper  = scraper
+        self.pool     = pool
+        self.ttl      = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # game_id → (buscado_em, mercados)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.metrics  = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def _purge(self, now: float):
+        # Ordem de inserção = ordem de busca: os expirados ficam na frente
+        while self._entries:
+            game_id, (fetched_at, _) = next(iter(self._entries.items()))
+            if now - fetched_at < self.ttl:
+                break
+            self._entries.popitem(last=False)
+
+    async def get_match_flow(self, game_id: str) -> Dict[str, Dict]:
+        """Mesmo retorno de ExcapperScraper.get_match_flow, servido do cache quando fresco."""
+        game_id = str(game_id)
+        now = time.monotonic()
+        self._purge(now)
+
+        entry = self._entries.get(game_id)
+        if entry is not None:
+            self.metrics["hits"] += 1
+            return entry[1]
+
+        pending = self._inflight.get(game_id)
+        if pending is not None:
+            self.metrics["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        self.metrics["misses"] += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[game_id] = fut
+        try:
+            async with self.pool.page() as page:
+                markets = await self.scraper.get_match_flow(page, game_id)
+            self._entries.pop(game_id, None)
+            self._entries[game_id] = (time.monotonic(), markets)
+            fut.set_result(markets)
+            return markets
+        except BaseException as e:
+            self.metrics["errors"] += 1
+            if isinstance(e, Exception):
+                fut.set_result({})   # Quem esperava recebe "sem dados", como no scraper
+            else:
+                fut.cancel()
+            raise
+        finally:
+            self._inflight.pop(game_id, None)
+
+    def stats_line(self) -> str:
+        m = self.metrics
+        total = m["hits"] + m["misses"] + m["coalesced"]
+        saved = (m["hits"] + m["coalesced"]) / total * 100 if total else 0.0
+        return (
+            f"[EXC-CACHE] {len(self._entries)} jogos (TTL {self.ttl:.0f}s) | hits {m['hits']} | "
+            f"buscas {m['misses']} | juntados {m['coalesced']} | erros {m['errors']} | "
+            f"páginas evitadas {saved:.0f}%"
+        )
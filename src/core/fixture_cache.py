@@ -0,0 +1,79 @@
+"""
+fixture_cache.py — Cache Persistente de Jogos do SokkerPro (v1.0)
+
+A busca no SokkerPro (digitar o mandante, esperar o dropdown, escolher o
+resultado) custa ~8s e às vezes erra o jogo. Depois da primeira resolução, o
+par de times normalizado (identity.normalize_team) aponta direto para a URL
+do jogo, e as próximas consultas navegam para ela sem passar pela busca.
+
+As entradas valem até o fim do dia em que foram resolvidas (+ uma folga para
+jogos que cruzam a meia-noite) e ficam em SOKKERPRO_FIXTURES_FILE.
+"""
+
+import time
+from typing import Dict, Optional
+
+from .utils import load_json, save_json
+from .identity import normalize_team
+from ..config import SOKKERPRO_FIXTURES_FILE, SOKKERPRO_FIXTURE_GRACE_H
+
+
+class FixtureCache:
+    def __init__(self, path: str = SOKKERPRO_FIXTURES_FILE, grace_hours: float = SOKKERPRO_FIXTURE_GRACE_H):
+        self.path     = path
+        self.grace    = grace_hours * 3600
+        self._entries: Dict[str, Dict] = {}   # "mandante|visitante" → {"url", "resolved_at", "expires_at"}
+        self.metrics  = {"hits": 0, "misses": 0, "saved": 0, "dropped": 0}
+
+    @staticmethod
+    def key(home: str, away: str) -> str:
+        return f"{normalize_team(home)}|{normalize_team(away)}"
+
+    def _expiry(self, now: float) -> float:
+        """Meia-noite local seguinte + folga."""
+        t = time.localtime(now)
+        next_midnight = time.mktime((t.tm_year, t.tm_mon, t.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        return next_midnight + self.grace
+
+    def load(self):
+        data = load_json(self.path)
+        now = time.time()
+        self._entries = {
+            k: v for k, v in (data.items() if isinstance(data, dict) else [])
+            if isinstance(v, dict) and v.get("url") and v.get("expires_at", 0) > now
+        }
+
+    def _save(self):
+        try:
+            save_json(self.path, self._entries)
+        except OSError as e:
+            print(f"[!] [SP-CACHE] Falha ao gravar {self.path}: {e}")
+
+    def get(self, home: str, away: str) -> Optional[str]:
+        entry = self._entries.get(self.key(home, away))
+        if entry and entry["expires_at"] > time.time():
+            self.metrics["hits"] += 1
+            return entry["url"]
+        self.metrics["misses"] += 1
+        return None
+
+    def put(self, home: str, away: str, url: str):
+        now = time.time()
+        # Aproveita a gravação para descartar os dias anteriores
+        self._entries = {k: v for k, v in self._entries.items() if v["expires_at"] > now}
+        self._entries[self.key(home, away)] = {"url": url, "resolved_at": now, "expires_at": self._expiry(now)}
+        self.metrics["saved"] += 1
+        self._save()
+
+    def forget(self, home: str, away: str):
+        """URL em cache não abriu o jogo (removido/adiado): volta para a busca."""
+        if self._entries.pop(self.key(home, away), None) is not None:
+            self.metrics["dropped"] += 1
+            self._save()
+
+    def stats_line(self) -> str:
+        m = self.metrics
+        return (
+            f"[SP-CACHE] {len(self._entries)} jogos | hits {m['hits']} | buscas {m['misses']} | "
+            f"gravados {m['saved']} | descartados {m['dropped']}"
+        )
@@ -0,0 +1,222 @@
+"""
+identity.py — Identidade de Jogos entre Fontes (v1.0)
+
+DroppingOdds, Excapper e SokkerPro escrevem os times de jeitos diferentes
+("Man Utd" / "Manchester United FC"). Este serviço:
+  - normaliza os nomes (excapper.normalize_name + pontuação) e separa
+    mandante/visitante com qualquer separador (" vs ", " - ", " v ", " x ")
+  - mantém, por fonte, um índice de trigramas dos jogos ao vivo
+  - resolve "este jogo da fonte A é qual na fonte B" em microssegundos:
+    vínculo confirmado → nome idêntico → melhor candidato por trigramas,
+    só se ≥ confirm_score (abaixo disso, só conta como candidato)
+  - grava os vínculos confirmados (droppingodds ↔ excapper ↔ betfair) em
+    kairos.db (match_links), e os ciclos seguintes nem chegam ao fuzzy
+
+Uso:
+    identity.update("excapper", [(gid, teams), ...])          # a cada listagem
+    exc_id = identity.resolve("droppingodds", do_id, "excapper")
+    identity.link(("droppingodds", do_id), ("excapper", exc_id), teams=teams)
+"""
+
+import re
+import time
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from .storage import KairosDB
+from ..scrapers.excapper import normalize_name
+from ..config import DB_FILE, IDENTITY_MIN_SCORE, IDENTITY_CONFIRM_SCORE
+
+
+# Separadores em ordem de prioridade: o traço fica por último porque também
+# aparece dentro do nome ("Fortaleza - CE vs Ceara")
+TEAM_SPLIT_RES = [
+    re.compile(r"\s+vs\.?\s+", re.IGNORECASE),
+    re.compile(r"\s+[vx]\s+", re.IGNORECASE),
+    re.compile(r"\s+[-–]\s+"),
+]
+
+
+def split_teams(text: str) -> Tuple[str, str]:
+    """'Flamengo vs Palmeiras' / 'Flamengo - Palmeiras' → ('Flamengo', 'Palmeiras'). Sem separador: (texto, '')."""
+    text = (text or "").strip()
+    for pattern in TEAM_SPLIT_RES:
+        parts = pattern.split(text, maxsplit=1)
+        if len(parts) == 2:
+            return parts[0].strip(), parts[1].strip()
+    return text, ""
+
+
+def normalize_team(name: str) -> str:
+    text = re.sub(r"[^a-z0-9 ]", " ", normalize_name(name))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def fixture_grams(home: str, away: str) -> FrozenSet[str]:
+    """Trigramas marcados pelo lado: 'Real x Barça' não casa com 'Barça x Real'."""
+    return frozenset({"h" + g for g in _trigrams(home)} | {"a" + g for g in _trigrams(away)})
+
+
+def betfair_market_id(markets: Dict) -> Optional[str]:
+    """Id Betfair do Match Odds (ou do primeiro mercado) no retorno de get_match_flow."""
+    market = markets.get("Match Odds") or next(iter(markets.values()), None) if markets else None
+    return market.get("market_id") if market else None
+
+
+class MatchIdentity:
+    def __init__(self, db_path: str = DB_FILE, min_score: float = IDENTITY_MIN_SCORE,
+                 confirm_score: float = IDENTITY_CONFIRM_SCORE):
+        self.db_path       = db_path
+        self.db: Optional[KairosDB] = None
+        self.min_score     = min_score
+        self.confirm_score = confirm_score
+        # Jogos ao vivo por fonte: id → (mandante, visitante, trigramas, texto original)
+        self._live: Dict[str, Dict[str, tuple]] = defaultdict(dict)
+        self._exact: Dict[str, Dict[tuple, str]] = defaultdict(dict)             # fonte → (mand., visit.) → id
+        self._index: Dict[str, Dict[str, set]] = defaultdict(lambda: defaultdict(set))   # fonte → trigrama → ids
+        # Vínculos confirmados: (fonte, id) → chave; chave → {fonte: id}
+        self._links: Dict[Tuple[str, str], str] = {}
+        self._members: Dict[str, Dict[str, str]] = defaultdict(dict)
+        self.metrics = {"linked": 0, "exact": 0, "fuzzy": 0, "candidates": 0, "misses": 0, "confirmed": 0}
+
+    def load(self):
+        """Abre o kairos.db e carrega os vínculos confirmados (na thread que vai usar a conexão)."""
+        self.db = KairosDB(self.db_path)
+        for row in self.db.load_match_links():
+            self._links[(row["source"], row["source_id"])] = row["match_key"]
+            self._members[row["match_key"]][row["source"]] = row["source_id"]
+
+    # ── Jogos ao vivo ──────────────────────────────────────────────────────────
+    def update(self, source: str, fixtures: Iterable[Tuple[str, str]]):
+        """Substitui os jogos ao vivo da fonte: [(id, 'Mandante vs Visitante'), ...]."""
+        live, exact, index = self._live[source], self._exact[source], self._index[source]
+        current = {}
+        for fixture_id, teams in fixtures:
+            fixture_id = str(fixture_id)
+            known = live.get(fixture_id)
+            if known is not None and known[3] == teams:
+                current[fixture_id] = known
+                continue
+            home, away = (normalize_team(t) for t in split_teams(teams))
+            current[fixture_id] = (home, away, fixture_grams(home, away), teams)
+
+        for fixture_id, (home, away, grams, _) in live.items():
+            if current.get(fixture_id, (None,) * 4)[2] is grams:
+                continue
+            if exact.get((home, away)) == fixture_id:   # Outro jogo ao vivo pode ter o mesmo nome
+                del exact[(home, away)]
+            for g in grams:
+                ids = index.get(g)
+                if ids is not None:
+                    ids.discard(fixture_id)
+                    if not ids:
+                        del index[g]
+        for fixture_id, entry in current.items():
+            home, away, grams, _ = entry
+            if live.get(fixture_id) is entry:
+                exact.setdefault((home, away), fixture_id)   # Homônimo que saiu deixa o nome livre
+                continue
+            exact[(home, away)] = fixture_id
+            for g in grams:
+                index[g].add(fixture_id)
+        self._live[source] = current
+
+    # ── Resolução ──────────────────────────────────────────────────────────────
+    def linked(self, source: str, source_id: str, target: str) -> Optional[str]:
+        key = self._links.get((source, str(source_id)))
+        return self._members[key].get(target) if key else None
+
+    def resolve(self, source: str, source_id: str, target: str, teams: str = "") -> Optional[str]:
+        """
+        Id do mesmo jogo na fonte `target`: vínculo confirmado, nome normalizado
+        idêntico ou o melhor candidato por trigramas com Dice ≥ confirm_score.
+        Candidato entre min_score e confirm_score ("Manchester City" × "Manchester
+        United") não é devolvido: fica só na contagem de candidatos. None se nada casar.
+        """
+        source_id = str(source_id)
+        target_id = self.linked(source, source_id, target)
+        if target_id:
+            self.metrics["linked"] += 1
+            return target_id
+
+        entry = self._live[source].get(source_id)
+        if entry is not None:
+            home, away, grams = entry[:3]
+        elif teams:
+            home, away = (normalize_team(t) for t in split_teams(teams))
+            grams = fixture_grams(home, away)
+        else:
+            self.metrics["misses"] += 1
+            return None
+
+        target_id = self._exact[target].get((home, away))
+        if target_id:
+            self.metrics["exact"] += 1
+            self.link((source, source_id), (target, target_id), teams=teams or (entry[3] if entry else ""))
+            return target_id
+
+        best_id, score = self.best_match(grams, target)
+        if best_id is None or score < self.min_score:
+            self.metrics["misses"] += 1
+            return None
+        if score < self.confirm_score:
+            self.metrics["candidates"] += 1
+            return None
+        self.metrics["fuzzy"] += 1
+        self.link((source, source_id), (target, best_id), teams=teams or (entry[3] if entry else ""))
+        return best_id
+
+    def best_match(self, grams: FrozenSet[str], target: str) -> Tuple[Optional[str], float]:
+        """Candidato de `target` com maior Dice de trigramas (só os que dividem algum trigrama)."""
+        index, live = self._index[target], self._live[target]
+        shared: Dict[str, int] = defaultdict(int)
+        for g in grams:
+            for fixture_id in index.get(g, ()):
+                shared[fixture_id] += 1
+        best_id, best = None, 0.0
+        for fixture_id, common in shared.items():
+            score = 2.0 * common / (len(grams) + len(live[fixture_id][2]))
+            if score > best:
+                best_id, best = fixture_id, score
+        return best_id, best
+
+    # ── Vínculos confirmados ───────────────────────────────────────────────────
+    def link(self, *refs: Tuple[str, Optional[str]], teams: str = "") -> Optional[str]:
+        """Confirma que todas as (fonte, id) são o mesmo jogo; refs com id vazio são ignoradas."""
+        refs = [(source, str(source_id)) for source, source_id in refs if source_id]
+        if len(refs) < 2:
+            return None
+        keys = [self._links[r] for r in refs if r in self._links]
+        key = keys[0] if keys else f"{refs[0][0]}:{refs[0][1]}"
+        moved = list(refs)
+        for other in set(keys) - {key}:   # Duas chaves para o mesmo jogo: junta na primeira
+            moved.extend(self._members.pop(other).items())
+        new = [r for r in moved if self._links.get(r) != key]
+        if not new:
+            return key
+        for source, source_id in new:
+            self._links[(source, source_id)] = key
+            self._members[key][source] = source_id
+        self.metrics["confirmed"] += 1
+        if self.db is not None:
+            self.db.save_match_links(key, new, teams, time.time())
+        return key
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def stats_line(self) -> str:
+        m = self.metrics
+        live = " ".join(f"{source} {len(fixtures)}" for source, fixtures in self._live.items())
+        return (
+            f"[IDENTITY] ao vivo: {live or '-'} | vínculos {len(self._links)} | "
+            f"resolvidos: vínculo {m['linked']} exato {m['exact']} fuzzy {m['fuzzy']} | "
+            f"candidatos abaixo do limiar {m['candidates']} | sem par {m['misses']} | confirmados {m['confirmed']}"
+        )
@@ -0,0 +1,201 @@
+"""
+implied.py — Probabilidades Implícitas e Overround entre Tabelas (v1.0)
+
+O DroppingOdds dá, por jogo, as odds de 1X2, Total, Handicap, HT Total e
+HT 1X2 (page_data["odds"]: abertura e atual de cada seleção). Este módulo:
+  - guarda a última leitura de cada jogo ao vivo como uma linha de uma
+    matriz fixa (COLUMNS: tabela × seleção, abertura e atual)
+  - a cada ciclo tira da matriz o overround (Σ 1/odd − 1) mediano de cada
+    tabela e avalia todos os jogos numa passada, coluna a coluna:
+    probabilidade implícita normalizada (1/odd ÷ Σ da tabela), deslocamento
+    abertura → atual, movimentos inconsistentes entre tabelas (ex.: Home do
+    1X2 cai e o Handicap não acompanha) e overround fora da mediana do ciclo
+  - na leitura nova de um jogo (antes do snapshot da IA) reaproveita o
+    resultado do ciclo se as odds não mudaram; senão reavalia só esse jogo
+  - devolve as marcas como sinais em drops_summary, que já vão para a IA
+
+Uso:
+    book.store(game_id, page_data)          # a cada visita (mantém a matriz)
+    book.refresh(live_ids)                  # a cada listagem: passada em lote
+    flags = book.annotate(game_id, page_data)   # antes do snapshot da IA
+"""
+
+import statistics
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config import IMPLIED_MOVE_MIN, IMPLIED_MATCH_RATIO, OVERROUND_MAX_DEV
+
+
+# Colunas da matriz (ordem fixa) e as fatias de cada tabela
+COLUMNS: List[Tuple[str, str]] = [
+    ("1X2", "Home"), ("1X2", "Draw"), ("1X2", "Away"),
+    ("Total", "Over"), ("Total", "Under"),
+    ("Handicap", "Home"), ("Handicap", "Away"),
+    ("HT Total", "Over"), ("HT Total", "Under"),
+    ("HT 1X2", "Home"), ("HT 1X2", "Draw"), ("HT 1X2", "Away"),
+]
+COLUMN_INDEX = {col: i for i, col in enumerate(COLUMNS)}
+TABLES: Dict[str, List[int]] = {}
+for _i, (_table, _sel) in enumerate(COLUMNS):
+    TABLES.setdefault(_table, []).append(_i)
+LINE_TABLES = ("Total", "Handicap", "HT Total")
+
+# (tabela, seleção que moveu) → (tabela que deveria acompanhar, seleção, sinal)
+CONFIRMS: List[Tuple[Tuple[str, str], Tuple[str, str], str]] = [
+    (("1X2", "Home"),      ("Handicap", "Home"), "1X2_SEM_HANDICAP"),
+    (("1X2", "Away"),      ("Handicap", "Away"), "1X2_SEM_HANDICAP"),
+    (("Handicap", "Home"), ("1X2", "Home"),      "HANDICAP_SEM_1X2"),
+    (("Handicap", "Away"), ("1X2", "Away"),      "HANDICAP_SEM_1X2"),
+    (("HT 1X2", "Home"),   ("1X2", "Home"),      "HT_1X2_SEM_1X2"),
+    (("HT 1X2", "Away"),   ("1X2", "Away"),      "HT_1X2_SEM_1X2"),
+    (("HT Total", "Over"), ("Total", "Over"),    "HT_TOTAL_SEM_TOTAL"),
+]
+
+
+def odds_row(odds: Dict) -> Optional[Tuple[list, list, Dict[str, bool]]]:
+    """page_data["odds"] → (1/odd abertura, 1/odd atual, linha mudou?) na ordem de COLUMNS."""
+    if not odds:
+        return None
+    open_inv, cur_inv = [0.0] * len(COLUMNS), [0.0] * len(COLUMNS)
+    for i, (table, sel) in enumerate(COLUMNS):
+        pair = odds.get(table, {}).get(sel)
+        if pair and pair[0] > 0 and pair[1] > 0:
+            open_inv[i], cur_inv[i] = 1.0 / pair[0], 1.0 / pair[1]
+    line_moved = {}
+    for table in LINE_TABLES:
+        line = odds.get(table, {}).get("line")
+        line_moved[table] = bool(line) and line[0] != line[1]
+    return open_inv, cur_inv, line_moved
+
+
+def median_overrounds(rows: Iterable[Tuple[list, list, Dict[str, bool]]]) -> Dict[str, float]:
+    """Overround atual mediano de cada tabela entre as linhas completas (referência do ciclo)."""
+    values: Dict[str, List[float]] = {table: [] for table in TABLES}
+    for _, cur_inv, _ in rows:
+        for table, idxs in TABLES.items():
+            if all(cur_inv[i] for i in idxs):
+                values[table].append(sum(cur_inv[i] for i in idxs) - 1.0)
+    return {table: statistics.median(v) for table, v in values.items() if v}
+
+
+def evaluate(rows: List[Tuple[list, list, Dict[str, bool]]], reference: Optional[Dict[str, float]] = None,
+             move_min: float = IMPLIED_MOVE_MIN, match_ratio: float = IMPLIED_MATCH_RATIO,
+             max_dev: float = OVERROUND_MAX_DEV) -> List[Dict]:
+    """
+    Avalia um lote de jogos (linhas de odds_row) numa passada por tabela.
+    `reference`: overround mediano por tabela (do ciclo) para marcar os atípicos.
+    Por jogo: {"tables": {tabela: {overround, overround_open, probs, moves}}, "flags": [...]}.
+    """
+    n = len(rows)
+    out = [{"tables": {}, "flags": []} for _ in range(n)]
+    moves = [[0.0] * len(COLUMNS) for _ in range(n)]
+    complete = [[False] * len(TABLES) for _ in range(n)]
+
+    # ── Probabilidades e overround: uma tabela de cada vez, todos os jogos ──
+    for t_pos, (table, idxs) in enumerate(TABLES.items()):
+        for m, (open_inv, cur_inv, _) in enumerate(rows):
+            if not all(cur_inv[i] for i in idxs) or not all(open_inv[i] for i in idxs):
+                continue
+            sum_cur = sum(cur_inv[i] for i in idxs)
+            sum_open = sum(open_inv[i] for i in idxs)
+            row_moves = moves[m]
+            for i in idxs:
+                row_moves[i] = cur_inv[i] / sum_cur - open_inv[i] / sum_open
+            complete[m][t_pos] = True
+            overround = sum_cur - 1.0
+            out[m]["tables"][table] = {
+                "overround":      round(overround, 4),
+                "overround_open": round(sum_open - 1.0, 4),
+                "probs":          {COLUMNS[i][1]: round(cur_inv[i] / sum_cur, 4) for i in idxs},
+                "moves":          {COLUMNS[i][1]: round(row_moves[i], 4) for i in idxs},
+            }
+            if overround < 0:
+                out[m]["flags"].append({"flag": "OVERROUND_NEGATIVO", "table": table, "value": round(overround, 4)})
+            elif reference and table in reference and overround > reference[table] + max_dev:
+                out[m]["flags"].append({"flag": "OVERROUND_ATIPICO", "table": table, "value": round(overround, 4)})
+
+    # ── Movimentos sem confirmação na tabela irmã ───────────────────────────
+    table_pos = {table: pos for pos, table in enumerate(TABLES)}
+    for (src, dst, flag) in CONFIRMS:
+        si, di = COLUMN_INDEX[src], COLUMN_INDEX[dst]
+        sp, dp = table_pos[src[0]], table_pos[dst[0]]
+        for m, (_, _, line_moved) in enumerate(rows):
+            if not (complete[m][sp] and complete[m][dp]):
+                continue
+            move = moves[m][si]
+            # Linha da tabela irmã mudou: odds não comparáveis, a mudança de linha já é a resposta
+            if move < move_min or line_moved.get(src[0]) or line_moved.get(dst[0]):
+                continue
+            if moves[m][di] < move * match_ratio:
+                out[m]["flags"].append({
+                    "flag": flag, "table": src[0], "selection": src[1],
+                    "move": round(move, 4), "confirm": round(moves[m][di], 4),
+                })
+    return out
+
+
+class ImpliedBook:
+    def __init__(self):
+        self._rows: Dict[str, tuple] = {}
+        self._results: Dict[str, Tuple[tuple, Dict]] = {}   # jogo → (linha avaliada, resultado)
+        self.reference: Dict[str, float] = {}
+        self.metrics = {"evaluated": 0, "flagged": 0, "annotated": 0}
+
+    def store(self, game_id: str, page_data: Optional[Dict]):
+        row = odds_row((page_data or {}).get("odds"))
+        if row is not None:
+            self._rows[str(game_id)] = row
+
+    def refresh(self, live_ids: Iterable[str]):
+        """Passada do ciclo: descarta quem saiu do ao vivo, atualiza as medianas e marca todos os jogos."""
+        live = {str(g) for g in live_ids}
+        for game_id in [g for g in self._rows if g not in live]:
+            del self._rows[game_id]
+        ids = list(self._rows)
+        rows = [self._rows[g] for g in ids]
+        self.reference = median_overrounds(rows)
+        results = evaluate(rows, self.reference)
+        self._results = {g: (row, result) for g, row, result in zip(ids, rows, results)}
+        self.metrics["evaluated"] = len(ids)
+        self.metrics["flagged"] = sum(1 for r in results if r["flags"])
+
+    def annotate(self, game_id: str, page_data: Dict) -> List[Dict]:
+        """
+        Marcas da leitura nova do jogo, gravadas em drops_summary (sinais) e page_data:
+        as da passada do ciclo se as odds não mudaram desde então; senão reavalia o jogo.
+        """
+        game_id = str(game_id)
+        self.store(game_id, page_data)
+        row = self._rows.get(game_id)
+        if row is None:
+            return []
+        cached = self._results.get(game_id)
+        if cached is not None and cached[0] == row:
+            result = cached[1]
+        else:
+            result = evaluate([row], self.reference)[0]
+            self._results[game_id] = (row, result)
+        page_data["implied"] = dict(result["tables"])
+        page_data["market_flags"] = list(result["flags"])
+        for flag in result["flags"]:
+            columns = {sel for table, sel in COLUMNS if table == flag["table"]}
+            for drop in page_data.get("drops_summary", []):
+                if drop.get("table") != flag["table"]:
+                    continue
+                # Seleções agregadas ("Over/Under", "Handicap") recebem as marcas da tabela
+                if "selection" in flag and drop.get("selection") in columns and drop["selection"] != flag["selection"]:
+                    continue
+                signals = drop.setdefault("signals", [])
+                if flag["flag"] not in signals:
+                    signals.append(flag["flag"])
+        if result["flags"]:
+            self.metrics["annotated"] += 1
+        return result["flags"]
+
+    def stats_line(self) -> str:
+        m = self.metrics
+        ref = " ".join(f"{table} {value * 100:.1f}%" for table, value in self.reference.items())
+        return (
+            f"[IMPLIED] matriz {m['evaluated']} jogo(s) | inconsistentes {m['flagged']} | "
+            f"overround mediano: {ref or '-'} | marcados no snapshot {m['annotated']}"
+        )
@@ -0,0 +1,88 @@
+"""
+infra.py — Infraestrutura Compartilhada entre Fluxos (v1.3)
+
+Playwright + pool de páginas + notificador Telegram + cache do Excapper +
+índice de identidade dos jogos entre fontes (core/identity.py).
+Cada fluxo entra com `async with SharedInfra(...)` quando roda sozinho; no
+modo combinado (--mode both) a mesma instância é repassada aos dois fluxos
+e só é encerrada quando o último deles sai (contagem de referências).
+
+Também sobe o endpoint de métricas (core/metrics.py), um por processo, com
+o controle de perfil (POST /profile e SIGUSR1, ver core/profiler.py).
+
+Ao entrar, o Chromium sobe em segundo plano (`warmup`): o fluxo carrega seu
+estado enquanto isso e o primeiro `pool.page()` só espera o que faltar.
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+from playwright.async_api import async_playwright
+
+from . import startup
+from .browser_pool import BrowserPool
+from .metrics import MetricsServer
+from .profiler import PROFILER
+from .notifier import TelegramNotifier
+from .excapper_cache import ExcapperCache
+from .identity import MatchIdentity
+from ..scrapers.excapper import ExcapperScraper
+from ..config import TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, BROWSER_POOL_PAGES, BROWSER_WARM_PAGES
+
+
+class SharedInfra:
+    def __init__(self, context_options: Optional[Dict] = None, max_pages: int = BROWSER_POOL_PAGES):
+        self.context_options = context_options or {}
+        self.max_pages = max_pages
+        self._refs = 0
+        self._pw_cm = None
+        self.playwright = None
+        self.pool: Optional[BrowserPool] = None
+        self.notifier: Optional[TelegramNotifier] = None
+        self.excapper: Optional[ExcapperCache] = None
+        self.identity: Optional[MatchIdentity] = None
+        self.warmup: Optional[asyncio.Task] = None
+        self.metrics_server = MetricsServer()
+        self.metrics_server.add_route("POST", "/profile", PROFILER.handle_http)
+
+    async def __aenter__(self):
+        if self._refs == 0:
+            self._pw_cm = async_playwright()
+            self.playwright = await self._pw_cm.__aenter__()
+            self.pool = BrowserPool(self.playwright, context_options=self.context_options, max_pages=self.max_pages)
+            self.warmup = asyncio.create_task(self._warm())
+            self.notifier = TelegramNotifier(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
+            await self.notifier.start()
+            self.excapper = ExcapperCache(ExcapperScraper(), self.pool)
+            self.identity = MatchIdentity()
+            self.identity.load()   # Conexão SQLite fica nesta thread (a do loop)
+            PROFILER.install_signal(asyncio.get_running_loop())
+            await self.metrics_server.start()
+        self._refs += 1
+        return self
+
+    async def _warm(self):
+        try:
+            await self.pool.warm(min(BROWSER_WARM_PAGES, self.max_pages))
+            startup.mark("browser")
+        except Exception as e:
+            # Sem pânico: o primeiro pool.page() tenta de novo e propaga o erro real
+            print(f"[!] [POOL] Pré-aquecimento do navegador falhou: {e}")
+
+    async def __aexit__(self, *exc):
+        self._refs -= 1
+        if self._refs > 0:
+            return
+        if self.warmup and not self.warmup.done():
+            self.warmup.cancel()
+            await asyncio.gather(self.warmup, return_exceptions=True)
+        await self.metrics_server.stop()
+        await self.notifier.stop()
+        await self.pool.close()
+        self.identity.close()
+        await self._pw_cm.__aexit__(*exc)
+        self.playwright = None
+
+    def stats_lines(self):
+        return [self.pool.stats_line(), self.excapper.stats_line(), self.notifier.stats_line(),
+                self.identity.stats_line()]
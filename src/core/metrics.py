@@ -0,0 +1,236 @@
+"""
+metrics.py — Métricas por Estágio + Endpoint Prometheus (v1.0)
+
+Contadores, gauges e histogramas de latência em memória, com rótulos, e um
+endpoint HTTP local no formato texto do Prometheus (GET /metrics).
+
+Catálogo (prefixo kairos_):
+  page_loads_total / page_load_seconds   carregamentos por site e aba
+  rows_parsed_total / drops_found_total  linhas de tabela e drops por tabela
+  ai_calls_total / ai_seconds            chamadas de IA por provedor, tipo e resultado
+  telegram_sends_total / telegram_seconds envios (ok/falha/429) e latência fila→entrega
+  cycle_seconds / visit_seconds          ciclo de listagem/varredura e visita por jogo
+  cycle_lag_seconds                      atraso da visita em relação ao prazo agendado
+  stage_seconds / stage_wait_seconds     tempo no handler e na fila de cada estágio
+  sokkerpro_stats_seconds                stats live do SokkerPro por origem (json/dom)
+
+Nos workers do modo supervisor (--workers N) as métricas ficam no processo
+filho; o endpoint mostra as do processo principal.
+
+Uso:
+    with metrics.track_page_load("droppingodds", "1X2"):
+        await page.goto(url)
+    metrics.ROWS_PARSED.inc(len(rows), table="1X2")
+    curl http://127.0.0.1:9108/metrics
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from ..config import METRICS_HOST, METRICS_PORT
+
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name      = name
+        self.help_text = help_text
+        self.labels    = tuple(labels)
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_fmt(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Tuple[str, ...], list] = {}   # rótulos → [contagens por faixa, soma, total]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, (counts, total, n) in sorted(self.series.items()):
+            acc = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                acc += count
+                le = 'le="' + _fmt(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {acc}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> _Metric:
+        self.metrics.setdefault(metric.name, metric)
+        return self.metrics[metric.name]
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()) -> Gauge:
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ── Catálogo ───────────────────────────────────────────────────────────────────
+PAGE_LOADS        = REGISTRY.counter("kairos_page_loads_total", "Carregamentos de página", ("site", "tab", "status"))
+PAGE_LOAD_SECONDS = REGISTRY.histogram("kairos_page_load_seconds", "Duração do page.goto", ("site", "tab"))
+ROWS_PARSED       = REGISTRY.counter("kairos_rows_parsed_total", "Linhas de tabela/mercado extraídas", ("site", "table"))
+DROPS_FOUND       = REGISTRY.counter("kairos_drops_found_total", "Drops acima de DROP_MIN_PCT", ("table",))
+AI_CALLS          = REGISTRY.counter("kairos_ai_calls_total", "Chamadas ao modelo de IA", ("provider", "kind", "status"))
+AI_SECONDS        = REGISTRY.histogram("kairos_ai_seconds", "Latência das chamadas de IA", ("provider", "kind"))
+TELEGRAM_SENDS    = REGISTRY.counter("kairos_telegram_sends_total", "Envios ao Telegram por resultado", ("method", "status"))
+TELEGRAM_SECONDS  = REGISTRY.histogram("kairos_telegram_seconds", "Latência fila → entrega no Telegram", ("method",))
+CYCLE_SECONDS     = REGISTRY.histogram("kairos_cycle_seconds", "Duração do ciclo de listagem/varredura", ("flow",))
+CYCLE_LAG_SECONDS = REGISTRY.histogram("kairos_cycle_lag_seconds", "Atraso da visita em relação ao prazo", ("flow",))
+VISIT_SECONDS     = REGISTRY.histogram("kairos_visit_seconds", "Tempo de um jogo dentro do pipeline", ("flow",))
+STAGE_SECONDS     = REGISTRY.histogram("kairos_stage_seconds", "Tempo no handler do estágio", ("stage",))
+STAGE_WAIT        = REGISTRY.histogram("kairos_stage_wait_seconds", "Tempo na fila do estágio", ("stage",))
+LIVE_MATCHES      = REGISTRY.gauge("kairos_live_matches", "Jogos na última listagem", ("flow",))
+SOKKERPRO_STATS_SECONDS = REGISTRY.histogram("kairos_sokkerpro_stats_seconds", "Extração das stats live do SokkerPro",
+                                             ("source",))
+
+
+@contextmanager
+def track_page_load(site: str, tab: str = "main"):
+    """Conta o carregamento (ok/erro) e observa a duração do bloco."""
+    t0 = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        PAGE_LOADS.inc(site=site, tab=tab, status=status)
+        PAGE_LOAD_SECONDS.observe(time.perf_counter() - t0, site=site, tab=tab)
+
+
+# ── Endpoint HTTP ──────────────────────────────────────────────────────────────
+class MetricsServer:
+    """GET /metrics no formato texto do Prometheus (aiohttp, só em METRICS_HOST) + rotas de controle."""
+
+    def __init__(self, host: str = METRICS_HOST, port: int = METRICS_PORT, registry: Registry = REGISTRY):
+        self.host     = host
+        self.port     = port
+        self.registry = registry
+        self._runner  = None
+        self._routes  = []
+
+    def add_route(self, method: str, path: str, handler):
+        """Rota extra (ex: controle de perfil) — registre antes de `start`."""
+        self._routes.append((method, path, handler))
+
+    async def start(self) -> bool:
+        if not self.port:
+            return False
+        from aiohttp import web
+
+        async def handle(_request):
+            return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8",
+                                headers={"X-Prometheus-Format": "0.0.4"})
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        for method, path, handler in self._routes:
+            app.router.add_route(method, path, handler)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        except OSError as e:
+            print(f"[!] [METRICS] Porta {self.port} indisponível ({e}). Endpoint desativado.")
+            await self._runner.cleanup()
+            self._runner = None
+            return False
+        print(f"[*] [METRICS] http://{self.host}:{self.port}/metrics")
+        return True
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
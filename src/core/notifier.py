@@ -0,0 +1,255 @@
+"""
+notifier.py — Notificador Telegram Assíncrono (v1.0)
+
+Substitui o envio bloqueante (requests.post) dentro do loop asyncio:
+  - sessão aiohttp persistente (pool de conexões keep-alive)
+  - fila de saída: os fluxos apenas enfileiram e seguem o scraping
+  - rate limit respeitando o Bot API (global ~30/s, por chat 1/s e 20/min)
+  - retries com backoff exponencial em 429 (retry_after) / 5xx / falha de rede
+  - métricas de entrega (enviadas, falhas, retries, latência, fila)
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import aiohttp
+
+from . import metrics
+from ..config import (
+    TELEGRAM_API_URL, TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_RATE, TELEGRAM_CHAT_PER_MIN,
+    TELEGRAM_MAX_RETRIES, TELEGRAM_QUEUE_MAX, TELEGRAM_WORKERS,
+)
+
+
+class RateLimiter:
+    """Token bucket assíncrono: `rate` tokens/s com capacidade `burst`."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate   = rate
+        self.burst  = burst
+        self.tokens = burst
+        self.last   = time.monotonic()
+        self._lock  = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Zera o bucket por `seconds` (usado quando o Telegram responde 429)."""
+        self.tokens = -seconds * self.rate
+
+
+class TelegramNotifier:
+    """
+    Uso:
+        async with TelegramNotifier(token, chat_id) as notifier:
+            notifier.enqueue(msg, on_sent=callback)
+
+    Callbacks recebem o `result` do Bot API (dict da mensagem, com message_id)
+    em caso de sucesso, ou a descrição do erro em caso de falha definitiva.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        default_chat_id: Optional[str] = None,
+        api_url: str = TELEGRAM_API_URL,
+        workers: int = TELEGRAM_WORKERS,
+        max_retries: int = TELEGRAM_MAX_RETRIES,
+        queue_max: int = TELEGRAM_QUEUE_MAX,
+    ):
+        self.token           = token
+        self.default_chat_id = default_chat_id
+        self.api_url         = api_url.rstrip("/")
+        self.n_workers       = workers
+        self.max_retries     = max_retries
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_max)
+
+        self.global_limiter = RateLimiter(TELEGRAM_GLOBAL_RATE, burst=TELEGRAM_GLOBAL_RATE)
+        self.chat_limiters: Dict[str, tuple] = {}
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._workers = []
+        self._latencies = deque(maxlen=500)
+        self.metrics = {
+            "enqueued":     0,
+            "sent":         0,
+            "failed":       0,
+            "retries":      0,
+            "rate_limited": 0,
+            "dropped":      0,
+        }
+
+    # ── Ciclo de vida ──────────────────────────────────────────────────────────
+    async def start(self):
+        if self.session:
+            return
+        connector = aiohttp.TCPConnector(limit=self.n_workers * 2, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=15, connect=5),
+        )
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.n_workers)]
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """Tenta esvaziar a fila e encerra workers e sessão."""
+        if not self.session:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"[!] [TG] {self.queue.qsize()} mensagens não entregues no encerramento.")
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await self.session.close()
+        self.session = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # ── API pública ────────────────────────────────────────────────────────────
+    def enqueue(
+        self,
+        text: str,
+        chat_id: Optional[str] = None,
+        method: str = "sendMessage",
+        extra: Optional[Dict] = None,
+        on_sent: Optional[Callable] = None,
+        on_failed: Optional[Callable] = None,
+    ) -> bool:
+        """
+        Enfileira uma chamada ao Bot API sem esperar a rede.
+        `method`/`extra` permitem editMessageText, reply_to_message_id etc.
+        Retorna False se a fila estiver cheia (mensagem descartada).
+        """
+        chat_id = chat_id or self.default_chat_id
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
+        if extra:
+            payload.update(extra)
+        item = {
+            "method":    method,
+            "payload":   payload,
+            "on_sent":   on_sent,
+            "on_failed": on_failed,
+            "queued_at": time.monotonic(),
+        }
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.metrics["dropped"] += 1
+            print(f"    [!] [TG] Fila cheia ({self.queue.maxsize}). Mensagem descartada.")
+            return False
+        self.metrics["enqueued"] += 1
+        return True
+
+    def stats(self) -> Dict:
+        lat = sorted(self._latencies)
+        return dict(
+            self.metrics,
+            queue_depth=self.queue.qsize(),
+            latency_p50_s=round(lat[len(lat) // 2], 2) if lat else 0.0,
+            latency_max_s=round(lat[-1], 2) if lat else 0.0,
+        )
+
+    def stats_line(self) -> str:
+        st = self.stats()
+        return (
+            f"[TG] fila {st['queue_depth']} | enviadas {st['sent']} | falhas {st['failed']} | "
+            f"retries {st['retries']} | 429 {st['rate_limited']} | descartadas {st['dropped']} | "
+            f"latência p50 {st['latency_p50_s']}s"
+        )
+
+    # ── Internos ───────────────────────────────────────────────────────────────
+    def _chat_limiters(self, chat_id: str) -> tuple:
+        if chat_id not in self.chat_limiters:
+            self.chat_limiters[chat_id] = (
+                RateLimiter(TELEGRAM_CHAT_RATE, burst=1.0),
+                RateLimiter(TELEGRAM_CHAT_PER_MIN / 60.0, burst=float(TELEGRAM_CHAT_PER_MIN)),
+            )
+        return self.chat_limiters[chat_id]
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            try:
+                await self._deliver(item)
+            except Exception as e:
+                print(f"    [!] [TG] Erro inesperado no worker: {e}")
+            finally:
+                self.queue.task_done()
+
+    @staticmethod
+    def _callback(fn: Optional[Callable], arg):
+        if fn is None:
+            return
+        try:
+            fn(arg)
+        except Exception as e:
+            print(f"    [!] [TG] Callback falhou: {e}")
+
+    async def _deliver(self, item: Dict):
+        chat_id = str(item["payload"].get("chat_id"))
+        per_sec, per_min = self._chat_limiters(chat_id)
+        url = f"{self.api_url}/bot{self.token}/{item['method']}"
+        error = "sem resposta"
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.metrics["retries"] += 1
+            await per_min.acquire()
+            await per_sec.acquire()
+            await self.global_limiter.acquire()
+
+            retry_after = None
+            try:
+                async with self.session.post(url, json=item["payload"]) as resp:
+                    try:
+                        body = await resp.json(content_type=None)
+                    except Exception:
+                        body = {"description": await resp.text()}
+                    body = body if isinstance(body, dict) else {}
+
+                    if resp.status == 200 and body.get("ok", True):
+                        self.metrics["sent"] += 1
+                        self._latencies.append(time.monotonic() - item["queued_at"])
+                        metrics.TELEGRAM_SENDS.inc(method=item["method"], status="ok")
+                        metrics.TELEGRAM_SECONDS.observe(time.monotonic() - item["queued_at"], method=item["method"])
+                        self._callback(item["on_sent"], body.get("result", {}))
+                        return
+
+                    error = f"{resp.status}: {body.get('description', '')}"
+                    if resp.status == 429:
+                        self.metrics["rate_limited"] += 1
+                        metrics.TELEGRAM_SENDS.inc(method=item["method"], status="rate_limited")
+                        retry_after = float((body.get("parameters") or {}).get("retry_after", 1))
+                        per_sec.pause(retry_after)
+                    elif resp.status < 500:
+                        # 400/403 etc. não melhoram com retry (HTML inválido, bot bloqueado)
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{e.__class__.__name__}: {e}"
+
+            # Em 429 o bucket do chat já foi pausado por retry_after; nos demais, backoff
+            if attempt < self.max_retries and retry_after is None:
+                await asyncio.sleep(min(30.0, 2 ** attempt) + random.uniform(0, 0.5))
+
+        self.metrics["failed"] += 1
+        metrics.TELEGRAM_SENDS.inc(method=item["method"], status="failed")
+        print(f"    [!] [TG] Falha definitiva ({item['method']} → {chat_id}): {error}")
+        self._callback(item["on_failed"], error)
@@ -0,0 +1,232 @@
+"""
+pipeline.py — Pipeline Assíncrono em Estágios (v1.0)
+
+Cada estágio tem fila limitada (backpressure: `put` bloqueia quando cheia),
+N workers próprios e métricas de profundidade de fila e latência.
+Com os estágios encadeados, a vazão é ditada pelo estágio mais lento e
+não pela soma de todos.
+
+Handlers recebem um item (ou uma lista, em estágios com `batch_size` > 1)
+e devolvem:
+  - None               → item descartado (filtro/erro)
+  - um item            → segue para o próximo estágio
+  - lista de itens     → cada um segue para o próximo estágio
+Todo item que sai do pipeline (descartado, com erro ou concluído no último
+estágio) é entregue ao `on_done` do Pipeline.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from . import metrics
+
+
+def _pct(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[..., Awaitable],
+        concurrency: int = 1,
+        maxsize: int = 50,
+        batch_size: int = 1,
+        batch_wait: float = 0.0,
+    ):
+        self.name        = name
+        self.handler     = handler
+        self.concurrency = max(1, concurrency)
+        self.batch_size  = max(1, batch_size)
+        self.batch_wait  = batch_wait
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+        self.next: Optional["Stage"] = None
+        self.on_done: Optional[Callable] = None
+        self._workers: List[asyncio.Task] = []
+
+        self.busy       = 0
+        self.max_depth  = 0
+        self._service   = deque(maxlen=500)   # tempo no handler (s)
+        self._wait      = deque(maxlen=500)   # tempo na fila (s)
+        self.metrics    = {"in": 0, "out": 0, "dropped": 0, "errors": 0}
+        self._calls     = 0
+        self._handled   = 0
+
+    # ── Entrada ────────────────────────────────────────────────────────────────
+    async def put(self, item):
+        """Enfileira aguardando espaço — é aqui que a pressão volta ao estágio anterior."""
+        await self.queue.put((time.monotonic(), item))
+        self.metrics["in"] += 1
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    # ── Ciclo de vida ──────────────────────────────────────────────────────────
+    def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _take_batch(self) -> list:
+        entries = [await self.queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(entries) < self.batch_size:
+            try:
+                entries.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entries.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return entries
+
+    async def _worker(self):
+        while True:
+            if self.batch_size > 1:
+                entries = await self._take_batch()
+            else:
+                entries = [await self.queue.get()]
+
+            now = time.monotonic()
+            for queued_at, _ in entries:
+                self._wait.append(now - queued_at)
+                metrics.STAGE_WAIT.observe(now - queued_at, stage=self.name)
+            items = [item for _, item in entries]
+
+            self.busy += 1
+            self._calls += 1
+            self._handled += len(items)
+            forwarded = []
+            try:
+                result = await self.handler(items if self.batch_size > 1 else items[0])
+                if result is not None:
+                    forwarded = result if isinstance(result, list) else [result]
+            except Exception as e:
+                self.metrics["errors"] += 1
+                print(f"    [!] [{self.name}] Erro no estágio: {e.__class__.__name__}: {e}")
+            finally:
+                self.busy -= 1
+                self._service.append(time.monotonic() - now)
+                metrics.STAGE_SECONDS.observe(time.monotonic() - now, stage=self.name)
+
+            try:
+                kept = {id(f) for f in forwarded}
+                for item in items:
+                    if id(item) not in kept:
+                        self.metrics["dropped"] += 1
+                        self._done(item)
+                for item in forwarded:
+                    self.metrics["out"] += 1
+                    if self.next:
+                        await self.next.put(item)
+                    else:
+                        self._done(item)
+            finally:
+                for _ in entries:
+                    self.queue.task_done()
+
+    def _done(self, item):
+        if self.on_done:
+            try:
+                self.on_done(item)
+            except Exception as e:
+                print(f"    [!] [{self.name}] on_done falhou: {e}")
+
+    # ── Métricas ───────────────────────────────────────────────────────────────
+    def cost_per_item(self) -> float:
+        """Segundos de serviço por item, já dividido pelos workers e pelo tamanho médio do lote."""
+        if not self._handled:
+            return 0.0
+        avg_batch = self._handled / self._calls
+        return _pct(self._service, 0.50) / avg_batch / self.concurrency
+
+    def stats(self) -> Dict:
+        return dict(
+            self.metrics,
+            stage=self.name,
+            workers=self.concurrency,
+            busy=self.busy,
+            depth=self.queue.qsize(),
+            max_depth=self.max_depth,
+            capacity=self.queue.maxsize,
+            service_p50_s=round(_pct(self._service, 0.50), 3),
+            service_p95_s=round(_pct(self._service, 0.95), 3),
+            wait_p50_s=round(_pct(self._wait, 0.50), 3),
+            wait_p95_s=round(_pct(self._wait, 0.95), 3),
+        )
+
+
+class Pipeline:
+    """
+    Uso:
+        pipe = Pipeline(on_done=lambda item: ...)
+        pipe.add("detalhes", fetch_details, concurrency=3)
+        pipe.add("ia", analyze, concurrency=2, batch_size=6, batch_wait=2.0)
+        pipe.start()
+        await pipe.put(item)
+    """
+
+    def __init__(self, maxsize: int = 50, on_done: Optional[Callable] = None):
+        self.maxsize = maxsize
+        self.on_done = on_done
+        self.stages: List[Stage] = []
+
+    def add(self, name: str, handler: Callable, concurrency: int = 1, maxsize: Optional[int] = None,
+            batch_size: int = 1, batch_wait: float = 0.0) -> Stage:
+        stage = Stage(name, handler, concurrency, maxsize or self.maxsize, batch_size, batch_wait)
+        stage.on_done = self.on_done
+        if self.stages:
+            self.stages[-1].next = stage
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    async def put(self, item):
+        await self.stages[0].put(item)
+
+    async def join(self):
+        """Espera esvaziar todos os estágios, em ordem."""
+        for stage in self.stages:
+            await stage.queue.join()
+
+    async def stop(self):
+        for stage in self.stages:
+            await stage.stop()
+
+    def stats(self) -> List[Dict]:
+        return [s.stats() for s in self.stages]
+
+    def bottleneck(self) -> Optional[str]:
+        """Estágio com maior custo por item (o que dita a vazão)."""
+        if not self.stages:
+            return None
+        return max(self.stages, key=lambda s: s.cost_per_item()).name
+
+    def stats_lines(self) -> List[str]:
+        lines = []
+        for st in self.stats():
+            lines.append(
+                f"[PIPE] {st['stage']:<10} fila {st['depth']:>3}/{st['capacity']:<3} (máx {st['max_depth']:>3}) | "
+                f"workers {st['busy']}/{st['workers']} | in {st['in']} out {st['out']} "
+                f"desc {st['dropped']} erros {st['errors']} | serviço p50 {st['service_p50_s']}s "
+                f"p95 {st['service_p95_s']}s | espera p50 {st['wait_p50_s']}s"
+            )
+        lines.append(f"[PIPE] Gargalo atual: {self.bottleneck()}")
+        return lines
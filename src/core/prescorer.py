@@ -0,0 +1,270 @@
+"""
+prescorer.py — Pré-Score Local antes da IA (v1.0)
+
+Modelo logístico leve, treinado offline a partir dos snapshots e vereditos
+gravados em kairos.db. Decide se um jogo que passou pelo gatilho de drop
+merece uma chamada ao KairosAnalyzer — a maioria volta como NOISE.
+
+Features (todas calculadas dos dados brutos do snapshot):
+  - drop máximo por tabela (1X2, Total, Handicap, HT Total, HT 1X2)
+  - quantidade de drops, sinais Red2/Red3, eventos de pênalti/cartão
+  - tier da liga (perfil Smart Money), minuto e status live
+  - volume do Excapper (soma dos fluxos) e quantidade de mercados
+
+Uso offline:
+  python -m src.core.prescorer train
+  python -m src.core.prescorer report [--recall 0.95]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .smart_money import get_league_profile
+from .utils import load_json, save_json
+from ..config import PRESCORE_MODEL_FILE, PRESCORE_MIN_SCORE, PRESCORE_TARGET_RECALL
+
+
+DROP_TABLES = ["1X2", "Total", "Handicap", "HT Total", "HT 1X2"]
+TIERS       = ["OCEAN", "MID", "LAKE", "YOUTH"]
+
+FEATURE_NAMES = (
+    [f"drop_{t.lower().replace(' ', '_')}" for t in DROP_TABLES]
+    + ["n_drops", "red2", "red3", "penalty", "red_card"]
+    + [f"tier_{t.lower()}" for t in TIERS]
+    + ["minute", "is_live", "excapper_volume", "excapper_markets"]
+)
+
+# Vereditos que justificam a chamada da IA (rótulo positivo no treino)
+POSITIVE_VERDICTS = {"SHARP_ACTION", "INSTITUTIONAL_FLOW", "SUSPICIOUS"}
+
+
+# ── Extração de Features ───────────────────────────────────────────────────────
+
+def extract_features(match: Dict, page_data: Dict, excapper_markets: Optional[Dict]) -> List[float]:
+    """Converte os dados brutos de um jogo no vetor de features (ordem de FEATURE_NAMES)."""
+    drops = page_data.get("drops_summary", [])
+
+    max_by_table = dict.fromkeys(DROP_TABLES, 0.0)
+    signals = set()
+    for d in drops:
+        table = d.get("table")
+        if table in max_by_table:
+            max_by_table[table] = max(max_by_table[table], float(d.get("drop_pct", 0) or 0))
+        signals.update(d.get("signals", []))
+
+    tier = get_league_profile(match.get("league", ""))["tier"]
+
+    m = re.search(r"\d+", str(match.get("time_text", "")))
+    minute = int(m.group()) if m else 0
+
+    volume = 0.0
+    for mdata in (excapper_markets or {}).values():
+        for entry in mdata.get("flow", []):
+            volume += float(entry.get("change_eur", 0) or 0)
+
+    return (
+        [max_by_table[t] / 100.0 for t in DROP_TABLES]
+        + [
+            min(len(drops), 20) / 10.0,
+            1.0 if "STRONG_DROP_RED2" in signals else 0.0,
+            1.0 if "CRITICAL_DROP_RED3" in signals else 0.0,
+            1.0 if "PENALTY_EVENT" in signals else 0.0,
+            1.0 if "RED_CARD_EVENT" in signals else 0.0,
+        ]
+        + [1.0 if tier == t else 0.0 for t in TIERS]
+        + [
+            min(minute, 120) / 90.0,
+            1.0 if match.get("is_live") else 0.0,
+            math.log1p(max(volume, 0.0)) / 10.0,
+            min(len(excapper_markets or {}), 30) / 10.0,
+        ]
+    )
+
+
+def _sigmoid(z: float) -> float:
+    if z < -30:
+        return 0.0
+    if z > 30:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+# ── Scorer ─────────────────────────────────────────────────────────────────────
+
+class PreScorer:
+    """
+    Scorer logístico em Python puro (~20 multiplicações por jogo).
+    Sem modelo treinado, `score` devolve 1.0 e nenhum jogo é filtrado.
+    """
+
+    def __init__(self, model_file: str = PRESCORE_MODEL_FILE, min_score: float = PRESCORE_MIN_SCORE):
+        self.model_file = model_file
+        self.min_score  = min_score
+        self.bias       = 0.0
+        self.weights: List[float] = []
+        self.load()
+
+    @property
+    def is_ready(self) -> bool:
+        return len(self.weights) == len(FEATURE_NAMES)
+
+    def load(self):
+        model = load_json(self.model_file) if os.path.exists(self.model_file) else {}
+        weights = model.get("weights", {}) if isinstance(model, dict) else {}
+        if weights and set(weights) == set(FEATURE_NAMES):
+            self.bias    = float(model.get("bias", 0.0))
+            self.weights = [float(weights[name]) for name in FEATURE_NAMES]
+            print(f"[*] Pré-score carregado ({model.get('samples', '?')} amostras, corte {self.min_score:.2f}).")
+        else:
+            self.weights = []
+
+    def score(self, features: List[float]) -> float:
+        if not self.is_ready:
+            return 1.0
+        z = self.bias
+        for w, x in zip(self.weights, features):
+            z += w * x
+        return _sigmoid(z)
+
+    def should_analyze(self, features: List[float]) -> Tuple[bool, float]:
+        s = self.score(features)
+        return s >= self.min_score, s
+
+
+# ── Treino e Replay (offline) ──────────────────────────────────────────────────
+
+def _label_from_verdict(ai_analysis: Optional[Dict]) -> Optional[int]:
+    if not isinstance(ai_analysis, dict) or "error" in ai_analysis:
+        return None
+    verdict = str(ai_analysis.get("verdict", "")).upper()
+    if not verdict:
+        return None
+    return 1 if verdict in POSITIVE_VERDICTS else 0
+
+
+def load_dataset(db=None) -> Tuple[List[List[float]], List[int]]:
+    """Monta (X, y) a partir dos snapshots analisados gravados no banco."""
+    from .storage import KairosDB
+
+    db = db or KairosDB()
+    X, y = [], []
+    for snap in db.iter_snapshots(only_analyzed=True):
+        label = _label_from_verdict(snap["ai_analysis"])
+        if label is None:
+            continue
+        md = snap["market_data"]
+        X.append(extract_features(md.get("match", {}), md.get("page_data", {}), md.get("excapper_markets", {})))
+        y.append(label)
+    return X, y
+
+
+def train(X: List[List[float]], y: List[int], epochs: int = 400, lr: float = 0.5, l2: float = 1e-3) -> Dict:
+    """Regressão logística por gradiente (batch) com peso de classe balanceado."""
+    n = len(X)
+    n_pos = sum(y)
+    n_neg = n - n_pos
+    if n == 0 or n_pos == 0 or n_neg == 0:
+        raise ValueError(f"Dataset insuficiente para treino ({n_pos} positivos / {n_neg} negativos)")
+
+    w_pos = n / (2.0 * n_pos)
+    w_neg = n / (2.0 * n_neg)
+    k = len(FEATURE_NAMES)
+    weights = [0.0] * k
+    bias = math.log(n_pos / n_neg)
+
+    for _ in range(epochs):
+        grad_w = [0.0] * k
+        grad_b = 0.0
+        for xi, yi in zip(X, y):
+            z = bias + sum(w * x for w, x in zip(weights, xi))
+            err = (_sigmoid(z) - yi) * (w_pos if yi else w_neg)
+            grad_b += err
+            for j in range(k):
+                grad_w[j] += err * xi[j]
+        bias -= lr * grad_b / n
+        for j in range(k):
+            weights[j] -= lr * (grad_w[j] / n + l2 * weights[j])
+
+    return {
+        "bias":       bias,
+        "weights":    dict(zip(FEATURE_NAMES, weights)),
+        "samples":    n,
+        "positives":  n_pos,
+        "trained_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def replay_report(scorer: PreScorer, X: List[List[float]], y: List[int], target_recall: float) -> Dict:
+    """
+    Simula o gate sobre o histórico: quantas chamadas da IA seriam cortadas
+    mantendo o recall alvo sobre os vereditos positivos.
+    """
+    scores = [scorer.score(x) for x in X]
+    n = len(scores)
+    pos_scores = sorted((s for s, yi in zip(scores, y) if yi), reverse=True)
+    if not pos_scores:
+        raise ValueError("Nenhum veredito positivo no histórico")
+
+    # Maior corte que ainda mantém o recall alvo
+    keep = max(1, math.ceil(target_recall * len(pos_scores)))
+    threshold = pos_scores[keep - 1]
+
+    def _stats(th: float) -> Dict:
+        passed = [yi for s, yi in zip(scores, y) if s >= th]
+        return {
+            "threshold":  round(th, 4),
+            "calls":      len(passed),
+            "calls_cut":  n - len(passed),
+            "cut_pct":    round(100.0 * (n - len(passed)) / n, 1),
+            "recall":     round(sum(passed) / len(pos_scores), 3),
+        }
+
+    return {
+        "samples":        n,
+        "positives":      len(pos_scores),
+        "at_target":      dict(_stats(threshold), target_recall=target_recall),
+        "at_config":      _stats(scorer.min_score),
+    }
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Kairos — Pré-score local (treino/replay)")
+    parser.add_argument("command", choices=["train", "report"])
+    parser.add_argument("--recall", type=float, default=PRESCORE_TARGET_RECALL,
+                        help="Recall alvo para o relatório de replay")
+    parser.add_argument("--holdout", type=float, default=0.25,
+                        help="Fração do histórico reservada para validação no treino")
+    args = parser.parse_args()
+
+    X, y = load_dataset()
+    print(f"[*] {len(X)} snapshots com veredito ({sum(y)} positivos).")
+
+    if args.command == "train":
+        idx = list(range(len(X)))
+        random.Random(42).shuffle(idx)
+        cut = int(len(idx) * (1 - args.holdout))
+        train_idx, test_idx = idx[:cut], idx[cut:] or idx[:cut]
+
+        model = train([X[i] for i in train_idx], [y[i] for i in train_idx])
+        save_json(PRESCORE_MODEL_FILE, model)
+        print(f"[OK] Modelo salvo em {PRESCORE_MODEL_FILE}")
+
+        report = replay_report(PreScorer(), [X[i] for i in test_idx], [y[i] for i in test_idx], args.recall)
+    else:
+        scorer = PreScorer()
+        if not scorer.is_ready:
+            print(f"[!] Nenhum modelo treinado em {PRESCORE_MODEL_FILE}. Rode 'train' primeiro.")
+            return
+        report = replay_report(scorer, X, y, args.recall)
+
+    print(json.dumps(report, indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,135 @@
+"""
+profiler.py — Perfil Sob Demanda do Processo em Produção (v1.0)
+
+Liga cProfile + tracemalloc pelos próximos N ciclos de um fluxo, sem
+reiniciar o bot, e grava os relatórios em DATA_DIR/profiles/:
+  profile_<fluxo>_<data>.prof   estatísticas brutas (pstats / snakeviz)
+  profile_<fluxo>_<data>.txt    top funções por tempo acumulado e próprio
+  alloc_<fluxo>_<data>.txt      maiores crescimentos de memória por linha
+
+Gatilhos:
+  kill -USR1 <pid>                                   → PROFILE_CYCLES ciclos
+  curl -X POST 'http://127.0.0.1:9108/profile?cycles=5'
+
+Desligado, `tick()` é uma única comparação por ciclo.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import signal
+import time
+import tracemalloc
+from typing import Optional
+
+from ..config import DATA_DIR, PROFILE_CYCLES, PROFILE_TOP_N
+
+
+PROFILE_DIR = os.path.join(DATA_DIR, "profiles")
+
+
+class CycleProfiler:
+    def __init__(self, out_dir: str = PROFILE_DIR):
+        self.out_dir    = out_dir
+        self.armed      = 0       # Ciclos pedidos, aguardando o próximo início de ciclo
+        self.remaining  = 0
+        self.owner: Optional[str] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._snapshot  = None
+        self._started   = 0.0
+        self._cycles    = 0
+        self._own_trace = False
+
+    # ── Gatilhos ───────────────────────────────────────────────────────────────
+    def request(self, cycles: int = PROFILE_CYCLES) -> bool:
+        """Arma o perfil para os próximos `cycles` ciclos. False se já há um em andamento."""
+        if self._profile is not None or self.armed:
+            return False
+        self.armed = max(1, int(cycles))
+        print(f"[*] [PROFILE] Perfil armado para {self.armed} ciclo(s). Começa no próximo ciclo.")
+        return True
+
+    def install_signal(self, loop) -> bool:
+        """SIGUSR1 → request(). Indisponível no Windows."""
+        if not hasattr(signal, "SIGUSR1"):
+            return False
+        try:
+            loop.add_signal_handler(signal.SIGUSR1, self.request)
+        except (NotImplementedError, RuntimeError):
+            return False
+        return True
+
+    async def handle_http(self, request):
+        """POST /profile?cycles=N no endpoint de métricas."""
+        from aiohttp import web
+        try:
+            cycles = int(request.query.get("cycles", PROFILE_CYCLES))
+        except ValueError:
+            return web.json_response({"ok": False, "error": "cycles inválido"}, status=400)
+        ok = self.request(cycles)
+        return web.json_response(
+            {"ok": ok, "cycles": cycles, "busy": not ok, "out_dir": self.out_dir},
+            status=202 if ok else 409,
+        )
+
+    # ── Ciclos ─────────────────────────────────────────────────────────────────
+    def tick(self, flow: str):
+        """Chamado no início de cada ciclo do fluxo."""
+        if not self.armed and self._profile is None:
+            return
+        if self._profile is None:
+            self._start(flow)
+        elif flow == self.owner:
+            self.remaining -= 1
+            self._cycles += 1
+            if self.remaining <= 0:
+                self._finish()
+
+    def _start(self, flow: str):
+        self.owner, self.remaining, self.armed = flow, self.armed, 0
+        self._cycles  = 0
+        self._started = time.monotonic()
+        self._own_trace = not tracemalloc.is_tracing()
+        if self._own_trace:
+            tracemalloc.start(10)
+        self._snapshot = tracemalloc.take_snapshot()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        print(f"[*] [PROFILE] cProfile + tracemalloc ligados ({flow}, {self.remaining} ciclo(s)).")
+
+    def _finish(self):
+        self._profile.disable()
+        end_snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._own_trace:
+            tracemalloc.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = f"{self.owner}_{stamp}"
+        elapsed = time.monotonic() - self._started
+        header = f"# {self.owner} | {self._cycles} ciclo(s) | {elapsed:.1f}s | {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+
+        prof_path = os.path.join(self.out_dir, f"profile_{base}.prof")
+        self._profile.dump_stats(prof_path)
+        buf = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=buf).strip_dirs()
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        stats.sort_stats("tottime").print_stats(PROFILE_TOP_N)
+        with open(os.path.join(self.out_dir, f"profile_{base}.txt"), "w", encoding="utf-8") as f:
+            f.write(header + buf.getvalue())
+
+        diffs = end_snapshot.compare_to(self._snapshot, "lineno")
+        with open(os.path.join(self.out_dir, f"alloc_{base}.txt"), "w", encoding="utf-8") as f:
+            f.write(header)
+            f.write(f"# rastreado agora {current / 1e6:.1f}MB | pico {peak / 1e6:.1f}MB\n\n")
+            for diff in diffs[:PROFILE_TOP_N]:
+                f.write(f"{diff}\n")
+
+        print(f"[OK] [PROFILE] {self._cycles} ciclo(s) em {elapsed:.1f}s → {self.out_dir}/*_{base}.*")
+        self._profile = self._snapshot = None
+        self.owner = None
+
+
+PROFILER = CycleProfiler()
@@ -0,0 +1,243 @@
+"""
+rules.py — Motor de Regras de Manipulação (v1.0)
+
+Os detectores clássicos do fluxo legado (HT_GOAL_SNEAK, LATE_GOAL_ANOMALY,
+CORRECT_SCORE_DIVE, HIGH_ODDS_SNIPER, CESTO_DE_LIXO, ...) viram regras
+declarativas:
+  - DEFAULT_RULES reproduz os detectores inline (mesmos labels e níveis)
+  - data/manipulation_rules.json (opcional) acrescenta regras, substitui
+    uma padrão (mesmo "name"), desliga ("enabled": false) ou ajusta limites
+    ("params") sem mexer no código
+  - tudo é compilado uma vez (condições → funções, "$LIMITE" → número), e
+    evaluate() roda todas as regras sobre um lote de anomalias, com as
+    features (maiúsculas, odd, % ...) calculadas uma vez por anomalia
+
+O fluxo legado chama evaluate() jogo a jogo, só com a anomalia principal
+(como os detectores inline): as features dependem do SokkerPro do próprio
+jogo (minuto, APPM), buscado em sequência, e juntar o ciclo num lote
+seguraria cada alerta até a última busca do ciclo. Avaliar as regras custa
+microssegundos por jogo; o lote fica para o benchmark e para quem tiver
+as features de vários jogos de uma vez.
+
+Regra:
+    {"name":  "CESTO_DE_LIXO",
+     "when":  [["is_live", "is", true], ["avg_appm", "<=", "$LOW_PRESSURE_LIMIT"]],
+     "unless": ["LATE_GOAL"],          # pula se algum label anterior contiver o texto
+     "label": "CESTO_DE_LIXO (Suspeita manipulação final)",   # {feature} é formatado
+     "level": 3,
+     "level_when": [["pct", ">=", 10]],  # opcional: só eleva o nível se valer
+     "flags": ["institutional"]}         # opcional: marcas lidas pelo fluxo
+
+Features: market, selection (maiúsculas), odd, pct, eur, score, minute,
+avg_appm, is_live, is_ocean, turnaround (HT/FT com lados diferentes).
+Operadores: >= <= > < == != is in between contains not_contains contains_any.
+"""
+
+import operator
+import os
+import re
+import string
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .utils import load_json
+from ..config import MANIPULATION_RULES_FILE
+
+
+OPS: Dict[str, Callable] = {
+    ">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt,
+    "==": operator.eq, "!=": operator.ne,
+    "is":           lambda a, b: bool(a) is bool(b),
+    "in":           lambda a, b: a in b,
+    "between":      lambda a, b: b[0] <= a <= b[1],
+    "contains":     lambda a, b: b in a,
+    "not_contains": lambda a, b: b not in a,
+    "contains_any": lambda a, b: any(x in a for x in b),
+}
+TEXT_OPS = {"contains", "not_contains", "contains_any"}   # comparados com market/selection em maiúsculas
+
+FEATURES = {"market", "selection", "odd", "pct", "eur", "score", "minute",
+            "avg_appm", "is_live", "is_ocean", "turnaround"}
+
+HT_MARKETS = ["HALF TIME", "1ST HALF"]
+
+DEFAULT_RULES: List[Dict] = [
+    {"name": "HT_GOAL_SNEAK",
+     "when": [["market", "contains_any", HT_MARKETS], ["selection", "contains", "OVER 0.5"],
+              ["score", "==", "0-0"], ["minute", "between", [35, 45]]],
+     "label": "HT_GOAL_SNEAK (Golo no final do 1º tempo?)", "level": 3},
+    {"name": "HT_SMART_MONEY",
+     "when": [["market", "contains_any", HT_MARKETS]], "unless": ["HT_GOAL_SNEAK"],
+     "label": "HT_SMART_MONEY (Fluxo no 1º Tempo)", "level": 3},
+    {"name": "LATE_GOAL_ANOMALY",
+     "when": [["is_live", "is", True], ["minute", ">=", "$LATE_GAME_MIN"], ["market", "contains", "OVER"],
+              ["avg_appm", "<=", "$LOW_PRESSURE_LIMIT"]],
+     "label": "LATE_GOAL_ANOMALY (Fluxo tardio sem pressão)", "level": 3},
+    {"name": "CORRECT_SCORE_DIVE",
+     "when": [["market", "contains", "CORRECT SCORE"],
+              ["selection", "contains_any", ["3-2", "2-3", "4-1", "1-4", "3-3"]]],
+     "label": "CORRECT_SCORE_DIVE ({selection})", "level": 3},
+    {"name": "HT_FT_TURNAROUND",
+     "when": [["market", "contains", "HT/FT"], ["turnaround", "is", True]],
+     "label": "HT_FT_TURNAROUND ({selection})", "level": 3},
+    {"name": "HIGH_ODDS_SNIPER",
+     "when": [["odd", ">=", "$HIGH_ODDS_MIN"], ["is_ocean", "is", False]],
+     "label": "HIGH_ODDS_SNIPER (Odd: {odd})", "level": 3},
+    {"name": "FAVORITE_DIVERGENCE",
+     "when": [["odd", ">=", "$HIGH_ODDS_MIN"], ["is_ocean", "is", True]],
+     "label": "FAVORITE_DIVERGENCE (Dinheiro no Underdog?)", "level": 3},
+    {"name": "MATCH_ODDS_FOCUS",
+     "when": [["market", "contains_any", ["MATCH ODDS", "MATCH RESULT"]]], "unless": ["HIGH_ODDS"],
+     "label": "MATCH_ODDS_FOCUS (Fluxo no Principal)", "level": 3, "level_when": [["pct", ">=", 10]]},
+    {"name": "CESTO_DE_LIXO",
+     "when": [["is_live", "is", True], ["avg_appm", "<=", "$LOW_PRESSURE_LIMIT"], ["eur", ">=", "$CESTO_VOL_MIN"]],
+     "unless": ["LATE_GOAL"],
+     "label": "CESTO_DE_LIXO (Suspeita manipulação final)", "level": 3},
+    {"name": "PRE_GAME_SMART_MONEY",
+     "when": [["score", "==", "0-0"], ["is_ocean", "is", False], ["pct", ">=", "$PRE_GAME_DROP_LIMIT"]],
+     "label": "PRE_GAME_SMART_MONEY (Info Privilegiada?)", "level": 3},
+    {"name": "INSTITUTIONAL_SMART_MONEY",
+     "when": [["is_ocean", "is", True], ["eur", ">=", "$INSTITUTIONAL_VOL_BARRIER"],
+              ["pct", "between", ["$OCEAN_DROP_MIN", 15]]],
+     "label": "INSTITUTIONAL_SMART_MONEY (Vol: {eur}€)", "level": 3, "flags": ["institutional"]},
+]
+
+
+def to_float(text) -> float:
+    """"-12.5%" → 12.5 (variação do Excapper sem sinal); 0.0 se não for número."""
+    try:
+        return float(str(text).replace("%", "").replace("-", "") or 0)
+    except ValueError:
+        return 0.0
+
+
+def anomaly_features(anomaly: Dict, is_live: bool, is_ocean: bool, minute: int, avg_appm: float) -> Dict:
+    """Features de uma anomalia do Excapper (+ contexto do jogo) no formato lido pelas regras."""
+    details = anomaly["details"]
+    selection = anomaly["selection"].upper()
+    try:
+        odd = float(details["odds"])
+    except (ValueError, TypeError, KeyError):
+        odd = 0.0
+    sides = selection.split("/")
+    return {
+        "market":     anomaly["market"].upper(),
+        "selection":  selection,
+        "odd":        odd,
+        "pct":        to_float(details.get("change_pct", "")),
+        "eur":        details.get("change_eur", 0),
+        "score":      details.get("score", ""),
+        "minute":     minute,
+        "avg_appm":   avg_appm,
+        "is_live":    is_live,
+        "is_ocean":   is_ocean,
+        "turnaround": len(sides) >= 2 and sides[0].strip() != sides[1].strip(),
+    }
+
+
+class _Compiled:
+    __slots__ = ("name", "when", "unless", "label", "templated", "level", "level_when", "flags")
+
+
+class RuleEngine:
+    def __init__(self, params: Dict, rules: Optional[List[Dict]] = None, path: str = MANIPULATION_RULES_FILE):
+        self.params = dict(params)
+        self.path   = path
+        self.rules: List[Dict] = list(rules if rules is not None else DEFAULT_RULES)
+        self.from_file = 0
+        self._compiled: List[_Compiled] = self._compile(self.rules)
+
+    def load(self):
+        """Mescla o arquivo de regras (se existir) às padrão e recompila."""
+        data = load_json(self.path) if os.path.exists(self.path) else None
+        if not data:
+            return
+        if isinstance(data, list):
+            data = {"rules": data}
+        self.params.update(data.get("params") or {})
+
+        by_name = {r["name"]: r for r in self.rules}
+        for i, rule in enumerate(data.get("rules") or []):
+            if not isinstance(rule, dict) or not rule.get("name"):
+                print(f"[!] Regra #{i} inválida em {self.path}: {rule}")
+                continue
+            by_name[rule["name"]] = rule
+            self.from_file += 1
+        self.rules = list(by_name.values())
+        self._compiled = self._compile(self.rules)
+
+    # ── Compilação ─────────────────────────────────────────────────────────────
+    def _value(self, value, text: bool):
+        if isinstance(value, str) and value.startswith("$"):
+            return self.params[value[1:]]
+        if isinstance(value, list):
+            return [self._value(v, text) for v in value]
+        return value.upper() if text and isinstance(value, str) else value
+
+    def _condition(self, cond) -> Callable[[Dict], bool]:
+        field, op, value = cond
+        if field not in FEATURES or op not in OPS:
+            raise ValueError(f"condição desconhecida: {cond}")
+        fn, target = OPS[op], self._value(value, op in TEXT_OPS)
+        return lambda f: fn(f[field], target)
+
+    @staticmethod
+    def _check_label(label: str):
+        """{feature} desconhecida só estouraria no evaluate (KeyError no meio do jogo)."""
+        for _, field, _, _ in string.Formatter().parse(label):
+            if field is not None and re.split(r"[.\[]", field, 1)[0] not in FEATURES:
+                raise ValueError(f"label com feature desconhecida: {{{field}}}")
+
+    def _compile(self, rules: Iterable[Dict]) -> List[_Compiled]:
+        compiled = []
+        for rule in rules:
+            if rule.get("enabled", True) is False:
+                continue
+            try:
+                c = _Compiled()
+                c.name       = rule["name"]
+                c.when       = [self._condition(cond) for cond in rule.get("when", [])]
+                c.level_when = [self._condition(cond) for cond in rule.get("level_when", [])]
+                c.unless     = tuple(rule.get("unless", ()))
+                c.label      = rule.get("label", rule["name"])
+                c.templated  = "{" in c.label
+                if c.templated:
+                    self._check_label(c.label)
+                c.level      = int(rule.get("level", 0))
+                c.flags      = tuple(rule.get("flags", ()))
+            except (KeyError, ValueError, TypeError) as e:
+                print(f"[!] Regra '{rule.get('name')}' ignorada: {e}")
+                continue
+            compiled.append(c)
+        return compiled
+
+    # ── Avaliação em lote ──────────────────────────────────────────────────────
+    def evaluate(self, rows: List[Dict], labels: Optional[List[List[str]]] = None) -> List[Dict]:
+        """
+        Roda todas as regras, na ordem, sobre todas as anomalias (features de
+        anomaly_features). `labels`: labels já atribuídos por linha (ex.: sinais
+        Smart Money), vistos pelo "unless". Devolve, por linha, {labels, level, flags}
+        — level 1 quando nenhuma regra eleva.
+        """
+        n = len(rows)
+        out_labels = [list(l) for l in labels] if labels else [[] for _ in range(n)]
+        new_labels = [[] for _ in range(n)]
+        levels = [1] * n
+        flags = [set() for _ in range(n)]
+
+        for rule in self._compiled:
+            for i, f in enumerate(rows):
+                if rule.unless and any(k in l for l in out_labels[i] for k in rule.unless):
+                    continue
+                if not all(cond(f) for cond in rule.when):
+                    continue
+                label = rule.label.format_map(f) if rule.templated else rule.label
+                out_labels[i].append(label)
+                new_labels[i].append(label)
+                if rule.level > levels[i] and all(cond(f) for cond in rule.level_when):
+                    levels[i] = rule.level
+                flags[i].update(rule.flags)
+
+        return [{"labels": new_labels[i], "level": levels[i], "flags": flags[i]} for i in range(n)]
+
+    def stats_line(self) -> str:
+        return f"[RULES] {len(self._compiled)} regras ativas ({self.from_file} do arquivo {os.path.basename(self.path)})"
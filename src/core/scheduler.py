@@ -0,0 +1,208 @@
+"""
+scheduler.py — Agendador de Visitas por Urgência (v1.0)
+
+Em vez de varrer todos os jogos a cada CYCLE_SLEEP_SEC, cada jogo tem seu
+próprio horário da próxima visita (heap por prazo), calculado a partir de:
+  - minuto: janela do intervalo (HT_MINUTE_WINDOW) e reta final
+    (LATE_GAME_THRESHOLD_MIN) são onde os detectores do smart_money atuam
+  - velocidade recente do drop (pontos % por minuto entre visitas)
+  - tier da liga e ao vivo × pré-jogo
+Jogos quentes voltam em poucos segundos, frios raramente, e tudo dentro de
+um orçamento global de carregamentos de página por minuto (token bucket).
+"""
+
+import heapq
+import itertools
+import re
+import time
+from typing import Dict, List, Optional
+
+from . import metrics
+from .smart_money import HT_MINUTE_WINDOW, LATE_GAME_THRESHOLD_MIN, get_league_profile
+from ..config import (
+    SCHED_LIVE_BASE_SEC, SCHED_PRE_BASE_SEC, SCHED_MIN_INTERVAL_SEC, SCHED_MAX_INTERVAL_SEC,
+    SCHED_VELOCITY_REF, SCHED_TIER_WEIGHT, SCHED_PAGE_BUDGET_PER_MIN, SCHED_PAGES_PER_VISIT,
+)
+
+
+def _minute(time_text: str) -> Optional[int]:
+    """'73\\'' → 73, 'HT' → início da janela do intervalo, sem minuto → None."""
+    text = str(time_text or "")
+    if "HT" in text.upper():
+        return HT_MINUTE_WINDOW[0]
+    m = re.search(r"\d+", text)
+    return int(m.group()) if m and "." not in text and ":" not in text else None
+
+
+class _MatchState:
+    __slots__ = ("match", "listed_at", "minute", "last_visit", "last_drop", "velocity",
+                 "interval", "due", "version", "inflight", "visits")
+
+    def __init__(self, match: Dict, now: float):
+        self.match      = match
+        self.listed_at  = now
+        self.minute     = _minute(match.get("time_text", ""))
+        self.last_visit = 0.0
+        self.last_drop  = 0.0
+        self.velocity   = 0.0
+        self.interval   = 0.0
+        self.due        = now
+        self.version    = 0
+        self.inflight   = False
+        self.visits     = 0
+
+
+class MatchScheduler:
+    def __init__(
+        self,
+        page_budget_per_min: float = SCHED_PAGE_BUDGET_PER_MIN,
+        pages_per_visit: float = SCHED_PAGES_PER_VISIT,
+    ):
+        self.states: Dict[str, _MatchState] = {}
+        self._heap: List[tuple] = []     # (prazo, versão, game_id)
+        self._seq = itertools.count()
+
+        self.pages_per_visit = pages_per_visit
+        self.rate   = page_budget_per_min / 60.0      # páginas/s
+        self.burst  = max(pages_per_visit, page_budget_per_min / 6.0)
+        self.tokens = self.burst
+        self._last_refill = time.monotonic()
+
+        self.metrics = {"visits": 0, "budget_waits": 0, "lateness_sum": 0.0}
+
+    # ── Entrada: lista de jogos e resultado das visitas ─────────────────────────
+    def update_listing(self, matches: List[Dict], now: Optional[float] = None):
+        """Sincroniza com a lista ao vivo: novos entram já vencidos, ausentes saem."""
+        now = now or time.time()
+        seen = set()
+        for match in matches:
+            gid = match.get("game_id")
+            if not gid:
+                continue
+            seen.add(gid)
+            state = self.states.get(gid)
+            if state is None:
+                self.states[gid] = state = _MatchState(match, now)
+                self._push(gid, state, now)
+            else:
+                state.match, state.listed_at = match, now
+                state.minute = _minute(match.get("time_text", ""))
+        for gid in list(self.states):
+            if gid not in seen and not self.states[gid].inflight:
+                del self.states[gid]   # Entradas antigas no heap são ignoradas (lazy)
+
+    def record_visit(self, game_id: str, page_data: Optional[Dict], now: Optional[float] = None):
+        """Chamado quando o jogo sai do pipeline; recalcula urgência e reagenda."""
+        state = self.states.get(game_id)
+        if state is None:
+            return
+        now = now or time.time()
+        state.inflight = False
+        state.visits += 1
+
+        max_drop = float((page_data or {}).get("max_drop_pct", 0) or 0)
+        if page_data is not None:
+            # Velocidade só existe a partir da 2ª visita; visita falha mantém a anterior
+            if state.last_visit:
+                minutes = max((now - state.last_visit) / 60.0, 1 / 60.0)
+                state.velocity = max(0.0, (max_drop - state.last_drop) / minutes)
+            state.last_drop = max_drop
+        state.last_visit = now
+
+        state.interval = self.interval_for(state, now)
+        self._push(game_id, state, now + state.interval)
+
+    # ── Urgência ───────────────────────────────────────────────────────────────
+    def current_minute(self, state: _MatchState, now: float) -> Optional[int]:
+        """Minuto listado + tempo decorrido desde a listagem (o relógio anda entre varreduras)."""
+        if state.minute is None:
+            return None
+        if "HT" in str(state.match.get("time_text", "")).upper():
+            return state.minute   # Relógio parado no intervalo
+        return state.minute + int((now - state.listed_at) // 60)
+
+    def interval_for(self, state: _MatchState, now: float) -> float:
+        match = state.match
+        is_live = match.get("is_live", False)
+        base = SCHED_LIVE_BASE_SEC if is_live else SCHED_PRE_BASE_SEC
+
+        urgency = 1.0
+        minute = self.current_minute(state, now) if is_live else None
+        if minute is not None:
+            if HT_MINUTE_WINDOW[0] <= minute <= HT_MINUTE_WINDOW[1] or minute >= LATE_GAME_THRESHOLD_MIN:
+                urgency *= 4.0
+            elif (HT_MINUTE_WINDOW[0] - 5 <= minute < HT_MINUTE_WINDOW[0]
+                  or LATE_GAME_THRESHOLD_MIN - 10 <= minute < LATE_GAME_THRESHOLD_MIN):
+                urgency *= 1.5   # Aquecendo para a janela
+
+        urgency *= 1.0 + min(state.velocity / SCHED_VELOCITY_REF, 8.0)
+        urgency *= SCHED_TIER_WEIGHT.get(get_league_profile(match.get("league", ""))["tier"], 1.0)
+
+        return max(SCHED_MIN_INTERVAL_SEC, min(SCHED_MAX_INTERVAL_SEC, base / urgency))
+
+    # ── Saída: jogos a visitar agora ────────────────────────────────────────────
+    def _push(self, gid: str, state: _MatchState, due: float):
+        # A versão é global: jogo removido e relistado não casa com entradas antigas
+        state.version = next(self._seq)
+        state.due = due
+        heapq.heappush(self._heap, (due, state.version, gid))
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def due(self, now: Optional[float] = None) -> List[Dict]:
+        """Retira do heap os jogos vencidos que cabem no orçamento de páginas."""
+        now = now or time.time()
+        self._refill()
+        out = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, version, gid = self._heap[0]
+            state = self.states.get(gid)
+            if state is None or state.version != version or state.inflight:
+                heapq.heappop(self._heap)
+                continue
+            if self.tokens < self.pages_per_visit:
+                self.metrics["budget_waits"] += 1
+                break
+            heapq.heappop(self._heap)
+            self.tokens -= self.pages_per_visit
+            state.inflight = True
+            self.metrics["visits"] += 1
+            self.metrics["lateness_sum"] += now - due_at
+            metrics.CYCLE_LAG_SECONDS.observe(max(0.0, now - due_at), flow="dropping")
+            out.append(state.match)
+        return out
+
+    def next_wake(self, now: Optional[float] = None) -> float:
+        """Segundos até o próximo jogo vencer (ou até o orçamento liberar uma visita)."""
+        now = now or time.time()
+        while self._heap:
+            _, version, gid = self._heap[0]
+            state = self.states.get(gid)
+            if state is None or state.version != version or state.inflight:
+                heapq.heappop(self._heap)
+                continue
+            wait = self._heap[0][0] - now
+            self._refill()
+            if self.tokens < self.pages_per_visit:
+                wait = max(wait, (self.pages_per_visit - self.tokens) / self.rate)
+            return max(0.0, wait)
+        return float("inf")
+
+    # ── Métricas ───────────────────────────────────────────────────────────────
+    def stats_line(self, now: Optional[float] = None) -> str:
+        now = now or time.time()
+        waiting = [s for s in self.states.values() if not s.inflight]
+        hot  = sum(1 for s in waiting if s.interval and s.interval <= 15)
+        cold = sum(1 for s in waiting if s.interval >= 300)
+        overdue = sum(1 for s in waiting if s.due < now - 5)
+        visits = self.metrics["visits"]
+        late = self.metrics["lateness_sum"] / visits if visits else 0.0
+        return (
+            f"[SCHED] {len(self.states)} jogos | em visita {len(self.states) - len(waiting)} | "
+            f"quentes {hot} | frios {cold} | atrasados {overdue} | visitas {visits} | "
+            f"atraso médio {late:.1f}s | espera por orçamento {self.metrics['budget_waits']} | "
+            f"orçamento {self.rate * 60:.0f} pág/min"
+        )
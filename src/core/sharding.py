@@ -0,0 +1,193 @@
+"""
+sharding.py — Scraping Distribuído em Processos (v1.0)
+
+Um processo Python = um Chromium + um event loop. No modo supervisor o
+processo principal mantém o poller, a IA e o Telegram, e reparte os
+game_ids entre N processos worker (cada um com seu próprio navegador):
+  - HashRing: hashing consistente com nós virtuais → o mesmo jogo cai
+    sempre no mesmo worker, e reiniciar um worker não embaralha os demais
+  - ShardSupervisor: sobe os workers (multiprocessing "spawn"), envia
+    tarefas por filas IPC locais e devolve os resultados como futures
+    asyncio; workers mortos são recriados e suas tarefas falham na hora
+"""
+
+import asyncio
+import hashlib
+import itertools
+import multiprocessing as mp
+import threading
+import time
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional
+
+from ..config import SHARD_VNODES, SHARD_TASK_TIMEOUT_SEC
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Anel de hashing consistente com `vnodes` réplicas por nó."""
+
+    def __init__(self, nodes: List[str], vnodes: int = SHARD_VNODES):
+        self.vnodes = vnodes
+        self._ring: List[tuple] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str):
+        for v in range(self.vnodes):
+            self._ring.append((_hash(f"{node}#{v}"), node))
+        self._ring.sort()
+        self._keys = [h for h, _ in self._ring]
+
+    def remove(self, node: str):
+        self._ring = [(h, n) for h, n in self._ring if n != node]
+        self._keys = [h for h, _ in self._ring]
+
+    def node_for(self, key: str) -> str:
+        if not self._ring:
+            raise ValueError("HashRing vazio")
+        pos = bisect_right(self._keys, _hash(str(key))) % len(self._ring)
+        return self._ring[pos][1]
+
+
+class ShardSupervisor:
+    """
+    Uso:
+        sup = ShardSupervisor(4, worker_target)   # worker_target(idx, in_q, out_q)
+        sup.start()
+        result = await sup.submit(game_id, payload)
+        await sup.stop()
+
+    O worker lê dicts {"req_id", "payload"} de `in_q` (None = encerrar) e
+    responde em `out_q` com dicts contendo o mesmo "req_id" (opcional:
+    "status", linha de estado do worker exibida nas métricas).
+    """
+
+    def __init__(self, n_workers: int, target: Callable, task_timeout: float = SHARD_TASK_TIMEOUT_SEC):
+        self.n_workers    = n_workers
+        self.target       = target
+        self.task_timeout = task_timeout
+        self.ctx          = mp.get_context("spawn")
+        self.out_q        = self.ctx.Queue()
+        self.ring         = HashRing([str(i) for i in range(n_workers)])
+
+        self.procs: Dict[int, mp.Process] = {}
+        self.in_qs: Dict[int, mp.Queue] = {}
+        self._pending: Dict[int, tuple] = {}   # req_id → (future, worker)
+        self._seq     = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self.metrics  = {
+            i: {"sent": 0, "ok": 0, "failed": 0, "timeouts": 0, "restarts": 0, "busy_s": 0.0}
+            for i in range(n_workers)
+        }
+        self.status: Dict[int, str] = {}   # Última linha de status enviada pelo worker
+
+    # ── Ciclo de vida ──────────────────────────────────────────────────────────
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        for i in range(self.n_workers):
+            self._spawn(i)
+        self._reader = threading.Thread(target=self._read_results, name="shard-reader", daemon=True)
+        self._reader.start()
+
+    def _spawn(self, idx: int):
+        in_q = self.ctx.Queue()
+        proc = self.ctx.Process(target=self.target, args=(idx, in_q, self.out_q), name=f"kairos-shard-{idx}", daemon=True)
+        proc.start()
+        self.procs[idx] = proc
+        self.in_qs[idx] = in_q
+        print(f"[*] [SHARD] Worker {idx} iniciado (pid {proc.pid}).")
+
+    async def stop(self, timeout: float = 15.0):
+        for in_q in self.in_qs.values():
+            in_q.put(None)
+        deadline = time.monotonic() + timeout
+        for proc in self.procs.values():
+            await asyncio.to_thread(proc.join, max(0.1, deadline - time.monotonic()))
+            if proc.is_alive():
+                proc.terminate()
+        self.out_q.put(None)
+        for fut, _ in self._pending.values():
+            if not fut.done():
+                fut.set_result(None)
+        self._pending.clear()
+
+    def check_workers(self):
+        """Recria workers que morreram (crash do Chromium, OOM) e falha suas tarefas."""
+        for idx, proc in list(self.procs.items()):
+            if proc.is_alive():
+                continue
+            print(f"[!] [SHARD] Worker {idx} caiu (exit {proc.exitcode}). Reiniciando...")
+            for req_id, (fut, w) in list(self._pending.items()):
+                if w == idx:
+                    self._pending.pop(req_id)
+                    self.metrics[idx]["failed"] += 1
+                    if not fut.done():
+                        fut.set_result(None)
+            self.metrics[idx]["restarts"] += 1
+            self._spawn(idx)
+
+    # ── Tarefas ────────────────────────────────────────────────────────────────
+    async def submit(self, key: str, payload: Dict) -> Optional[Dict]:
+        """Envia `payload` ao worker dono de `key` e aguarda a resposta (None em falha/timeout)."""
+        idx = int(self.ring.node_for(key))
+        if not self.procs[idx].is_alive():
+            self.check_workers()
+
+        req_id = next(self._seq)
+        fut = self._loop.create_future()
+        self._pending[req_id] = (fut, idx)
+        self.metrics[idx]["sent"] += 1
+        self.in_qs[idx].put({"req_id": req_id, "payload": payload})
+
+        try:
+            return await asyncio.wait_for(fut, timeout=self.task_timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(req_id, None)
+            self.metrics[idx]["timeouts"] += 1
+            print(f"    [!] [SHARD] Timeout ({self.task_timeout}s) no worker {idx} para {key}.")
+            return None
+
+    def _read_results(self):
+        while True:
+            try:
+                msg = self.out_q.get()
+            except (EOFError, OSError):
+                return
+            if msg is None:
+                return
+            self._loop.call_soon_threadsafe(self._resolve, msg)
+
+    def _resolve(self, msg: Dict):
+        entry = self._pending.pop(msg.get("req_id"), None)
+        if entry is None:
+            return  # Já expirou
+        fut, idx = entry
+        m = self.metrics[idx]
+        m["ok" if msg.get("ok") else "failed"] += 1
+        m["busy_s"] += msg.get("elapsed", 0.0)
+        if msg.get("status"):
+            self.status[idx] = msg["status"]
+        if not fut.done():
+            fut.set_result(msg)
+
+    # ── Métricas ───────────────────────────────────────────────────────────────
+    def stats_lines(self) -> List[str]:
+        lines = []
+        for idx in range(self.n_workers):
+            m = self.metrics[idx]
+            proc = self.procs.get(idx)
+            done = m["ok"] + m["failed"]
+            lines.append(
+                f"[SHARD] w{idx} pid {proc.pid if proc else '-'} {'vivo' if proc and proc.is_alive() else 'morto'} | "
+                f"enviadas {m['sent']} ok {m['ok']} falhas {m['failed']} timeouts {m['timeouts']} | "
+                f"média {m['busy_s'] / done if done else 0:.1f}s | restarts {m['restarts']}"
+            )
+            if idx in self.status:
+                lines.append(f"        w{idx} {self.status[idx]}")
+        lines.append(f"[SHARD] Em andamento: {len(self._pending)}")
+        return lines
@@ -0,0 +1,270 @@
+"""
+snapshot_codec.py — Compressão dos Snapshots do kairos.db (v1.0)
+
+market_data (match + page_data + fluxo do Excapper) é JSON muito repetitivo:
+as mesmas chaves, tabelas e nomes de mercado em todo snapshot. Aqui:
+  - encode/decode: JSON compacto + zlib, opcionalmente com um dicionário
+    compartilhado (zdict) — cada linha continua decodificável sozinha
+  - train_dict: monta o dicionário a partir dos snapshots recentes
+    (trechos de maior frequência entre documentos, os mais úteis no fim,
+    onde o deflate os alcança com as menores distâncias)
+  - CLI: estatísticas do banco, treino, recompressão e benchmark de
+    gravação/leitura (JSON texto × zlib × zlib + dicionário)
+
+O dicionário fica em kairos.db (snapshot_dicts) e cada snapshot guarda o id
+do dicionário com que foi gravado; KairosDB descomprime na leitura.
+
+Uso:
+  python -m src.core.snapshot_codec stats                 # taxa de compressão e leitura
+  python -m src.core.snapshot_codec train                 # novo dicionário (gravações seguintes)
+  python -m src.core.snapshot_codec recompress --vacuum   # regrava o histórico com o dicionário atual
+  python -m src.core.snapshot_codec bench --limit 500     # gravação/leitura por formato
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional
+
+from ..config import DB_FILE, SNAPSHOT_ZLIB_LEVEL, SNAPSHOT_DICT_SIZE, SNAPSHOT_DICT_SAMPLES
+
+
+# Treino: k-mers contados por documento, trechos candidatos de SEGMENT bytes
+KMER = 8
+SEGMENT = 64
+TRAIN_MAX_BYTES = 4 * 1024 * 1024   # Corta o treino em ~4 MB de amostras
+
+
+def dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode(obj, zdict: Optional[bytes] = None, level: int = SNAPSHOT_ZLIB_LEVEL) -> bytes:
+    if zdict:
+        comp = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9, zlib.Z_DEFAULT_STRATEGY, zdict)
+    else:
+        comp = zlib.compressobj(level)
+    return comp.compress(dumps(obj)) + comp.flush()
+
+
+def inflate(blob: bytes, zdict: Optional[bytes] = None) -> bytes:
+    decomp = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return decomp.decompress(blob) + decomp.flush()
+
+
+def decode(blob: bytes, zdict: Optional[bytes] = None):
+    return json.loads(inflate(blob, zdict))
+
+
+def train_dict(samples: List[bytes], size: int = SNAPSHOT_DICT_SIZE) -> bytes:
+    """
+    Dicionário para zlib a partir de documentos de exemplo (JSON serializado por dumps).
+    Versão simplificada do COVER do zstd: pontua trechos de SEGMENT bytes pela soma
+    da frequência (em quantos documentos aparece) de seus k-mers e junta os melhores
+    até `size`, pulando trechos cujos k-mers já estão cobertos.
+    """
+    budget, picked = 0, []
+    for s in samples:
+        if budget >= TRAIN_MAX_BYTES:
+            break
+        picked.append(s)
+        budget += len(s)
+    if len(picked) < 2:
+        return b""
+
+    df = Counter()
+    for s in picked:
+        df.update({s[i:i + KMER] for i in range(len(s) - KMER + 1)})
+
+    segments = {}
+    for s in picked:
+        for start in range(0, len(s) - KMER + 1, SEGMENT):
+            seg = s[start:start + SEGMENT]
+            if seg in segments:
+                continue
+            score = 0
+            for j in range(len(seg) - KMER + 1):
+                n = df[seg[j:j + KMER]]
+                if n > 1:
+                    score += n
+            if score:
+                segments[seg] = score
+
+    chosen, covered, total = [], set(), 0
+    for seg, _ in sorted(segments.items(), key=lambda kv: kv[1], reverse=True):
+        kmers = {seg[j:j + KMER] for j in range(len(seg) - KMER + 1)}
+        if len(kmers & covered) * 2 > len(kmers):
+            continue
+        covered |= kmers
+        chosen.append(seg)
+        total += len(seg)
+        if total >= size:
+            break
+    # Mais frequentes no fim do dicionário: menor distância até o início do documento
+    return b"".join(reversed(chosen))[-size:]
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+def _mb(n: float) -> str:
+    return f"{n / (1024 * 1024):.2f} MB"
+
+
+def _ratio(raw: int, stored: int) -> str:
+    return f"{raw / stored:.1f}x" if stored else "-"
+
+
+def cmd_stats(db) -> Dict:
+    """Linhas, bytes gravados × JSON original por formato e velocidade de leitura do banco."""
+    kinds = {}
+    t0 = time.perf_counter()
+    for row in db.conn.execute(f"SELECT market_data_json, {db.blob_columns} FROM event_snapshots ORDER BY id"):
+        text, blob, dict_id = row
+        if blob is not None:
+            kind = "zlib + dicionário" if dict_id else "zlib"
+            stored = len(blob)
+            data = inflate(blob, db.zdict(dict_id))
+        else:
+            kind = "json"
+            data = (text or "{}").encode("utf-8")
+            stored = len(data)
+        json.loads(data)
+        raw = len(data)
+        k = kinds.setdefault(kind, {"rows": 0, "stored": 0, "raw": 0})
+        k["rows"] += 1
+        k["stored"] += stored
+        k["raw"] += raw
+    elapsed = time.perf_counter() - t0
+
+    rows = sum(k["rows"] for k in kinds.values())
+    raw = sum(k["raw"] for k in kinds.values())
+    stored = sum(k["stored"] for k in kinds.values())
+    print(f"[*] [SNAPSHOTS] {db.path} ({_mb(os.path.getsize(db.path))} em disco)")
+    for kind, k in kinds.items():
+        print(f"   {kind:<18} {k['rows']:>7} linhas | {_mb(k['stored']):>10} gravados | "
+              f"{_mb(k['raw']):>10} JSON | {_ratio(k['raw'], k['stored']):>6}")
+    print(f"   {'total':<18} {rows:>7} linhas | {_mb(stored):>10} gravados | {_mb(raw):>10} JSON | "
+          f"{_ratio(raw, stored):>6}")
+    if rows:
+        print(f"   leitura + decodificação: {rows / elapsed:.0f} snapshots/s | {_mb(raw / elapsed)}/s de JSON")
+    print(f"   dicionário atual: {db.dict_id or 'nenhum'}")
+    return {"rows": rows, "raw": raw, "stored": stored, "kinds": kinds}
+
+
+def _samples(db, limit: int) -> List[Dict]:
+    return [snap["market_data"] for snap in db.iter_snapshots(limit=limit)]
+
+
+def cmd_train(db, samples: int, dry_run: bool) -> int:
+    docs = _samples(db, samples)
+    if len(docs) < 10:
+        print(f"[!] Só {len(docs)} snapshot(s) no banco: poucos para treinar o dicionário.")
+        return 0
+    # 80% treina, 20% mede o ganho
+    cut = max(1, int(len(docs) * 0.8))
+    train, test = [dumps(d) for d in docs[:cut]], docs[cut:] or docs[:cut]
+    t0 = time.perf_counter()
+    zdict = train_dict(train)
+    elapsed = time.perf_counter() - t0
+    if not zdict:
+        print("[!] Dicionário vazio (amostras insuficientes).")
+        return 0
+    raw = sum(len(dumps(d)) for d in test)
+    plain = sum(len(encode(d)) for d in test)
+    with_dict = sum(len(encode(d, zdict)) for d in test)
+    print(f"[*] Dicionário de {len(zdict)} bytes treinado em {len(train)} snapshots ({elapsed:.1f}s).")
+    print(f"   validação ({len(test)} snapshots): zlib {_ratio(raw, plain)} | zlib + dicionário {_ratio(raw, with_dict)}")
+    if with_dict >= plain:
+        print("[!] O dicionário não reduz os snapshots de validação; não foi gravado.")
+        return 0
+    if dry_run:
+        return 0
+    dict_id = db.add_dict(zdict, len(train))
+    print(f"[OK] Dicionário #{dict_id} gravado: vale para os snapshots gravados a partir do próximo início do bot.")
+    return dict_id
+
+
+def cmd_recompress(db, vacuum: bool):
+    t0 = time.perf_counter()
+    n = db.recompress_snapshots()
+    print(f"[OK] {n} snapshot(s) regravados em {time.perf_counter() - t0:.1f}s (dicionário {db.dict_id or 'nenhum'}).")
+    if vacuum:
+        before = os.path.getsize(db.path)
+        db.conn.execute("VACUUM")
+        print(f"[OK] VACUUM: {_mb(before)} → {_mb(os.path.getsize(db.path))}")
+
+
+def cmd_bench(db, limit: int) -> List[Dict]:
+    """Grava e relê os mesmos snapshots em bancos temporários, um por formato."""
+    from .storage import KairosDB
+
+    docs = _samples(db, limit)
+    if not docs:
+        print(f"[!] Nenhum snapshot em {db.path} para o benchmark.")
+        return []
+    zdict = db.zdict(db.dict_id) if db.dict_id else train_dict([dumps(d) for d in docs])
+    raw = sum(len(dumps(d)) for d in docs)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("json", "zlib", "zlib + dicionário"):
+            path = os.path.join(tmp, f"{mode.split()[0]}_{len(results)}.db")
+            target = KairosDB(path, compress=(mode != "json"))
+            if mode == "zlib + dicionário":
+                target.add_dict(zdict, len(docs))
+            t0 = time.perf_counter()
+            for i, md in enumerate(docs):
+                target.save_snapshot(str(i), "", "", md)
+            write = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            n = sum(1 for _ in target.iter_snapshots())
+            read = time.perf_counter() - t0
+            target.close()
+            size = os.path.getsize(path)
+            results.append({"mode": mode, "snapshots": n, "file_bytes": size,
+                            "write_per_sec": n / write, "read_per_sec": n / read,
+                            "write_mb_s": raw / write / 1048576, "read_mb_s": raw / read / 1048576})
+
+    print(f"[*] [SNAPSHOTS] {len(docs)} snapshots ({_mb(raw)} de JSON), gravados um a um como no fluxo:")
+    for r in results:
+        print(f"   {r['mode']:<18} arquivo {_mb(r['file_bytes']):>10} ({_ratio(raw, r['file_bytes']):>5}) | "
+              f"gravação {r['write_per_sec']:>7.0f}/s {r['write_mb_s']:>6.1f} MB/s | "
+              f"leitura {r['read_per_sec']:>7.0f}/s {r['read_mb_s']:>6.1f} MB/s")
+    return results
+
+
+def _cli():
+    from .storage import KairosDB
+
+    parser = argparse.ArgumentParser(description="Kairos — compressão dos snapshots (kairos.db)")
+    parser.add_argument("command", choices=["stats", "train", "recompress", "bench"])
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--samples", type=int, default=SNAPSHOT_DICT_SAMPLES,
+                        help="Snapshots recentes usados no treino")
+    parser.add_argument("--limit", type=int, default=500, help="Snapshots usados no benchmark")
+    parser.add_argument("--dry-run", action="store_true", help="Treina e mede sem gravar o dicionário")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM após recompress (devolve o espaço)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"[!] {args.db} não existe.")
+        raise SystemExit(1)
+    db = KairosDB(args.db, readonly=args.command in ("stats", "bench"))
+    try:
+        if args.command == "stats":
+            cmd_stats(db)
+        elif args.command == "train":
+            cmd_train(db, args.samples, args.dry_run)
+        elif args.command == "recompress":
+            cmd_recompress(db, args.vacuum)
+        else:
+            cmd_bench(db, args.limit)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,117 @@
+"""
+startup.py — Cronômetro de Partida (v1.0)
+
+Marca as etapas da partida relativas ao início do processo (inclui o boot
+do interpretador, lido de /proc no Linux) e imprime o tempo até a primeira
+varredura (time-to-first-scrape) — o que importa após crash ou deploy.
+
+Etapas: imports → estado (alertas, banco, modelo, SDK da IA) → navegador
+(pré-aquecido em paralelo com o estado) → 1ª varredura.
+
+Benchmark:
+    python -m src.core.startup --mode dropping --runs 5
+Sobe o bot N vezes com KAIROS_STARTUP_BENCH=1 (encerra logo após a 1ª
+varredura) e resume mínimo/mediana/máximo de cada etapa.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+BENCH_ENV   = "KAIROS_STARTUP_BENCH"
+BENCH_TAG   = "STARTUP_BENCH "
+STAGE_NAMES = {"imports": "imports", "state": "estado", "browser": "navegador", "first_scrape": "1ª varredura"}
+
+
+def _process_age() -> float:
+    """Segundos desde que o processo nasceu (0.0 fora do Linux)."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        start_ticks = int(stat[stat.rindex(b")") + 2:].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+T0 = time.monotonic() - _process_age()
+_marks: Dict[str, float] = {}
+
+
+def mark(stage: str) -> float:
+    """Registra a etapa (só a primeira vez conta). Na 1ª varredura imprime o resumo."""
+    if stage not in _marks:
+        _marks[stage] = time.monotonic() - T0
+        if stage == "first_scrape":
+            _report()
+    return _marks[stage]
+
+
+def elapsed(stage: str) -> Optional[float]:
+    return _marks.get(stage)
+
+
+def _report():
+    parts = [f"{STAGE_NAMES.get(k, k)} {v:.2f}s" for k, v in _marks.items()]
+    print(f"[OK] [STARTUP] {' | '.join(parts)}")
+    if os.getenv(BENCH_ENV) == "1":
+        print(BENCH_TAG + json.dumps(_marks), flush=True)
+        raise SystemExit(0)   # Sobe pelos finally/async with: navegador fecha normalmente
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+def run_once(mode: str, timeout: float) -> Dict:
+    env = dict(os.environ, **{BENCH_ENV: "1"})
+    t0 = time.monotonic()
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", "src.main", "--mode", mode],
+            env=env, capture_output=True, text=True, timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout ({timeout:.0f}s)"}
+    wall = time.monotonic() - t0
+    for line in proc.stdout.splitlines():
+        if line.startswith(BENCH_TAG):
+            return dict(json.loads(line[len(BENCH_TAG):]), wall=wall)
+    tail = (proc.stderr or proc.stdout).strip().splitlines()[-3:]
+    return {"error": " / ".join(tail) or f"saiu com código {proc.returncode}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de partida (time-to-first-scrape)")
+    parser.add_argument("--mode", default="dropping", choices=["dropping", "legacy", "both"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Limite por execução (s)")
+    args = parser.parse_args()
+
+    results = []
+    for i in range(args.runs):
+        r = run_once(args.mode, args.timeout)
+        if "error" in r:
+            print(f"[!] Execução {i + 1}: {r['error']}")
+            continue
+        print(f"[*] Execução {i + 1}: 1ª varredura {r['first_scrape']:.2f}s (parede {r['wall']:.2f}s)")
+        results.append(r)
+
+    if not results:
+        print("[X] Nenhuma execução chegou à 1ª varredura.")
+        sys.exit(1)
+
+    print(f"\n[OK] {args.mode} — {len(results)}/{args.runs} execuções (mín / mediana / máx)")
+    for stage in list(STAGE_NAMES) + ["wall"]:
+        values = [r[stage] for r in results if stage in r]
+        if values:
+            label = STAGE_NAMES.get(stage, "parede")
+            print(f"   {label:<14} {min(values):6.2f}s {statistics.median(values):6.2f}s {max(values):6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+storage.py — Persistência de Snapshots do Kairos (v1.0)
+
+Grava em data/kairos.db cada jogo que chega ao gatilho da IA:
+  - dados brutos do DroppingOdds (match + page_data) e do Excapper
+  - veredito da IA (quando houve chamada)
+É a base para treino offline do pré-score e para replays históricos.
+Também guarda as threads de alerta (message_id do Telegram por jogo/chat)
+e os vínculos confirmados do mesmo jogo entre fontes (match_links).
+
+market_data é gravado comprimido (core/snapshot_codec.py: zlib, com o
+dicionário compartilhado mais recente de snapshot_dicts, se houver) em
+market_data_blob; linhas antigas em JSON texto continuam legíveis.
+"""
+
+import json
+import os
+import sqlite3
+import zlib
+from typing import Dict, Iterator, Optional
+
+from . import snapshot_codec
+from ..config import DB_FILE, SNAPSHOT_COMPRESS
+
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS matches (
+        id TEXT PRIMARY KEY,
+        name TEXT,
+        last_score TEXT,
+        final_score TEXT,
+        status TEXT DEFAULT 'live', -- live, finished
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS event_snapshots (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_id TEXT,
+        live_score TEXT,
+        market_data_json TEXT, -- JSON completo tratado (gravações sem compressão)
+        ai_analysis_json TEXT,
+        intensity_level TEXT, -- Red2, Red3
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        market_data_blob BLOB, -- market_data em zlib (core/snapshot_codec.py)
+        dict_id INTEGER,       -- 0 = zlib sem dicionário; N = snapshot_dicts.id
+        FOREIGN KEY (match_id) REFERENCES matches (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS snapshot_dicts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        zdict BLOB,
+        samples INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS alert_threads (
+        thread_key TEXT,
+        chat_id TEXT,
+        message_id INTEGER,
+        first_sent_at REAL,
+        last_update_at REAL,
+        updates INTEGER DEFAULT 0,
+        last_state_json TEXT, -- resumo do último alerta (base do delta)
+        PRIMARY KEY (thread_key, chat_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS match_links (
+        source TEXT,          -- droppingodds, excapper, betfair
+        source_id TEXT,
+        match_key TEXT,       -- mesmo jogo = mesma chave em todas as fontes
+        teams TEXT,
+        confirmed_at REAL,
+        PRIMARY KEY (source, source_id)
+    )
+    """,
+)
+
+# Colunas acrescentadas depois da criação do banco: (tabela, coluna, tipo)
+MIGRATIONS = (
+    ("event_snapshots", "market_data_blob", "BLOB"),
+    ("event_snapshots", "dict_id", "INTEGER"),
+)
+
+
+def intensity_from_drops(drops: list) -> str:
+    """Resume os sinais de classe do DroppingOdds em 'Red3', 'Red2' ou ''."""
+    signals = {s for d in drops for s in d.get("signals", [])}
+    if "CRITICAL_DROP_RED3" in signals:
+        return "Red3"
+    if "STRONG_DROP_RED2" in signals:
+        return "Red2"
+    return ""
+
+
+class KairosDB:
+    """Acesso mínimo ao SQLite do Kairos (matches, event_snapshots, alert_threads, match_links)."""
+
+    def __init__(self, path: str = DB_FILE, compress: bool = SNAPSHOT_COMPRESS, readonly: bool = False):
+        self.path = path
+        self.compress = compress
+        if readonly:
+            # Somente leitura (backtest, benchmarks): não cria tabelas nem migra o banco
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.conn = sqlite3.connect(path)
+            for stmt in SCHEMA:
+                self.conn.execute(stmt)
+            for table, column, kind in MIGRATIONS:
+                if column not in self._columns(table):
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+            self.conn.commit()
+        self.conn.row_factory = sqlite3.Row
+
+        # Banco antigo aberto somente leitura: sem as colunas comprimidas
+        self.blob_columns = (
+            "market_data_blob, dict_id" if "market_data_blob" in self._columns("event_snapshots")
+            else "NULL AS market_data_blob, NULL AS dict_id"
+        )
+        self._dicts: Dict[int, bytes] = {}
+        self.dict_id = 0
+        if "zdict" in self._columns("snapshot_dicts"):
+            row = self.conn.execute("SELECT id, zdict FROM snapshot_dicts ORDER BY id DESC LIMIT 1").fetchone()
+            if row:
+                self.dict_id = row[0]
+                self._dicts[row[0]] = bytes(row[1])
+
+    def _columns(self, table: str) -> set:
+        return {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+
+    # ── Compressão do market_data (core/snapshot_codec.py) ───────────────────
+    def zdict(self, dict_id: Optional[int]) -> Optional[bytes]:
+        if not dict_id:
+            return None
+        if dict_id not in self._dicts:
+            row = self.conn.execute("SELECT zdict FROM snapshot_dicts WHERE id = ?", (dict_id,)).fetchone()
+            if not row:
+                raise ValueError(f"dicionário de snapshots #{dict_id} ausente")
+            self._dicts[dict_id] = bytes(row[0])
+        return self._dicts[dict_id]
+
+    def add_dict(self, zdict: bytes, samples: int) -> int:
+        """Grava um dicionário novo; os snapshots seguintes passam a usá-lo."""
+        cur = self.conn.execute("INSERT INTO snapshot_dicts (zdict, samples) VALUES (?, ?)", (zdict, samples))
+        self.conn.commit()
+        self.dict_id = cur.lastrowid
+        self._dicts[self.dict_id] = zdict
+        return self.dict_id
+
+    def _encode_market_data(self, market_data: Dict) -> tuple:
+        """(market_data_json, market_data_blob, dict_id) conforme a configuração."""
+        if not self.compress:
+            return json.dumps(market_data, ensure_ascii=False), None, None
+        return None, snapshot_codec.encode(market_data, self.zdict(self.dict_id)), self.dict_id
+
+    def _decode_market_data(self, row) -> Dict:
+        if row["market_data_blob"] is not None:
+            return snapshot_codec.decode(row["market_data_blob"], self.zdict(row["dict_id"]))
+        return json.loads(row["market_data_json"] or "{}")
+
+    def save_snapshot(
+        self,
+        match_id: str,
+        match_name: str,
+        live_score: str,
+        market_data: Dict,
+        ai_analysis: Optional[Dict] = None,
+        intensity_level: str = "",
+    ) -> int:
+        """Registra o jogo (upsert) e grava um snapshot. Retorna o id do snapshot."""
+        self.conn.execute(
+            "INSERT INTO matches (id, name, last_score) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET last_score = excluded.last_score",
+            (match_id, match_name, live_score),
+        )
+        md_json, md_blob, dict_id = self._encode_market_data(market_data)
+        cur = self.conn.execute(
+            "INSERT INTO event_snapshots "
+            "(match_id, live_score, market_data_json, ai_analysis_json, intensity_level, market_data_blob, dict_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                match_id,
+                live_score,
+                md_json,
+                json.dumps(ai_analysis, ensure_ascii=False) if ai_analysis is not None else None,
+                intensity_level,
+                md_blob,
+                dict_id,
+            ),
+        )
+        self.conn.commit()
+        return cur.lastrowid
+
+    def iter_snapshots(self, only_analyzed: bool = False, limit: int = 0) -> Iterator[Dict]:
+        """
+        Percorre os snapshots gravados em ordem cronológica (market_data já
+        descomprimido). `limit`: só os N mais recentes.
+
+        Cada item: {"id", "match_id", "live_score", "market_data", "ai_analysis",
+                    "intensity_level", "created_at"}
+        """
+        query = (
+            "SELECT id, match_id, live_score, market_data_json, ai_analysis_json, "
+            f"intensity_level, created_at, {self.blob_columns} FROM event_snapshots"
+        )
+        if only_analyzed:
+            query += " WHERE ai_analysis_json IS NOT NULL"
+        if limit:
+            query = f"SELECT * FROM ({query} ORDER BY id DESC LIMIT {int(limit)})"
+        query += " ORDER BY id"
+
+        for row in self.conn.execute(query):
+            try:
+                market_data = self._decode_market_data(row)
+                ai_analysis = json.loads(row["ai_analysis_json"]) if row["ai_analysis_json"] else None
+            except (ValueError, TypeError, zlib.error):
+                continue
+            yield {
+                "id":              row["id"],
+                "match_id":        row["match_id"],
+                "live_score":      row["live_score"],
+                "market_data":     market_data,
+                "ai_analysis":     ai_analysis,
+                "intensity_level": row["intensity_level"],
+                "created_at":      row["created_at"],
+            }
+
+    def recompress_snapshots(self, batch: int = 500) -> int:
+        """Regrava os snapshots que não estão no formato atual (compressão/dicionário)."""
+        target = self.dict_id if self.compress else None
+        ids = [row[0] for row in self.conn.execute(
+            "SELECT id FROM event_snapshots WHERE dict_id IS NOT ?", (target,)
+        )]
+        for start in range(0, len(ids), batch):
+            chunk = ids[start:start + batch]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT id, market_data_json, {self.blob_columns} FROM event_snapshots WHERE id IN ({marks})", chunk
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE event_snapshots SET market_data_json = ?, market_data_blob = ?, dict_id = ? WHERE id = ?",
+                [(*self._encode_market_data(self._decode_market_data(row)), row["id"]) for row in rows],
+            )
+            self.conn.commit()
+        return len(ids)
+
+    # ── Threads de alerta (coalescência no Telegram) ─────────────────────────
+    def get_alert_thread(self, thread_key: str, chat_id: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT message_id, first_sent_at, last_update_at, updates, last_state_json "
+            "FROM alert_threads WHERE thread_key = ? AND chat_id = ?",
+            (thread_key, str(chat_id)),
+        ).fetchone()
+        if not row:
+            return None
+        return {
+            "message_id":     row["message_id"],
+            "first_sent_at":  row["first_sent_at"],
+            "last_update_at": row["last_update_at"],
+            "updates":        row["updates"],
+            "last_state":     json.loads(row["last_state_json"] or "{}"),
+        }
+
+    def start_alert_thread(self, thread_key: str, chat_id: str, message_id: int, state: Dict, now: float):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO alert_threads "
+            "(thread_key, chat_id, message_id, first_sent_at, last_update_at, updates, last_state_json) "
+            "VALUES (?, ?, ?, ?, ?, 0, ?)",
+            (thread_key, str(chat_id), message_id, now, now, json.dumps(state, ensure_ascii=False)),
+        )
+        self.conn.commit()
+
+    def update_alert_thread(self, thread_key: str, chat_id: str, state: Dict, now: float):
+        self.conn.execute(
+            "UPDATE alert_threads SET last_update_at = ?, updates = updates + 1, last_state_json = ? "
+            "WHERE thread_key = ? AND chat_id = ?",
+            (now, json.dumps(state, ensure_ascii=False), thread_key, str(chat_id)),
+        )
+        self.conn.commit()
+
+    # ── Identidade de jogos entre fontes (core/identity.py) ──────────────────
+    def load_match_links(self) -> Iterator[Dict]:
+        for row in self.conn.execute("SELECT source, source_id, match_key, teams FROM match_links"):
+            yield dict(row)
+
+    def save_match_links(self, match_key: str, refs: list, teams: str, now: float):
+        """Grava (ou move para `match_key`) cada (fonte, id) de `refs`."""
+        self.conn.executemany(
+            "INSERT INTO match_links (source, source_id, match_key, teams, confirmed_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(source, source_id) DO UPDATE SET match_key = excluded.match_key, "
+            "teams = COALESCE(NULLIF(excluded.teams, ''), match_links.teams), confirmed_at = excluded.confirmed_at",
+            [(source, str(source_id), match_key, teams, now) for source, source_id in refs],
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,273 @@
+"""
+subscriptions.py — Registro de Assinantes e Fan-out de Alertas (v1.0)
+
+Cada alerta é casado contra os filtros de todos os assinantes através de
+um índice pré-computado (bitmasks por dimensão), não por varredura linear:
+  - dimensões categóricas (tier, veredito, tabela): valor → bitmask + curinga
+  - dimensões numéricas (confiança mínima, drop mínimo): limiares ordenados
+    com máscaras prefixadas — bisect devolve todos com limiar <= valor
+O resultado é o AND das máscaras; a entrega sai de forma assíncrona para
+chats Telegram, webhooks HTTP e um sink JSONL local.
+
+data/subscriptions.json (ausente → um assinante Telegram sem filtros):
+[
+  {"id": "vip", "sink": "telegram", "target": "-100123",
+   "filters": {"tiers": ["OCEAN"], "verdicts": ["SHARP_ACTION"], "min_confidence": 7}},
+  {"id": "quant", "sink": "webhook", "target": "https://example.com/hook",
+   "filters": {"tables": ["Total", "HT Total"], "min_drop": 10}},
+  {"id": "arquivo", "sink": "jsonl"}
+]
+"""
+
+import asyncio
+import json
+import os
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+
+from .utils import load_json
+from .notifier import TelegramNotifier
+from .alert_threads import AlertThreads
+from ..config import SUBSCRIPTIONS_FILE, ALERTS_JSONL_FILE, WEBHOOK_TIMEOUT_SEC, TELEGRAM_CHAT_ID, BASE_DIR
+
+
+SINKS = ("telegram", "webhook", "jsonl")
+
+# Dimensões categóricas: filtro no assinante → chave no alerta
+CATEGORICAL = {"tiers": "tier", "verdicts": "verdict", "tables": "tables"}
+# Dimensões numéricas: filtro no assinante → chave no alerta
+NUMERIC = {"min_confidence": "confidence", "min_drop": "max_drop"}
+
+# Mercados do Excapper (fluxo legado) → tabela do DroppingOdds, para o filtro "tables"
+MARKET_TABLES = {"MATCH ODDS": "1X2", "MATCH RESULT": "1X2", "HALF TIME": "HT 1X2"}
+MARKET_TABLE_PREFIXES = (("FIRST HALF GOALS", "HT Total"), ("OVER/UNDER", "Total"), ("ASIAN HANDICAP", "Handicap"))
+
+
+def market_table(market: str) -> str:
+    """'Over/Under 2.5 Goals' → 'Total'. Mercado sem tabela equivalente (ex.: Correct Score) fica com o nome."""
+    name = market.strip().upper()
+    if name in MARKET_TABLES:
+        return MARKET_TABLES[name]
+    for prefix, table in MARKET_TABLE_PREFIXES:
+        if name.startswith(prefix):
+            return table
+    return market
+
+
+def load_subscribers(path: str = SUBSCRIPTIONS_FILE) -> List[Dict]:
+    """Lê o registro de assinantes; sem arquivo, mantém o comportamento antigo (1 chat)."""
+    subs = load_json(path) if os.path.exists(path) else []
+    if not isinstance(subs, list) or not subs:
+        return [{"id": "default", "sink": "telegram", "target": TELEGRAM_CHAT_ID, "filters": {}}]
+
+    valid = []
+    for i, sub in enumerate(subs):
+        if isinstance(sub, dict) and sub.get("sink") == "jsonl":
+            sub.setdefault("target", ALERTS_JSONL_FILE)
+        if not isinstance(sub, dict) or sub.get("sink") not in SINKS or not sub.get("target"):
+            print(f"[!] Assinante #{i} inválido em {path}: {sub}")
+            continue
+        sub.setdefault("id", f"sub{i}")
+        sub.setdefault("filters", {})
+        valid.append(sub)
+    return valid
+
+
+class SubscriptionIndex:
+    """Índice de filtros: `match(alert)` devolve os assinantes cujo filtro aceita o alerta."""
+
+    def __init__(self, subscribers: List[Dict]):
+        self.subscribers = subscribers
+        self.all_bits = (1 << len(subscribers)) - 1
+
+        # Categóricas: {dim: (curinga, {VALOR: bits})}
+        self.categorical = {}
+        for fkey in CATEGORICAL:
+            wildcard, by_value = 0, {}
+            for i, sub in enumerate(subscribers):
+                values = sub["filters"].get(fkey)
+                if not values:
+                    wildcard |= 1 << i
+                    continue
+                for v in values:
+                    v = str(v).upper()
+                    by_value[v] = by_value.get(v, 0) | (1 << i)
+            self.categorical[fkey] = (wildcard, by_value)
+
+        # Numéricas: {dim: (limiares_ordenados, máscaras_prefixadas)}
+        self.numeric = {}
+        for fkey in NUMERIC:
+            pairs = sorted(
+                (float(sub["filters"].get(fkey, float("-inf"))), i) for i, sub in enumerate(subscribers)
+            )
+            thresholds, prefix, acc = [], [], 0
+            for th, i in pairs:
+                acc |= 1 << i
+                thresholds.append(th)
+                prefix.append(acc)
+            self.numeric[fkey] = (thresholds, prefix)
+
+    def match_bits(self, alert: Dict) -> int:
+        bits = self.all_bits
+        for fkey, akey in CATEGORICAL.items():
+            wildcard, by_value = self.categorical[fkey]
+            values = alert.get(akey)
+            if isinstance(values, (list, set, tuple)):
+                dim = wildcard
+                for v in values:
+                    dim |= by_value.get(str(v).upper(), 0)
+            else:
+                dim = wildcard | by_value.get(str(values).upper(), 0)
+            bits &= dim
+            if not bits:
+                return 0
+
+        for fkey, akey in NUMERIC.items():
+            thresholds, prefix = self.numeric[fkey]
+            try:
+                value = float(alert.get(akey, 0) or 0)
+            except (ValueError, TypeError):
+                value = 0.0
+            pos = bisect_right(thresholds, value)
+            bits &= prefix[pos - 1] if pos else 0
+            if not bits:
+                return 0
+        return bits
+
+    def match(self, alert: Dict) -> List[Dict]:
+        bits = self.match_bits(alert)
+        out = []
+        while bits:
+            low = bits & -bits
+            out.append(self.subscribers[low.bit_length() - 1])
+            bits ^= low
+        return out
+
+
+class AlertFanout:
+    """
+    Entrega assíncrona de um alerta a todos os assinantes compatíveis.
+    `on_delivered` dispara na primeira entrega bem-sucedida; `on_failed`
+    só quando todos os destinos falham.
+    """
+
+    def __init__(self, notifier: TelegramNotifier, threads: Optional[AlertThreads] = None,
+                 subscribers: Optional[List[Dict]] = None):
+        self.notifier = notifier
+        self.threads  = threads
+        self.index    = SubscriptionIndex(subscribers if subscribers is not None else load_subscribers())
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._tasks   = set()
+        self.metrics  = {"alerts": 0, "unmatched": 0, "webhook_ok": 0, "webhook_fail": 0, "jsonl": 0}
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=WEBHOOK_TIMEOUT_SEC))
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.session.close()
+
+    def dispatch(
+        self,
+        alert: Dict,
+        text: str,
+        payload: Dict,
+        thread_key: Optional[str] = None,
+        state: Optional[Dict] = None,
+        delta_builder: Optional[Callable] = None,
+        on_delivered: Optional[Callable] = None,
+        on_failed: Optional[Callable] = None,
+    ) -> int:
+        """
+        `alert`: chaves de filtro (tier, verdict, confidence, tables, max_drop)
+        `text`: mensagem HTML (Telegram) · `payload`: JSON (webhook/jsonl)
+        Retorna quantos destinos receberam o alerta.
+        """
+        subs = self.index.match(alert)
+        self.metrics["alerts"] += 1
+        if not subs:
+            self.metrics["unmatched"] += 1
+            return 0
+
+        pending = {"left": len(subs), "done": False}
+
+        def _ok(_result=None):
+            pending["left"] -= 1
+            if not pending["done"]:
+                pending["done"] = True
+                if on_delivered:
+                    on_delivered(_result)
+
+        def _fail(error=None):
+            pending["left"] -= 1
+            if pending["left"] == 0 and not pending["done"] and on_failed:
+                on_failed(error)
+
+        for sub in subs:
+            sink, target = sub["sink"], sub["target"]
+            if sink == "telegram":
+                if self.threads and thread_key:
+                    queued = self.threads.publish(thread_key, text, state or {}, delta_builder,
+                                                  chat_id=target, on_sent=_ok, on_failed=_fail)
+                else:
+                    queued = self.notifier.enqueue(text, chat_id=target, on_sent=_ok, on_failed=_fail)
+                if not queued:
+                    _fail("fila cheia")
+            elif sink == "webhook":
+                self._spawn(self._post_webhook(sub, payload, _ok, _fail))
+            elif sink == "jsonl":
+                self._spawn(self._append_jsonl(target, payload, _ok, _fail))
+        return len(subs)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _post_webhook(self, sub: Dict, payload: Dict, ok: Callable, fail: Callable):
+        error = None
+        for attempt in range(3):
+            try:
+                async with self.session.post(sub["target"], json=payload) as resp:
+                    if resp.status < 300:
+                        self.metrics["webhook_ok"] += 1
+                        ok()
+                        return
+                    error = f"HTTP {resp.status}"
+                    if resp.status < 500 and resp.status != 429:
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{e.__class__.__name__}: {e}"
+            await asyncio.sleep(2 ** attempt)
+        self.metrics["webhook_fail"] += 1
+        print(f"    [!] Webhook '{sub['id']}' falhou: {error}")
+        fail(error)
+
+    async def _append_jsonl(self, target: str, payload: Dict, ok: Callable, fail: Callable):
+        path = target if os.path.isabs(target) else os.path.join(BASE_DIR, target)
+        line = json.dumps(payload, ensure_ascii=False) + "\n"
+
+        def _write():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+        try:
+            await asyncio.to_thread(_write)
+            self.metrics["jsonl"] += 1
+            ok()
+        except OSError as e:
+            print(f"    [!] Sink JSONL {path} falhou: {e}")
+            fail(str(e))
+
+    def stats_line(self) -> str:
+        m = self.metrics
+        return (
+            f"[FANOUT] {len(self.index.subscribers)} assinantes | alertas {m['alerts']} | "
+            f"sem destino {m['unmatched']} | webhooks {m['webhook_ok']}/{m['webhook_ok'] + m['webhook_fail']} | "
+            f"jsonl {m['jsonl']}"
+        )
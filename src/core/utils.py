@@ -1,6 +1,5 @@
 import json
 import os
-import requests
 
 def load_json(filepath):
     """Carrega dados JSON com tratamento de erro."""
@@ -20,6 +19,7 @@ def save_json(filepath, data):
 
 def send_telegram_alert(token, chat_id, message):
     """Envia alerta formatado para o Telegram."""
+    import requests   # Só este helper usa; fora do caminho de partida
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {"chat_id": chat_id, "text": message, "parse_mode": "HTML"}
     try:
@@ -0,0 +1,28 @@
+"""
+combined_flow.py — Dropping + Legado no Mesmo Processo (v1.0)
+
+Roda os dois fluxos lado a lado sobre a mesma infraestrutura (core/infra.py):
+um único Chromium/pool de páginas, um único notificador Telegram e um cache
+do Excapper por jogo, para que a página de um jogo acompanhado pelos dois
+fluxos seja carregada uma vez só por janela de TTL.
+
+Uso: python -m src.main --mode both
+"""
+
+import asyncio
+
+from .dropping_flow import main as dropping_main, CONTEXT_OPTIONS
+from .legacy_flow import main as legacy_main
+from ..core.infra import SharedInfra
+from ..config import BROWSER_POOL_PAGES
+
+
+async def main(workers: int = 1):
+    # +2 páginas: a página principal do legado e a do SokkerPro não disputam
+    # as vagas dos estágios do dropping
+    async with SharedInfra(CONTEXT_OPTIONS, max_pages=BROWSER_POOL_PAGES + 2) as shared:
+        print("[*] Modo combinado: dropping + legado compartilhando navegador, Telegram e cache Excapper.")
+        await asyncio.gather(
+            dropping_main(workers=workers, infra=shared),
+            legacy_main(infra=shared),
+        )
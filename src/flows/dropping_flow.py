@@ -1,13 +1,15 @@
 """
 main_dropping.py — Pipeline Principal: DroppingOdds → Excapper → IA (v1.0)
 
-Fluxo completo:
-  1. Acessa dropping-odds.com e lista jogos ao vivo
+Fluxo completo (estágios ligados por filas limitadas, ver core/pipeline.py):
+  1. Acessa dropping-odds.com e lista jogos ao vivo; cada jogo volta à fila
+     conforme sua urgência (core/scheduler.py)                      (poller)
   2. Para cada jogo, navega até a página individual e extrai drops das tabelas
-     (1X2, Total, Handicap, HT Total, HT 1X2)
-  3. Se encontrar link Excapper na página, extrai o fluxo de dinheiro
-  4. Envia TODOS os dados para a IA (Gemini/DeepSeek) analisar
-  5. Gera e envia alerta profissional no Telegram
+     (1X2, Total, Handicap, HT Total, HT 1X2)                        (detalhes)
+  3. Se encontrar link Excapper na página, extrai o fluxo de dinheiro (excapper)
+  4. Monta o snapshot, deduplica e aplica o pré-score               (snapshot)
+  5. Envia TODOS os dados para a IA (Gemini/DeepSeek) analisar      (ia, em lote)
+  6. Gera e envia alerta profissional aos assinantes                (notifier)
 
 Uso: python -m src.main_dropping
 """
@@ -18,19 +20,38 @@ import os
 import re
 import time
 import hashlib
+import signal
+from typing import Optional
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright
 
-from ..core.utils import load_json, save_json, send_telegram_alert
+from ..core import metrics, startup
+from ..core.profiler import PROFILER
+from ..core.utils import load_json, save_json
+from ..core.alert_threads import AlertThreads
+from ..core.subscriptions import AlertFanout
+from ..core.pipeline import Pipeline
+from ..core.sharding import ShardSupervisor
+from ..core.browser_pool import BrowserPool
+from ..core.excapper_cache import ExcapperCache
+from ..core.infra import SharedInfra
+from ..core.identity import betfair_market_id
+from ..core.implied import ImpliedBook
+from ..core.scheduler import MatchScheduler
 from ..core.analyzer import KairosAnalyzer
 from ..scrapers.excapper import ExcapperScraper
 from ..scrapers.dropping_odds import DroppingOddsScraper, DROP_MIN_PCT, DROP_STRONG_PCT, DROP_ALERT_PCT
 from ..core.smart_money import run_smart_money_analysis, TIER_ICON
+from ..core.prescorer import PreScorer, extract_features
+from ..core.storage import KairosDB, intensity_from_drops
 
 from ..config import (
-    TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, GEMINI_API_KEY, AI_PROVIDER,
+    GEMINI_API_KEY, AI_PROVIDER,
     DATA_DIR, SENT_ALERTS_FILE, CYCLE_SLEEP_SEC,
-    AI_TRIGGER_DROP, DROP_MIN_PCT, DROP_STRONG_PCT,
+    AI_TRIGGER_DROP, AI_BATCH_SIZE, DROP_MIN_PCT, DROP_STRONG_PCT,
+    PIPELINE_QUEUE_MAX, PIPELINE_DETAIL_WORKERS, PIPELINE_EXCAPPER_WORKERS,
+    PIPELINE_AI_WORKERS, PIPELINE_AI_BATCH_WAIT,
+    SCHED_MIN_INTERVAL_SEC, SCHED_MAX_INTERVAL_SEC, SCHED_PAGE_BUDGET_PER_MIN, SCHED_TICK_SEC,
     USER_AGENT, VIEWPORT, HEADLESS
 )
 
@@ -100,6 +121,7 @@ def _build_ai_snapshot(
         # Drops do DroppingOdds
         "dropping_odds_drops": drops,
         "primary_drop": primary_drop,
+        "market_flags": page_data.get("market_flags", []),   # inconsistências entre tabelas (core/implied.py)
 
         # Dados do Excapper (fluxo de dinheiro)
         "excapper_markets": {
@@ -330,156 +352,469 @@ def _build_telegram_message(
     return msg
 
 
+def _alert_state(match: dict, page_data: dict, ai_data: dict) -> dict:
+    """Resumo do alerta guardado na thread — base para o delta da próxima atualização."""
+    return {
+        "score":      match.get("score", ""),
+        "time_text":  match.get("time_text", ""),
+        "verdict":    str(ai_data.get("verdict", "")),
+        "confidence": ai_data.get("confidence", ""),
+        "tip":        str(ai_data.get("betting_tip", "")),
+        "drops": {
+            f"{d['table']}|{d['selection']}": round(d["drop_pct"], 1)
+            for d in page_data.get("drops_summary", [])[:6]
+        },
+    }
+
+
+def _build_delta_message(teams: str, prev: dict, curr: dict) -> str:
+    """Mensagem compacta com o que mudou desde o último alerta do mesmo jogo."""
+    msg = f"🔁 <b>ATUALIZAÇÃO</b> — {teams}  ⏱ <code>{curr.get('time_text', '')}</code>\n"
+    if prev.get("score") != curr.get("score"):
+        msg += f"⚽ Placar: <code>{prev.get('score', '?')}</code> → <code>{curr.get('score', '?')}</code>\n"
+
+    prev_drops = prev.get("drops", {})
+    for key, pct in curr.get("drops", {}).items():
+        table, sel = key.split("|", 1)
+        before = prev_drops.get(key)
+        if before is None:
+            msg += f"  🆕 <code>[{table}]</code> {sel}: <b>-{pct:.1f}%</b>\n"
+        elif abs(pct - before) >= 0.5:
+            msg += f"  📉 <code>[{table}]</code> {sel}: -{before:.1f}% → <b>-{pct:.1f}%</b>\n"
+
+    if (prev.get("verdict"), prev.get("confidence")) != (curr.get("verdict"), curr.get("confidence")):
+        msg += (
+            f"🧠 Veredito: {prev.get('verdict', '?')} ({prev.get('confidence', '?')}/10) → "
+            f"<b>{curr.get('verdict', '?')}</b> ({curr.get('confidence', '?')}/10)\n"
+        )
+    if prev.get("tip") != curr.get("tip"):
+        msg += f"💰 Aposta: <code>{curr.get('tip', 'N/A').upper()}</code>\n"
+    return msg
+
+
+def _alert_filter_keys(snapshot: dict, page_data: dict, ai_data: dict) -> dict:
+    """Chaves usadas pelo índice de assinaturas (tier, veredito, confiança, tabelas, drop)."""
+    drops = page_data.get("drops_summary", [])
+    try:
+        confidence = float(ai_data.get("confidence", 0))
+    except (ValueError, TypeError):
+        confidence = 0.0
+    return {
+        "tier":       snapshot.get("smart_money_result", {}).get("league_profile", {}).get("tier", "MID"),
+        "verdict":    str(ai_data.get("verdict", "")),
+        "confidence": confidence,
+        "tables":     {d["table"] for d in drops},
+        "max_drop":   page_data.get("max_drop_pct", 0),
+    }
+
+
+def _alert_payload(item: dict, ai_data: dict, filter_keys: dict) -> dict:
+    """Corpo JSON do alerta para webhooks e para o sink JSONL."""
+    match, page_data = item["match"], item["page_data"]
+    return {
+        "source":       "dropping",
+        "ts":           time.time(),
+        "game_id":      item["game_id"],
+        "teams":        item["teams"],
+        "league":       match.get("league", ""),
+        "tier":         filter_keys["tier"],
+        "score":        match.get("score", ""),
+        "time":         match.get("time_text", ""),
+        "is_live":      match.get("is_live", False),
+        "verdict":      filter_keys["verdict"],
+        "confidence":   filter_keys["confidence"],
+        "betting_tip":  ai_data.get("betting_tip", ""),
+        "reasoning":    ai_data.get("reasoning", ""),
+        "max_drop_pct": filter_keys["max_drop"],
+        "drops":        page_data.get("drops_summary", [])[:10],
+        "match_url":    match.get("match_url", ""),
+        "excapper_url": page_data.get("excapper_url", ""),
+    }
+
+
+def _parse_ai_verdict(ai_raw: str) -> dict:
+    """Extrai o JSON do veredito da resposta bruta da IA."""
+    start = ai_raw.find("{")
+    end   = ai_raw.rfind("}") + 1
+    if start == -1 or end <= 0:
+        raise ValueError("Resposta da IA não contém JSON válido")
+    ai_data = json.loads(ai_raw[start:end])
+    if "error" in ai_data:
+        raise ValueError(ai_data["error"])
+    return ai_data
+
+
+async def _analyze_batch(jobs: list, analyzer: KairosAnalyzer, db: KairosDB) -> list:
+    """
+    FASE 5 para um lote de jogos já aprovados pelos gatilhos:
+    veredito da IA (uma requisição por lote) → histórico.
+    Retorna só os jogos com veredito válido.
+    """
+    print(f"\n    [*] Enviando {len(jobs)} jogo(s) (Drops + Fluxo) para IA ({AI_PROVIDER.upper()})...")
+    try:
+        raw_by_game = await analyzer.analyze_batch({j["game_id"]: j["snapshot"] for j in jobs})
+    except Exception as e:
+        print(f"    [!] Erro na análise IA (lote): {e}")
+        return []
+
+    analyzed = []
+    for job in jobs:
+        teams = job["teams"]
+        try:
+            ai_data = _parse_ai_verdict(raw_by_game.get(job["game_id"], ""))
+            print(f"    [OK] {teams}: Veredito IA {ai_data.get('verdict')} | Confiança: {ai_data.get('confidence')}/10")
+        except Exception as e:
+            print(f"    [!] Erro na análise IA de {teams}: {e}")
+            continue # Se a IA falhou, não enviamos para o telegram (exigência do "depois do veredito")
+
+        # Histórico (snapshot + veredito) para treino do pré-score
+        db.save_snapshot(job["game_id"], teams, job["snapshot"]["live_score"], job["market_data"],
+                         ai_data, intensity_from_drops(job["page_data"].get("drops_summary", [])))
+        job["ai_data"] = ai_data
+        analyzed.append(job)
+    return analyzed
+
+
+def _dispatch_alert(job: dict, fanout: AlertFanout, sent_alerts: dict, inflight: set):
+    """FASE 6: fan-out para os assinantes (envio não bloqueia o pipeline)."""
+    teams, ai_data = job["teams"], job["ai_data"]
+    msg = _build_telegram_message(job["match"], job["page_data"], ai_data, job["snapshot"])
+    filter_keys = _alert_filter_keys(job["snapshot"], job["page_data"], ai_data)
+    alert_hash = job["alert_hash"]
+
+    def _on_sent(_result, alert_hash=alert_hash, teams=teams):
+        print(f"    [OK] Alerta entregue ({teams})!")
+        inflight.discard(alert_hash)
+        sent_alerts[alert_hash] = time.time()
+        save_json(SENT_ALERTS_FILE, sent_alerts)
+
+    def _on_failed(_error, alert_hash=alert_hash, teams=teams):
+        print(f"    [X] Falha ao enviar alerta para {teams}.")
+        inflight.discard(alert_hash)
+
+    # Telegram: mesmo jogo dentro da janela → edita/responde a mensagem original (por chat)
+    targets = fanout.dispatch(
+        filter_keys,
+        msg,
+        _alert_payload(job, ai_data, filter_keys),
+        thread_key=f"dropping:{job['game_id']}",
+        state=_alert_state(job["match"], job["page_data"], ai_data),
+        delta_builder=lambda prev, curr, teams=teams: _build_delta_message(teams, prev, curr),
+        on_delivered=_on_sent,
+        on_failed=_on_failed,
+    )
+    if targets:
+        inflight.add(alert_hash)
+    else:
+        print(f"    [.] Nenhum assinante aceita o alerta de {teams}.")
+
+
+# ── Estágios de Scraping (usados no processo principal e nos workers) ─────────
+
+# Perfil de navegação do fluxo (também usado pelo modo combinado)
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1366, "height": 768},
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "locale": "pt-BR",
+}
+
+
+async def _fetch_details(pool: BrowserPool, do_scraper: DroppingOddsScraper, job: dict):
+    """FASE 2: dados completos do jogo (tabelas + link Excapper) e gatilhos de drop."""
+    teams = job["teams"]
+    async with pool.page() as game_page:
+        page_data = await do_scraper.get_match_full_data(game_page, job["game_id"])
+    job["page_data"] = page_data  # Mesmo se reprovado: o agendador usa o drop da visita
+
+    drops = page_data.get("drops_summary", [])
+    max_drop = page_data.get("max_drop_pct", 0)
+    excapper_url = page_data.get("excapper_url")
+
+    # ── VERIFICAÇÃO DE GATILHOS (Novo Plano) ─────────────────────
+    # 1. Identificar se existem drops significativos
+    if not drops or max_drop < AI_TRIGGER_DROP:
+        # Silencioso se não houver drop algum, ou print se for baixo
+        if max_drop > 0:
+            print(f"    [.] {teams}: Drop {max_drop:.1f}% insuficiente (<{AI_TRIGGER_DROP}%).")
+        return None
+
+    print(f"\n  [{time.strftime('%H:%M:%S')}] Processando: {teams}...")
+    print(f"    [!] {len(drops)} drops detectados | Máx: {max_drop:.1f}%")
+
+    # 2. Tenta encontrar o link Excapper. Sem link na página, usa o jogo
+    #    casado pelo índice de identidade (vínculo gravado ou nome); sem os dois, NÃO PROSSEGUE.
+    if not excapper_url and job["match"].get("excapper_id"):
+        excapper_url = f"{ExcapperScraper.BASE_URL}?action=game&id={job['match']['excapper_id']}"
+        page_data["excapper_url"] = excapper_url
+        job["excapper_via_identity"] = True
+        print(f"    [OK] Link Excapper via identidade: {excapper_url}")
+        return job
+    if not excapper_url:
+        print(f"    [CANCELADO] Sem link Excapper para {teams}. Abortando análise.")
+        return None
+
+    print(f"    [OK] Link Excapper encontrado: {excapper_url}")
+    return job
+
+
+async def _fetch_excapper(excapper: ExcapperCache, job: dict):
+    """FASE 3: Excapper — extração do fluxo de dinheiro."""
+    excapper_url = job["page_data"]["excapper_url"]
+    excapper_markets = {}
+    print(f"    [*] Extraindo fluxo de dinheiro do Excapper ({job['teams']})...")
+    m_exc = re.search(r"id=(\d+)", excapper_url)
+    if m_exc:
+        job["excapper_id"] = m_exc.group(1)
+        excapper_markets = await excapper.get_match_flow(m_exc.group(1))
+        if excapper_markets:
+            print(f"    [+] {len(excapper_markets)} mercados extraídos do Excapper.")
+        else:
+            print(f"    [!] Link existia, mas o Excapper não retornou dados de fluxo.")
+    else:
+        print(f"    [!] Formato de link Excapper inválido: {excapper_url}")
+
+    # Mesmo sem mercados, o link existia e houve drop: o prompt da IA
+    # lida com a ausência de fluxo (Excapper: Não disponível).
+    job["excapper_markets"] = excapper_markets
+    return job
+
+
+def _shard_worker(idx: int, in_q, out_q):
+    """Entrada do processo worker (--workers N): um Chromium próprio, FASES 2 e 3."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Encerramento vem do supervisor
+    asyncio.run(_shard_worker_main(idx, in_q, out_q))
+
+
+async def _shard_worker_main(idx: int, in_q, out_q):
+    do_scraper  = DroppingOddsScraper()
+    exc_scraper = ExcapperScraper()
+    loop = asyncio.get_running_loop()
+    sem  = asyncio.Semaphore(PIPELINE_DETAIL_WORKERS)
+    tasks = set()
+
+    async with async_playwright() as p:
+        pool = BrowserPool(p, context_options=CONTEXT_OPTIONS)
+        excapper = ExcapperCache(exc_scraper, pool)
+
+        async def _serve(req: dict):
+            t0 = time.perf_counter()
+            msg = {"req_id": req["req_id"], "ok": True, "job": req["payload"], "passed": False}
+            async with sem:
+                try:
+                    job = await _fetch_details(pool, do_scraper, req["payload"])
+                    if job:
+                        job = await _fetch_excapper(excapper, job)
+                    msg["passed"] = job is not None
+                except Exception as e:
+                    print(f"    [!] [W{idx}] Erro em {req['payload'].get('teams')}: {e.__class__.__name__}: {e}")
+                    msg["ok"] = False
+            msg["elapsed"] = time.perf_counter() - t0
+            msg["status"] = pool.stats_line()
+            out_q.put(msg)
+
+        while True:
+            req = await loop.run_in_executor(None, in_q.get)
+            if req is None:
+                break
+            task = asyncio.create_task(_serve(req))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await pool.close()
+
+
 # ── Pipeline Principal ─────────────────────────────────────────────────────────
 
-async def main():
+async def main(workers: int = 1, infra: Optional[SharedInfra] = None):
+    """
+    `workers` > 1: FASES 2 e 3 rodam em N processos (um Chromium cada), jogos repartidos por hash.
+    `infra`: navegador/Telegram/cache Excapper compartilhados (modo combinado); None = próprios.
+    """
     os.makedirs(DATA_DIR, exist_ok=True)
-    sent_alerts = load_json(SENT_ALERTS_FILE)
 
     analyzer  = KairosAnalyzer(GEMINI_API_KEY, provider_type=AI_PROVIDER)
+    db        = KairosDB()
     do_scraper  = DroppingOddsScraper()
-    exc_scraper = ExcapperScraper()
 
-    print("\n==================================================")
-    print("[*] KAIROS DROPPING-ODDS: Monitoramento Ativo (Strict Flow)")
-    print(f"   Provedor IA: {AI_PROVIDER.upper()}")
-    print(f"   Gatilho Drop: >= {AI_TRIGGER_DROP}%")
-    print(f"   CONDICAO OBRIGATORIA: Link Excapper disponivel")
-    print(f"   Ciclo: {CYCLE_SLEEP_SEC}s")
-    print("==================================================\n")
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            viewport={"width": 1366, "height": 768},
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            locale="pt-BR",
+    # Hashes enfileirados no Telegram ainda sem confirmação de entrega
+    inflight_alerts = set()
+    # Jogos dentro do pipeline (o poller não reenfileira até saírem)
+    active_games = set()
+    scheduler = MatchScheduler()
+    implied = ImpliedBook()
+
+    async with (infra or SharedInfra(CONTEXT_OPTIONS)) as shared, \
+            AlertFanout(shared.notifier, AlertThreads(db, shared.notifier)) as fanout:
+        pool, excapper, identity = shared.pool, shared.excapper, shared.identity
+
+        # O Chromium sobe em segundo plano (SharedInfra.warmup) enquanto o estado
+        # mais pesado carrega em threads — o loop segue conduzindo o navegador
+        sent_alerts, prescorer, _ = await asyncio.gather(
+            asyncio.to_thread(load_json, SENT_ALERTS_FILE),
+            asyncio.to_thread(PreScorer),
+            asyncio.to_thread(analyzer.load),
         )
+        startup.mark("state")
+
+        print("\n==================================================")
+        print("[*] KAIROS DROPPING-ODDS: Monitoramento Ativo (Strict Flow)")
+        print(f"   Provedor IA: {AI_PROVIDER.upper()}")
+        print(f"   Gatilho Drop: >= {AI_TRIGGER_DROP}%")
+        print(f"   CONDICAO OBRIGATORIA: Link Excapper disponivel")
+        print(f"   Pré-score: {'>= ' + format(prescorer.min_score, '.2f') if prescorer.is_ready else 'sem modelo (desativado)'}")
+        print(f"   Lote IA: até {AI_BATCH_SIZE} jogo(s) por requisição")
+        if workers > 1:
+            print(f"   Processos de scraping: {workers} (x{PIPELINE_DETAIL_WORKERS} jogos cada)")
+        print(
+            f"   Estágios: detalhes x{PIPELINE_DETAIL_WORKERS} | excapper x{PIPELINE_EXCAPPER_WORKERS} | "
+            f"ia x{PIPELINE_AI_WORKERS} | filas {PIPELINE_QUEUE_MAX}"
+        )
+        print(f"   Listagem: a cada {CYCLE_SLEEP_SEC}s | visitas por urgência ({SCHED_MIN_INTERVAL_SEC}s a {SCHED_MAX_INTERVAL_SEC}s)")
+        print(f"   Orçamento: {SCHED_PAGE_BUDGET_PER_MIN} páginas/min")
+        print("==================================================\n")
+
+        # ── FASE 4: Snapshot, deduplicação e pré-score ────────────────────
+        async def build_snapshot(job: dict):
+            match, page_data, teams = job["match"], job["page_data"], job["teams"]
+            drops = page_data["drops_summary"]
+            excapper_markets = job["excapper_markets"]
+
+            # Link vindo da própria página do DroppingOdds confirma o vínculo entre as fontes
+            if not job.get("excapper_via_identity"):
+                identity.link(("droppingodds", job["game_id"]), ("excapper", job.get("excapper_id")),
+                              ("betfair", betfair_market_id(excapper_markets)), teams=teams)
+            # Probabilidades implícitas: marca movimentos sem confirmação entre tabelas nos drops
+            for flag in implied.annotate(job["game_id"], page_data):
+                print(f"    [IMPLIED] {flag['flag']} em {flag['table']} {flag.get('selection', '')}".rstrip())
+            snapshot = _build_ai_snapshot(match, page_data, excapper_markets, teams)
+
+            # Calcular hash do alerta para evitar duplicatas
+            alert_hash = hashlib.md5(
+                f"{teams}_{snapshot['live_score']}_{drops[0].get('table', '')}_{drops[0].get('drop_pct', 0):.0f}".encode()
+            ).hexdigest()
+
+            if alert_hash in sent_alerts or alert_hash in inflight_alerts:
+                print(f"    [.] Alerta já enviado para {teams}. Pulando.")
+                return None
+
+            # Pré-score local (evita chamadas de IA em ruído)
+            market_data = {"match": match, "page_data": page_data, "excapper_markets": excapper_markets}
+            go_ai, pre_score = prescorer.should_analyze(
+                extract_features(match, page_data, excapper_markets)
+            )
+            if not go_ai:
+                print(f"    [.] Pré-score {pre_score:.2f} < {prescorer.min_score:.2f}. IA não acionada.")
+                db.save_snapshot(job["game_id"], teams, snapshot["live_score"], market_data,
+                                 intensity_level=intensity_from_drops(drops))
+                return None
+
+            # Injeta contexto do DroppingOdds no prompt
+            snapshot["dropping_context_text"] = do_scraper.format_drops_for_ai(match, page_data)
+            job.update(snapshot=snapshot, market_data=market_data, alert_hash=alert_hash)
+            return job
+
+        # ── FASES 5 e 6: IA em lote → assinantes ──────────────────────────
+        async def analyze(jobs: list):
+            return await _analyze_batch(jobs, analyzer, db)
+
+        async def notify(job: dict):
+            _dispatch_alert(job, fanout, sent_alerts, inflight_alerts)
+            return job
+
+        # ── FASES 2 e 3 em processos worker (--workers N) ─────────────────
+        shards = ShardSupervisor(workers, _shard_worker) if workers > 1 else None
+
+        async def fetch_sharded(job: dict):
+            result = await shards.submit(job["game_id"], job)
+            if not result:
+                return None
+            job.update(result["job"])  # Mantém a identidade do item no pipeline
+            return job if result.get("passed") else None
+
+        def _job_done(job: dict):
+            active_games.discard(job["game_id"])
+            metrics.VISIT_SECONDS.observe(time.monotonic() - job["queued_at"], flow="dropping")
+            scheduler.record_visit(job["game_id"], job.get("page_data"))
+            implied.store(job["game_id"], job.get("page_data"))
+
+        pipe = Pipeline(maxsize=PIPELINE_QUEUE_MAX, on_done=_job_done)
+        if shards:
+            shards.start()
+            pipe.add("shards", fetch_sharded, concurrency=workers * PIPELINE_DETAIL_WORKERS)
+        else:
+            pipe.add("detalhes", lambda job: _fetch_details(pool, do_scraper, job),
+                     concurrency=PIPELINE_DETAIL_WORKERS)
+            pipe.add("excapper", lambda job: _fetch_excapper(excapper, job),
+                     concurrency=PIPELINE_EXCAPPER_WORKERS)
+        pipe.add("snapshot", build_snapshot)
+        pipe.add("ia", analyze, concurrency=PIPELINE_AI_WORKERS,
+                 batch_size=AI_BATCH_SIZE, batch_wait=PIPELINE_AI_BATCH_WAIT)
+        pipe.add("notifier", notify)
+        pipe.start()
 
-        main_page = await context.new_page()
-
-        while True:
-            if main_page.is_closed():
-                print("[!] Página principal fechada. Recriando...")
-                main_page = await context.new_page()
-
-            try:
-                print(f"\n[{time.strftime('%H:%M:%S')}] === NOVO CICLO ===")
-
-                # ── FASE 1: DroppingOdds — lista de jogos ao vivo ────────────
-                live_matches = await do_scraper.get_live_matches(main_page)
-                print(f"[*] {len(live_matches)} jogos ao vivo encontrados.")
-
-                for match in live_matches:
-                    teams    = match["teams"]
-
-                    # ── FASE 2: Dados completos do jogo (tabelas + Excapper link) ──
-                    game_id = match.get("game_id", "")
-                    if not game_id:
-                        continue
-
-                    game_page = await context.new_page()
-                    try:
-                        page_data = await do_scraper.get_match_full_data(game_page, game_id)
-                    finally:
-                        await game_page.close()
-
-                    drops = page_data.get("drops_summary", [])
-                    max_drop = page_data.get("max_drop_pct", 0)
-                    excapper_url = page_data.get("excapper_url")
-
-                    # ── VERIFICAÇÃO DE GATILHOS (Novo Plano) ─────────────────────
-                    # 1. Identificar se existem drops significativos
-                    if not drops or max_drop < AI_TRIGGER_DROP:
-                        # Silencioso se não houver drop algum, ou print se for baixo
-                        if max_drop > 0:
-                            print(f"    [.] {teams}: Drop {max_drop:.1f}% insuficiente (<{AI_TRIGGER_DROP}%).")
-                        continue
-
-                    print(f"\n  [{time.strftime('%H:%M:%S')}] Processando: {teams}...")
-                    print(f"    [!] {len(drops)} drops detectados | Máx: {max_drop:.1f}%")
-
-                    # 2. Tenta encontrar o link Excapper. Se não tiver, NÃO PROSSEGUE.
-                    if not excapper_url:
-                        print(f"    [CANCELADO] Sem link Excapper para {teams}. Abortando análise.")
-                        continue
-
-                    print(f"    [OK] Link Excapper encontrado: {excapper_url}")
-
-                    # ── FASE 3: Excapper — extração do fluxo de dinheiro ──────────
-                    excapper_markets = {}
-                    print(f"    [*] Extraindo fluxo de dinheiro do Excapper...")
-                    m_exc = re.search(r"id=(\d+)", excapper_url)
-                    if m_exc:
-                        exc_game_id = m_exc.group(1)
-                        exc_page = await context.new_page()
-                        try:
-                            excapper_markets = await exc_scraper.get_match_flow(exc_page, exc_game_id)
-                            if excapper_markets:
-                                print(f"    [+] {len(excapper_markets)} mercados extraídos do Excapper.")
-                            else:
-                                print(f"    [!] Link existia, mas o Excapper não retornou dados de fluxo.")
-                        finally:
-                            await exc_page.close()
-                    else:
-                        print(f"    [!] Formato de link Excapper inválido: {excapper_url}")
-
-                    # Mesmo que falhe em extrair mercados, se o link existia e houve drop,
-                    # o prompt da IA lidará com a ausência de dados de fluxo (Excapper: Não disponível).
-                    # Mas o plano diz "analisar o fluxo de dinheiro e drop", então se falhou feio, pulamos?
-                    # Vou prosseguir pois o link foi encontrado como solicitado.
-
-                    # ── FASE 4: Montar snapshot e enviar para IA ─────────────
-                    snapshot = _build_ai_snapshot(match, page_data, excapper_markets, teams)
-
-                    # Calcular hash do alerta para evitar duplicatas
-                    alert_hash = hashlib.md5(
-                        f"{teams}_{snapshot['live_score']}_{drops[0].get('table', '')}_{drops[0].get('drop_pct', 0):.0f}".encode()
-                    ).hexdigest()
-
-                    if alert_hash in sent_alerts:
-                        print(f"    [.] Alerta já enviado para {teams}. Pulando.")
-                        continue
-
-                    # ── FASE 5: Análise IA (Veredito) ───────────────────────────
-                    ai_data = None
-                    print(f"    [*] Enviando dados coletados (Drops + Fluxo) para IA ({AI_PROVIDER.upper()})...")
-                    try:
-                        # Injeta contexto do DroppingOdds no prompt
-                        snapshot["dropping_context_text"] = do_scraper.format_drops_for_ai(match, page_data)
-
-                        ai_raw = await analyzer.analyze_cross_market(snapshot)
-                        start  = ai_raw.find("{")
-                        end    = ai_raw.rfind("}") + 1
-                        if start != -1 and end > 0:
-                            ai_data = json.loads(ai_raw[start:end])
-                            print(f"    [OK] Veredito IA: {ai_data.get('verdict')} | Confiança: {ai_data.get('confidence')}/10")
-                        else:
-                            raise ValueError("Resposta da IA não contém JSON válido")
-                    except Exception as e:
-                        print(f"    [!] Erro na análise IA: {e}")
-                        continue # Se a IA falhou, não enviamos para o telegram (exigência do "depois do veredito")
-
-                    # ── FASE 6: Enviar para o Telegram ───────────────────────
-                    if ai_data:
-                        msg = _build_telegram_message(match, page_data, ai_data, snapshot)
-                        if send_telegram_alert(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, msg):
-                            print(f"    [OK] Alerta enviado para Telegram!")
-                            sent_alerts[alert_hash] = time.time()
-                            save_json(SENT_ALERTS_FILE, sent_alerts)
-                        else:
-                            print(f"    [X] Falha ao enviar alerta para {teams}.")
-
-                print(f"\n[*] Ciclo concluído. Aguardando {CYCLE_SLEEP_SEC}s...")
-                await asyncio.sleep(CYCLE_SLEEP_SEC)
-
-            except Exception as e:
-                print(f"[!] Erro no ciclo global: {e}")
-                await asyncio.sleep(15)
+        try:
+            # ── FASE 1: Poller — lista ao vivo a cada CYCLE_SLEEP_SEC; entre as
+            #    listagens, o agendador solta os jogos conforme a urgência de cada um
+            next_listing = 0.0
+            while True:
+                try:
+                    if time.time() >= next_listing:
+                        print(f"\n[{time.strftime('%H:%M:%S')}] === NOVO CICLO ===")
+                        PROFILER.tick("dropping")
+                        cycle_started = time.monotonic()
+
+                        async with pool.page() as main_page:
+                            live_matches = await do_scraper.get_live_matches(main_page)
+                        print(f"[*] {len(live_matches)} jogos ao vivo encontrados.")
+                        startup.mark("first_scrape")
+                        # Par no Excapper já conhecido (vínculo gravado ou listagem do modo legado)
+                        identity.update("droppingodds", [(m["game_id"], m["teams"]) for m in live_matches])
+                        for m in live_matches:
+                            m["excapper_id"] = identity.resolve("droppingodds", m["game_id"], "excapper")
+                        scheduler.update_listing(live_matches)
+                        implied.refresh(m["game_id"] for m in live_matches)
+                        next_listing = time.time() + CYCLE_SLEEP_SEC
+                        metrics.LIVE_MATCHES.set(len(live_matches), flow="dropping")
+                        metrics.CYCLE_SECONDS.observe(time.monotonic() - cycle_started, flow="dropping")
+
+                        print()
+                        print(f"[*] {scheduler.stats_line()}")
+                        print(f"[*] {implied.stats_line()}")
+                        for line in pipe.stats_lines():
+                            print(f"[*] {line}")
+                        if shards:
+                            shards.check_workers()
+                            for line in shards.stats_lines():
+                                print(f"[*] {line}")
+                        for line in shared.stats_lines():
+                            print(f"[*] {line}")
+                        print(f"[*] {fanout.stats_line()}")
+
+                    for match in scheduler.due():
+                        game_id = match["game_id"]
+                        if game_id in active_games:
+                            continue
+                        active_games.add(game_id)
+                        # Bloqueia se o 1º estágio estiver cheio (backpressure até o poller)
+                        await pipe.put({"game_id": game_id, "teams": match["teams"], "match": match,
+                                        "queued_at": time.monotonic()})
+
+                    wait = min(scheduler.next_wake(), next_listing - time.time())
+                    await asyncio.sleep(min(max(wait, 0.5), SCHED_TICK_SEC))
+
+                except Exception as e:
+                    print(f"[!] Erro no ciclo global: {e}")
+                    await asyncio.sleep(15)
+        finally:
+            await pipe.stop()
+            if shards:
+                await shards.stop()
 
 
 if __name__ == "__main__":
@@ -3,10 +3,17 @@ import json
 import os
 import time
 import hashlib
+from typing import Optional
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
 
-from ..core.utils import load_json, save_json, send_telegram_alert
+from ..core import metrics, startup
+from ..core.profiler import PROFILER
+from ..core.utils import load_json, save_json
+from ..core.subscriptions import AlertFanout, market_table
+from ..core.infra import SharedInfra
+from ..core.fixture_cache import FixtureCache
+from ..core.identity import split_teams, betfair_market_id
+from ..core.rules import RuleEngine, anomaly_features, to_float
 from ..core.analyzer import KairosAnalyzer
 from ..scrapers.sokkerpro import SokkerProScraper
 from ..scrapers.excapper import ExcapperScraper
@@ -47,6 +54,17 @@ INSTITUTIONAL_VOL_BARRIER = 50000.0 # IA só acorda se vol anomalia > 50k em jog
 OCEAN_DROP_MIN = 5.0                # Drop institucional (5-8%)
 LARGE_TOTAL_VOL = 200000.0          # Volume total para ser "Grande Jogo"
 
+# Limites nomeados usados pelas regras de manipulação ("$NOME" em core/rules.py)
+RULE_PARAMS = {
+    "LOW_PRESSURE_LIMIT":        LOW_PRESSURE_LIMIT,
+    "LATE_GAME_MIN":             LATE_GAME_MIN,
+    "PRE_GAME_DROP_LIMIT":       PRE_GAME_DROP_LIMIT,
+    "INSTITUTIONAL_VOL_BARRIER": INSTITUTIONAL_VOL_BARRIER,
+    "OCEAN_DROP_MIN":            OCEAN_DROP_MIN,
+    "CESTO_VOL_MIN":             MONEY_SPARK_POOL * 4,
+    "HIGH_ODDS_MIN":             4.0,
+}
+
 # Mercado Permitidos (Whitelist)
 ALLOWED_MARKETS = {
     "Both teams to Score?",
@@ -63,16 +81,24 @@ ALLOWED_MARKETS = {
     "Over/Under 6.5 Goals"
 }
 
-async def main():
+# Perfil de navegação do fluxo
+CONTEXT_OPTIONS = {
+    "viewport": {'width': 1280, 'height': 720},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+}
+
+async def main(infra: Optional[SharedInfra] = None):
+    """`infra`: navegador/Telegram/cache Excapper compartilhados (modo combinado); None = próprios."""
     required_keys = [TELEGRAM_TOKEN, TELEGRAM_CHAT_ID]
     # (Validação de chaves omitida para brevidade)
 
     os.makedirs(DATA_DIR, exist_ok=True)
-    sent_alerts = load_json(SENT_ALERTS_FILE)
 
     analyzer = KairosAnalyzer(GEMINI_API_KEY, provider_type=AI_PROVIDER)
-    sp_scraper = SokkerProScraper()
+    fixtures = FixtureCache()
+    sp_scraper = SokkerProScraper(fixtures)
     excapper = ExcapperScraper()
+    rules = RuleEngine(RULE_PARAMS)
 
     print(f"[*] Analisador iniciado com provedor: {AI_PROVIDER.upper()}")
     print("\n==================================================")
@@ -80,24 +106,40 @@ async def main():
     print(f"[*] Limite Volume: {MIN_MATCH_VOLUME_EUR}€ | Anomalia: {MONEY_SPARK_THRESHOLD}€")
     print("==================================================\n")
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            viewport={'width': 1280, 'height': 720},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+    # Hashes enfileirados no Telegram ainda sem confirmação de entrega
+    inflight_alerts = set()
+
+    async with (infra or SharedInfra(CONTEXT_OPTIONS)) as shared, AlertFanout(shared.notifier) as fanout:
+        pool, exc_cache, identity = shared.pool, shared.excapper, shared.identity
+
+        # Estado e SDK da IA carregam em threads enquanto o Chromium sobe (SharedInfra.warmup)
+        sent_alerts, _, _, _ = await asyncio.gather(
+            asyncio.to_thread(load_json, SENT_ALERTS_FILE),
+            asyncio.to_thread(analyzer.load),
+            asyncio.to_thread(fixtures.load),
+            asyncio.to_thread(rules.load),
         )
+        startup.mark("state")
+        print(rules.stats_line())
 
-        page = await context.new_page()
+        page = None
 
         while True:
-            # Garantir que a página principal ainda está aberta
-            if page.is_closed():
-                print("[!] Página principal fechada. Recriando...")
-                page = await context.new_page()
-
             try:
+                # Página principal volta ao pool a cada ciclo: permite reciclar o
+                # contexto (navegações/RSS) e reiniciar o navegador se ele caiu
+                if page is not None:
+                    await pool.release(page, healthy=not page.is_closed())
+                    page = None
+                page = await pool.acquire()
+                cycle_started = time.monotonic()
+                PROFILER.tick("legacy")
+
                 # 1. Obter jogos live do Excapper (Money Flow Source)
                 live_matches = await excapper.get_live_matches(page)
+                startup.mark("first_scrape")
+                metrics.LIVE_MATCHES.set(len(live_matches), flow="legacy")
+                identity.update("excapper", [(m["game_id"], m["teams"]) for m in live_matches])
                 print(f"[*] [CYCLE] Analisando {len(live_matches)} jogos ao vivo...")
 
                 for match in live_matches:
@@ -113,12 +155,14 @@ async def main():
 
                     try:
                         # 2. Extrair histórico de fluxo (TODOS os mercados)
-                        all_markets_data = await excapper.get_match_flow(page, gid)
+                        # Cache por jogo: no modo combinado o dropping_flow pode já ter buscado
+                        all_markets_data = await exc_cache.get_match_flow(gid)
                         if not all_markets_data:
                             print(f"      [?] Nenhum dado de mercado extraído para {gid}.")
                             continue
 
                         print(f"      [+] {len(all_markets_data)} mercados extraídos. Verificando anomalias...")
+                        identity.link(("excapper", gid), ("betfair", betfair_market_id(all_markets_data)), teams=teams)
 
                         # 3. Detectar Anomalias Significativas
                         found_anomalies = []
@@ -172,7 +216,7 @@ async def main():
                         last_score = primary_anomaly["details"]["score"]
                         alert_hash = hashlib.md5(f"{gid}_{last_score}_{primary_anomaly['short_id']}".encode()).hexdigest()
 
-                        if alert_hash in sent_alerts:
+                        if alert_hash in sent_alerts or alert_hash in inflight_alerts:
                             print(f"      [.] Alerta já enviado para {primary_anomaly['short_id']}. Pulando.")
                             continue
 
@@ -182,26 +226,16 @@ async def main():
                         sp_data = None
                         pre_stats = None
 
-                        # Extrair apenas o primeiro time para a busca no SokkerPro
-                        # Algumas vezes o Excapper usa " vs ", outras vezes " - "
-                        if " vs " in teams:
-                            home = teams.split(" vs ")[0].strip()
-                            away = teams.split(" vs ")[1].strip()
-                        elif " - " in teams:
-                            home = teams.split(" - ")[0].strip()
-                            away = teams.split(" - ")[1].strip()
-                        else:
-                            home, away = teams.strip(), ""
+                        # Mandante para a busca no SokkerPro (o Excapper usa " vs " ou " - ")
+                        home, away = split_teams(teams)
 
                         print(f"      [*] Buscando no SokkerPro por: '{home}'")
-                        sp_page = await context.new_page()
-                        try:
+                        # Página quente do pool: já na home do SokkerPro, pula o goto
+                        async with pool.page() as sp_page:
                             sp_res = await sp_scraper.search_match(sp_page, home, away)
                             if sp_res["found"]:
                                 sp_data = await sp_scraper.get_live_stats(sp_page)
                                 pre_stats = await sp_scraper.get_prelive_stats(sp_page)
-                        finally:
-                            await sp_page.close()
 
                         # 5. Lógica de Níveis de Prioridade e Detecção de Manipulação
                         level = 1
@@ -212,15 +246,11 @@ async def main():
 
                         # Detectores de Manipulação (Smart Money)
                         manipulation_labels = []
-                        pct_change = float(primary_anomaly['details']['change_pct'].replace("%", "").replace("-", "") or 0)
-
                         try:
                             current_odd = float(primary_anomaly['details']['odds'])
                         except:
                             current_odd = 0.0
 
-                        market_name_up = primary_anomaly['market'].upper()
-                        selection_up = primary_anomaly['selection'].upper()
                         current_min = sp_data.get("minute", 0) if sp_data else 0
 
                         # --- SMART MONEY (módulo externo — análise real pelos dados da anomalia) ---
@@ -260,71 +290,14 @@ async def main():
                         league_tier = sm_result["league_profile"]["tier"]
                         league_tier_icon = sm_result["tier_icon"]
 
-                        # 1. Detector "HT Smart Money" & Over 0.5 HT Sneak
-                        if "HALF TIME" in market_name_up or "1ST HALF" in market_name_up:
-                            if "OVER 0.5" in selection_up and last_score == "0-0" and 35 <= current_min <= 45:
-                                manipulation_labels.append("HT_GOAL_SNEAK (Golo no final do 1º tempo?)")
-                                level = 3
-                            else:
-                                manipulation_labels.append("HT_SMART_MONEY (Fluxo no 1º Tempo)")
-                                level = 3
-
-                        # 2. Detector "Late Goal Anomaly" (Final de Jogo + Pressão Baixa + Volume Alto)
-                        if match['is_live'] and current_min >= 80 and "OVER" in market_name_up:
-                            if avg_appm <= LOW_PRESSURE_LIMIT:
-                                manipulation_labels.append("LATE_GOAL_ANOMALY (Fluxo tardio sem pressão)")
-                                level = 3
-
-                        # 3. Detector "Correct Score Dive" (Placares Atípicos)
-                        if "CORRECT SCORE" in market_name_up:
-                            atypical_scores = ["3-2", "2-3", "4-1", "1-4", "3-3"]
-                            if any(score in selection_up for score in atypical_scores):
-                                manipulation_labels.append(f"CORRECT_SCORE_DIVE ({selection_up})")
-                                level = 3
-
-                        # 4. Detector "HT/FT Turnaround" (Viradas)
-                        if "HT/FT" in market_name_up:
-                            if "/" in selection_up:
-                                parts = selection_up.split("/")
-                                if len(parts) >= 2 and parts[0].strip() != parts[1].strip():
-                                    manipulation_labels.append(f"HT_FT_TURNAROUND ({selection_up})")
-                                    level = 3
-
-                        # 5. Detector "High Odds Sniper" (Odds Altas > 4.0)
-                        if current_odd >= 4.0:
-                            if not is_ocean:
-                                manipulation_labels.append(f"HIGH_ODDS_SNIPER (Odd: {current_odd})")
-                                level = 3
-                            else:
-                                manipulation_labels.append("FAVORITE_DIVERGENCE (Dinheiro no Underdog?)")
-                                level = 3
-
-                        # 6. Detector "Match Odds Focus"
-                        if "MATCH ODDS" in market_name_up or "MATCH RESULT" in market_name_up:
-                            if not any("HIGH_ODDS" in l for l in manipulation_labels):
-                                manipulation_labels.append("MATCH_ODDS_FOCUS (Fluxo no Principal)")
-                                if pct_change >= 10: level = 3
-
-                        # 7. Detector "Cesto de Lixo" (Heurística Geral)
-                        if match['is_live'] and avg_appm <= LOW_PRESSURE_LIMIT and primary_anomaly['details']['change_eur'] >= MONEY_SPARK_POOL * 4:
-                            if not any("LATE_GOAL" in l for l in manipulation_labels):
-                                manipulation_labels.append("CESTO_DE_LIXO (Suspeita manipulação final)")
-                                level = 3
-
-                        # 8. Detector "Pre-Game Drop" (Liquidez Piscina + Queda > 20% sem jogo iniciado)
-                        if primary_anomaly['details']['score'] == "0-0" and not is_ocean:
-                            if pct_change >= PRE_GAME_DROP_LIMIT:
-                                manipulation_labels.append("PRE_GAME_SMART_MONEY (Info Privilegiada?)")
-                                level = 3
-
-                        # 9. Detector "Drop Institucional" (Oceano + Volume Massivo + Drop Cirúrgico)
-                        is_institutional = False
-                        if is_ocean:
-                            vol_anomaly = primary_anomaly['details']['change_eur']
-                            if vol_anomaly >= INSTITUTIONAL_VOL_BARRIER and OCEAN_DROP_MIN <= pct_change <= 15:
-                                manipulation_labels.append(f"INSTITUTIONAL_SMART_MONEY (Vol: {vol_anomaly}€)")
-                                is_institutional = True
-                                level = 3
+                        # Detectores clássicos (core/rules.py) sobre a anomalia principal
+                        primary_rules = rules.evaluate(
+                            [anomaly_features(primary_anomaly, match['is_live'], is_ocean, current_min, avg_appm)],
+                            labels=[manipulation_labels],
+                        )[0]
+                        manipulation_labels.extend(primary_rules["labels"])
+                        level = max(level, primary_rules["level"])
+                        is_institutional = "institutional" in primary_rules["flags"]
 
                         # Definição de Nível Padrão se não marcado como manipulação
                         if level < 3:
@@ -533,16 +506,50 @@ async def main():
                             f'🔗 <a href="{primary_anomaly["bf_url"]}">⚡ ABRIR NA BETFAIR</a>'
                         )
 
-                        if send_telegram_alert(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, msg):
-                            print(f"      [OK] Alerta enviado com sucesso para {teams}!")
+                        def _on_sent(_result, alert_hash=alert_hash, teams=teams):
+                            print(f"      [OK] Alerta entregue com sucesso para {teams}!")
+                            inflight_alerts.discard(alert_hash)
                             sent_alerts[alert_hash] = time.time()
                             save_json(SENT_ALERTS_FILE, sent_alerts)
-                        else:
+
+                        def _on_failed(_error, alert_hash=alert_hash, teams=teams):
                             print(f"      [X] Falha ao enviar alerta para {teams}. Verifique logs do Telegram acima.")
+                            inflight_alerts.discard(alert_hash)
+
+                        # Fan-out assíncrono: o scraping segue sem esperar Telegram/webhooks
+                        filter_keys = {
+                            "tier":       sm_tier_label,
+                            "verdict":    str(ai_data.get("verdict", "")),
+                            "confidence": conf_val,
+                            "tables":     {market_table(a["market"]) for a in found_anomalies},
+                            "max_drop":   max(to_float(a["details"].get("change_pct", "")) for a in found_anomalies),
+                        }
+                        payload = dict(
+                            filter_keys,
+                            source="legacy",
+                            ts=time.time(),
+                            game_id=gid,
+                            teams=teams,
+                            league=league,
+                            score=last_score,
+                            time=time_info,
+                            tables=sorted(filter_keys["tables"]),
+                            betting_tip=ai_data.get("betting_tip", ""),
+                            reasoning=ai_data.get("reasoning", ""),
+                            anomalies=[a["reason"] for a in found_anomalies],
+                            excapper_url=excapper_url,
+                        )
+                        if fanout.dispatch(filter_keys, msg, payload, on_delivered=_on_sent, on_failed=_on_failed):
+                            inflight_alerts.add(alert_hash)
 
                     except Exception as e:
                         print(f"      [!] Erro na análise da partida {gid}: {f'{e.__class__.__name__}: {e}'}")
 
+                for line in shared.stats_lines():
+                    print(f"[*] {line}")
+                print(f"[*] {fanout.stats_line()}")
+                print(f"[*] {fixtures.stats_line()}")
+                metrics.CYCLE_SECONDS.observe(time.monotonic() - cycle_started, flow="legacy")
                 print(f"[*] Ciclo finalizado. Aguardando 60s...")
                 await asyncio.sleep(60)
 
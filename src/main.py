@@ -1,24 +1,45 @@
 import asyncio
 import sys
 import argparse
-from src.flows.dropping_flow import main as dropping_main
-from src.flows.legacy_flow import main as legacy_main
+from src.core import startup   # Primeiro import: cronômetro de partida
+
+# Os fluxos são importados só depois de escolher o modo: cada um puxa
+# Playwright, scrapers e SDKs próprios que o outro modo não usa.
 
 async def run():
     parser = argparse.ArgumentParser(description="Kairos Intelligence Betting Bot")
     parser.add_argument(
         "--mode", 
-        choices=["dropping", "legacy"], 
+        choices=["dropping", "legacy", "both"], 
         default="dropping",
         help="Escolha o fluxo de monitoramento (default: dropping)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processos de scraping, cada um com seu navegador (modos dropping/both; default: 1)"
+    )
     
     args = parser.parse_args()
     
     if args.mode == "dropping":
+        from src.flows.dropping_flow import main as dropping_main
+        startup.mark("imports")
         print("[*] Iniciando modo Monitoramento DroppingOdds (Recomendado)...")
-        await dropping_main()
+        if args.workers > 1:
+            print(f"[*] Modo supervisor: {args.workers} processos worker.")
+        await dropping_main(workers=args.workers)
+    elif args.mode == "both":
+        from src.flows.combined_flow import main as combined_main
+        startup.mark("imports")
+        print("[*] Iniciando modos DroppingOdds + Legado em infraestrutura compartilhada...")
+        await combined_main(workers=args.workers)
     else:
+        from src.flows.legacy_flow import main as legacy_main
+        startup.mark("imports")
+        if args.workers > 1:
+            print("[!] --workers só se aplica aos modos dropping/both. Ignorando.")
         print("[*] Iniciando modo Monitoramento Legado (Excapper + SokkerPro)...")
         await legacy_main()
 
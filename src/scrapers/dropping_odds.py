@@ -19,14 +19,22 @@ Estrutura REAL verificada via browser inspection:
 
 import asyncio
 import re
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
 from playwright.async_api import Page
 
+from ..core import metrics
+from ..config import (
+    DROP_MIN_PCT, DROP_STRONG_PCT, DROP_ALERT_PCT, DROP_HISTORY_WINDOW, DROPPING_ODDS_BASE_URL, EXCAPPER_BASE_URL,
+)
+
 # ─── Constantes ────────────────────────────────────────────────────────────────
-BASE_URL  = "https://dropping-odds.com"
-LIVE_URL  = "https://dropping-odds.com/index.php?view=live"
+BASE_URL  = DROPPING_ODDS_BASE_URL
+LIVE_URL  = f"{BASE_URL}/index.php?view=live"
 
-from ..config import DROP_MIN_PCT, DROP_STRONG_PCT, DROP_ALERT_PCT
+# Host do Excapper nos links da página do evento ("excapper.com" em produção)
+EXCAPPER_HOST = urlsplit(EXCAPPER_BASE_URL).netloc.removeprefix("www.")
+EXCAPPER_LINK_RE = re.compile(r'https?://(?:www\.)?' + re.escape(EXCAPPER_HOST) + r'[^\s"\'<>]*')
 
 # Mapeamento nome → parâmetro URL
 TABLE_TABS = {
@@ -48,12 +56,22 @@ TABLE_PCT_COL_HINTS = {
     "HT 1X2":   ["home (%)", "away (%)", "draw (%)", "%"],
 }
 
+# Coluna TIME: "67'", "45+2'", "HT" (horários/datas do pré-jogo não viram minuto)
+MINUTE_RE = re.compile(r"^(\d{1,3})(?:\s*\+\s*(\d{1,2}))?\s*['′]")
+
+# Coluna da linha (Total/Handicap): "2.5", "0, -0.5" (asiática dividida)
+LINE_NUM_RE = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
 
 # ─── Helpers ───────────────────────────────────────────────────────────────────
 
 def _parse_pct(text: str) -> float:
     """Extrai valor absoluto de porcentagem de '-12.5%' → 12.5."""
     text = str(text).strip()
+    body = text[:-1] if text.endswith("%") else text
+    digits = body.removeprefix("-").replace(".", "", 1)
+    if digits.isascii() and digits.isdecimal():   # "-12.5%": caminho rápido, sem regex
+        return abs(float(body))
     try:
         cleaned = re.sub(r"[^0-9.\-,]", "", text).replace(",", ".")
         return abs(float(cleaned)) if cleaned and cleaned != "-" else 0.0
@@ -63,6 +81,10 @@ def _parse_pct(text: str) -> float:
 
 def _parse_odd(text: str) -> float:
     """Extrai valor de odd de texto, retorna 0 se inválido."""
+    digits = text.replace(".", "", 1) if isinstance(text, str) else ""
+    if digits.isascii() and digits.isdecimal():   # "2.15": caminho rápido
+        v = float(text)
+        return v if 1.001 < v < 1000.0 else 0.0
     try:
         cleaned = re.sub(r"[^0-9.,]", "", str(text)).replace(",", ".")
         v = float(cleaned) if cleaned else 0.0
@@ -71,6 +93,17 @@ def _parse_odd(text: str) -> float:
         return 0.0
 
 
+def _parse_minute(text: str) -> Optional[int]:
+    """"67'" → 67, "45+2'" → 47, "HT" → 45; qualquer outra coisa → None."""
+    text = str(text).strip()
+    if text[-1:] == "'" and text[:-1].isascii() and text[:-1].isdecimal():
+        return int(text[:-1])
+    m = MINUTE_RE.match(text)
+    if m:
+        return int(m.group(1)) + int(m.group(2) or 0)
+    return 45 if text.upper() == "HT" else None
+
+
 def _is_pct_col(header: str) -> bool:
     """Verifica se um header de coluna indica percentagem de mudança."""
     h = header.lower().strip()
@@ -85,6 +118,238 @@ def _drop_severity(drop_pct: float) -> str:
     return "🟡 MODERADO"
 
 
+# ─── Colunas e Drops (puros: sem Playwright, usados também pelo benchmark) ─────
+
+def _map_columns(headers: List[str], table_name: str) -> Dict:
+    """
+    Cabeçalhos da tabela → índices das colunas.
+    Retorna {"odd": {seleção: idx}, "pct": {seleção: idx}, "score": idx, "time": idx,
+             "line": idx, "penalty": idx, "red_card": idx} (-1 = coluna ausente).
+    """
+    odd_col_map = {}
+    pct_col_map = {}
+    score_idx = -1
+    time_idx = -1
+    line_idx = -1
+    penalty_idx = -1
+    red_card_idx = -1
+
+    for i, h in enumerate(headers):
+        hl = h.lower().strip()
+        if "score" in hl: score_idx = i
+        elif hl == "time": time_idx = i
+        elif hl == "total": line_idx = i
+        elif "home (%)" in hl or "home(%)" in hl: pct_col_map["Home"] = i
+        elif "away (%)" in hl or "away(%)" in hl: pct_col_map["Away"] = i
+        elif "draw (%)" in hl or "draw(%)" in hl: pct_col_map["Draw"] = i
+        elif "over (%)" in hl or "over(%)" in hl: pct_col_map["Over"] = i
+        elif "under (%)" in hl or "under(%)" in hl: pct_col_map["Under"] = i
+        elif hl == "home": odd_col_map["Home"] = i
+        elif hl == "draw": odd_col_map["Draw"] = i
+        elif hl == "away": odd_col_map["Away"] = i
+        elif hl == "over": odd_col_map["Over"] = i
+        elif hl == "under": odd_col_map["Under"] = i
+        elif hl == "handicap":
+            odd_col_map["Handicap"] = i
+            line_idx = i
+        elif "penalty" in hl: penalty_idx = i
+        elif "red" in hl: red_card_idx = i
+        elif "drop" in hl or "sharp" in hl or "change" in hl:
+            key = {"Total": "Over/Under", "HT Total": "Over/Under", "Handicap": "Handicap"}.get(table_name, "Principal")
+            pct_col_map[key] = i
+
+    return {"odd": odd_col_map, "pct": pct_col_map, "score": score_idx, "time": time_idx,
+            "line": line_idx, "penalty": penalty_idx, "red_card": red_card_idx}
+
+
+def _drop_entry(table_name: str, row: Dict) -> Dict:
+    """Linha de _compute_table_drops → item de drops_summary."""
+    return {
+        "table":       table_name,
+        "selection":   row["selection"],
+        "open_odd":    row.get("open_odd", 0.0),
+        "current_odd": row.get("current_odd", 0.0),
+        "drop_pct":    row["drop_pct"],
+        "severity":    _drop_severity(row["drop_pct"]),
+        "history":     row.get("history"),
+    }
+
+
+def _parse_line(text: str) -> Optional[float]:
+    """Linha de Total/Handicap: "2.5" → 2.5, "0, -0.5" (asiática dividida) → -0.25; vazio → None."""
+    nums = LINE_NUM_RE.findall(str(text))
+    return sum(float(n) for n in nums) / len(nums) if nums else None
+
+
+def _table_odds(all_row_data: List[Dict], cols: Dict) -> Dict:
+    """
+    Odds de abertura (linha mais antiga válida) e atuais (mais recente válida) de
+    cada seleção da tabela, mais a linha de Total/Handicap — entrada de core/implied.py.
+    {"Home": [abertura, atual], ..., "line": [abertura, atual]}
+    """
+    out = {}
+    columns = {sel: idx for sel, idx in cols["odd"].items() if sel != "Handicap"}   # Handicap = linha
+    for sel, idx in columns.items():
+        odds = [_parse_odd(item["texts"][idx]) for item in all_row_data if idx < len(item["texts"])]
+        odds = [o for o in odds if o > 0]
+        if odds:
+            out[sel] = [odds[-1], odds[0]]
+    line_idx = cols.get("line", -1)
+    if line_idx >= 0:
+        lines = [_parse_line(item["texts"][line_idx]) for item in all_row_data if line_idx < len(item["texts"])]
+        lines = [l for l in lines if l is not None]
+        if lines:
+            out["line"] = [lines[-1], lines[0]]
+    return out
+
+
+def _history_features(drops: List[float], times: List[float], unit: str) -> Dict:
+    """
+    Queda acumulada por linha (% sobre a abertura, da mais antiga à atual) → features:
+      velocity      queda por minuto (ou por linha) nos últimos DROP_HISTORY_WINDOW passos
+      acceleration  velocidade recente − velocidade da janela anterior
+      max_step      maior queda num único passo, e quando (max_step_at)
+      change_at     ponto de mudança (CUSUM dos passos): dali em diante as quedas
+                    ficam acima da média; cusum = queda excedente desde então
+    """
+    n = len(drops)
+    out = {"points": n, "unit": unit, "velocity": 0.0, "acceleration": 0.0,
+           "max_step": 0.0, "max_step_at": None, "change_at": None, "cusum": 0.0}
+    if n < 2:
+        return out
+
+    def rate(i: int, j: int) -> float:
+        return (drops[j] - drops[i]) / max(times[j] - times[i], 1)
+
+    last = n - 1
+    w = min(DROP_HISTORY_WINDOW, last)
+    velocity = rate(last - w, last)
+    prev_start = max(0, last - 2 * w)
+    previous = rate(prev_start, last - w) if prev_start < last - w else velocity
+
+    # Maior passo e CUSUM numa passada: C_i = Σ (passo − média); o mínimo marca a mudança
+    mean = (drops[-1] - drops[0]) / last
+    best, best_i = drops[1] - drops[0], 1
+    cusum, c_min, c_min_i = 0.0, 0.0, 0
+    prev = drops[0]
+    for i in range(1, n):
+        step = drops[i] - prev
+        prev = drops[i]
+        if step > best:
+            best, best_i = step, i
+        cusum += step - mean
+        if cusum < c_min:
+            c_min, c_min_i = cusum, i
+
+    out.update({
+        "velocity":     round(velocity, 3),
+        "acceleration": round(velocity - previous, 3),
+        "max_step":     round(best, 2),
+        "max_step_at":  times[best_i],
+        "change_at":    times[c_min_i] if c_min < 0 else None,
+        "cusum":        round(abs(c_min), 2),
+    })
+    return out
+
+
+def _history_axis(all_row_data: List[Dict], time_idx: int) -> tuple:
+    """Eixo de tempo cronológico: minutos da coluna TIME (repetindo o último válido) ou nº da linha."""
+    n = len(all_row_data)
+    if time_idx >= 0:
+        minutes, last, seen = [], 0, False
+        for item in reversed(all_row_data):
+            texts = item["texts"]
+            m = _parse_minute(texts[time_idx]) if time_idx < len(texts) else None
+            if m is not None:
+                last, seen = m, True
+            minutes.append(last)
+        if seen:
+            return minutes, "min"
+    return list(range(n)), "linha"
+
+
+def _compute_table_drops(all_row_data: List[Dict], cols: Dict) -> List[Dict]:
+    """
+    Linhas lidas da tabela (mais recente primeiro) → drops por seleção.
+    Cada linha: {"texts", "class", "td_classes", "has_penalty", "has_red_card"}.
+    """
+    rows_data = []
+    if not all_row_data:
+        return rows_data
+    odd_col_map, pct_col_map, score_idx = cols["odd"], cols["pct"], cols["score"]
+
+    # ── Histórico e Cálculo de Drops ─────────────────────────────────────────
+    # Usar a primeira linha como atual e a última como abertura
+    first_row = all_row_data[0]["texts"]
+    last_row  = all_row_data[-1]["texts"]
+
+    # Anomalias de Classe (Red2, Red3 são prioritárias)
+    # Scan em todas as linhas para ver se houve sinal crítico em algum momento
+    anomaly_signals = []
+    for item in all_row_data:
+        combined_cls = item["class"] + " " + " ".join(item["td_classes"])
+        if "Red3" in combined_cls: anomaly_signals.append("CRITICAL_DROP_RED3")
+        elif "Red2" in combined_cls: anomaly_signals.append("STRONG_DROP_RED2")
+
+        if item["has_penalty"]: anomaly_signals.append("PENALTY_EVENT")
+        if item["has_red_card"]: anomaly_signals.append("RED_CARD_EVENT")
+
+    # Histórico completo (mais antiga → atual) para as features de velocidade/mudança
+    chron = all_row_data[::-1]
+    times, unit = _history_axis(all_row_data, cols.get("time", -1))
+
+    def odd_history(oc: int) -> Dict:
+        odds = [_parse_odd(item["texts"][oc]) if oc < len(item["texts"]) else 0.0 for item in chron]
+        odds_t = [(o, t) for o, t in zip(odds, times) if o > 0]
+        if not odds_t:
+            return _history_features([], [], unit)
+        open_odd = odds_t[0][0]
+        return _history_features([(open_odd - o) / open_odd * 100 for o, _ in odds_t], [t for _, t in odds_t], unit)
+
+    def pct_history(pc: int) -> Dict:
+        return _history_features(
+            [_parse_pct(item["texts"][pc]) if pc < len(item["texts"]) else 0.0 for item in chron], times, unit
+        )
+
+    # Cálculo por seleções
+    if pct_col_map:
+        for sel_name, pct_idx in pct_col_map.items():
+            if pct_idx >= len(first_row): continue
+            drop_pct = _parse_pct(first_row[pct_idx])
+
+            current_odd = _parse_odd(first_row[odd_col_map[sel_name]]) if sel_name in odd_col_map else 0.0
+            open_odd    = _parse_odd(last_row[odd_col_map[sel_name]]) if sel_name in odd_col_map else 0.0
+
+            rows_data.append({
+                "selection":   sel_name,
+                "open_odd":    open_odd,
+                "current_odd": current_odd,
+                "drop_pct":    drop_pct,
+                "score":       first_row[score_idx] if score_idx >= 0 else "",
+                "signals":     list(set(anomaly_signals)), # Eventos detectados no histórico
+                "history":     odd_history(odd_col_map[sel_name]) if sel_name in odd_col_map else pct_history(pct_idx),
+            })
+
+    elif odd_col_map:
+        for sel_name, oc in odd_col_map.items():
+            if oc >= len(first_row) or oc >= len(last_row): continue
+            curr = _parse_odd(first_row[oc])
+            orig = _parse_odd(last_row[oc])
+            if orig > 0 and curr > 0:
+                drop_pct = round(((orig - curr) / orig * 100), 2)
+                rows_data.append({
+                    "selection":   sel_name,
+                    "open_odd":    orig,
+                    "current_odd": curr,
+                    "drop_pct":    drop_pct,
+                    "score":       first_row[score_idx] if score_idx >= 0 else "",
+                    "signals":     list(set(anomaly_signals)),
+                    "history":     odd_history(oc),
+                })
+
+    return rows_data
+
+
 # ─── Classe Principal ──────────────────────────────────────────────────────────
 
 class DroppingOddsScraper:
@@ -109,7 +374,8 @@ class DroppingOddsScraper:
         matches = []
         try:
             print("[*] [DO] Acessando lista live...")
-            await page.goto(LIVE_URL, wait_until="domcontentloaded", timeout=60000)
+            with metrics.track_page_load("droppingodds", "live"):
+                await page.goto(LIVE_URL, wait_until="domcontentloaded", timeout=60000)
             await page.wait_for_timeout(4000)
 
             rows = await page.query_selector_all("tr.a_link")
@@ -194,9 +460,11 @@ class DroppingOddsScraper:
         {
             "excapper_url": str | None,
             "tables": { "1X2": [...], "Total": [...], ... },
+            "odds":   { "1X2": {"Home": [abertura, atual], ...}, "Total": {..., "line": [..]} },
             "drops_summary": [
                 {"table": str, "selection": str, "open_odd": float,
-                 "current_odd": float, "drop_pct": float, "severity": str}
+                 "current_odd": float, "drop_pct": float, "severity": str,
+                 "history": {velocity, acceleration, max_step, change_at, ...}}
             ],
             "has_drops": bool,
             "max_drop_pct": float,
@@ -205,6 +473,7 @@ class DroppingOddsScraper:
         result = {
             "excapper_url":  None,
             "tables":        {},
+            "odds":          {},
             "drops_summary": [],
             "has_drops":     False,
             "max_drop_pct":  0.0,
@@ -213,7 +482,8 @@ class DroppingOddsScraper:
         # ── 1. Página base: extrai link Excapper ─────────────────────────────
         base_url = f"{BASE_URL}/event.php?id={game_id}"
         try:
-            await page.goto(base_url, wait_until="domcontentloaded", timeout=45000)
+            with metrics.track_page_load("droppingodds", "event"):
+                await page.goto(base_url, wait_until="domcontentloaded", timeout=45000)
             await page.wait_for_timeout(2000)
             result["excapper_url"] = await self._find_excapper_link(page)
             if result["excapper_url"]:
@@ -228,23 +498,20 @@ class DroppingOddsScraper:
         for table_name, tab_param in TABLE_TABS.items():
             try:
                 tab_url = f"{BASE_URL}/event.php?id={game_id}&t={tab_param}"
-                await page.goto(tab_url, wait_until="domcontentloaded", timeout=30000)
+                with metrics.track_page_load("droppingodds", table_name):
+                    await page.goto(tab_url, wait_until="domcontentloaded", timeout=30000)
                 await page.wait_for_timeout(2000)
 
-                rows_data = await self._extract_table_rows(page, table_name)
+                rows_data, odds = await self._extract_table_rows(page, table_name)
+                if odds:
+                    result["odds"][table_name] = odds
                 if rows_data:
                     result["tables"][table_name] = rows_data
                     drops_in_tab = [r for r in rows_data if r["drop_pct"] >= DROP_MIN_PCT]
+                    metrics.ROWS_PARSED.inc(len(rows_data), site="droppingodds", table=table_name)
+                    metrics.DROPS_FOUND.inc(len(drops_in_tab), table=table_name)
                     print(f"  [+] [{table_name}] {len(rows_data)} linhas | {len(drops_in_tab)} drops ≥{DROP_MIN_PCT}%")
-                    for row in drops_in_tab:
-                        all_drops.append({
-                            "table":       table_name,
-                            "selection":   row["selection"],
-                            "open_odd":    row.get("open_odd", 0.0),
-                            "current_odd": row.get("current_odd", 0.0),
-                            "drop_pct":    row["drop_pct"],
-                            "severity":    _drop_severity(row["drop_pct"]),
-                        })
+                    all_drops.extend(_drop_entry(table_name, row) for row in drops_in_tab)
                 else:
                     print(f"  [-] [{table_name}] Sem dados.")
 
@@ -262,7 +529,7 @@ class DroppingOddsScraper:
     async def _find_excapper_link(self, page: Page) -> Optional[str]:
         """Procura link do Excapper usando seletor verificado."""
         try:
-            links = await page.query_selector_all("a[href*='excapper.com']")
+            links = await page.query_selector_all(f"a[href*='{EXCAPPER_HOST}']")
             for link in links:
                 href = await link.get_attribute("href")
                 if href:
@@ -270,25 +537,25 @@ class DroppingOddsScraper:
 
             # Fallback via regex no HTML da página
             content = await page.content()
-            found = re.findall(r'https?://(?:www\.)?excapper\.com[^\s"\'<>]*', content)
+            found = EXCAPPER_LINK_RE.findall(content)
             if found:
                 return found[0]
         except Exception:
             pass
         return None
 
-    async def _extract_table_rows(self, page: Page, table_name: str) -> List[Dict]:
+    async def _extract_table_rows(self, page: Page, table_name: str) -> Tuple[List[Dict], Dict]:
         """
         Extrai drops de odds e anomalias baseadas em classes (Red1, Red2, Red3)
-        e eventos (Penalty, Red Card).
+        e eventos (Penalty, Red Card). Devolve (linhas por seleção, odds abertura/atual).
         """
-        rows_data = []
+        rows_data, odds = [], {}
         try:
             table = await page.query_selector("div.tablediv table")
             if not table:
                 table = await page.query_selector("table")
             if not table:
-                return rows_data
+                return rows_data, odds
 
             # ── Ler headers para identificar colunas ────────────────────────
             headers = []
@@ -297,32 +564,8 @@ class DroppingOddsScraper:
                 header_cells = await header_row.query_selector_all("th, td")
                 headers = [(await c.inner_text()).strip() for c in header_cells]
 
-            # Mapear índices
-            odd_col_map = {}
-            pct_col_map = {}
-            score_idx = -1
-            penalty_idx = -1
-            red_card_idx = -1
-
-            for i, h in enumerate(headers):
-                hl = h.lower().strip()
-                if "score" in hl: score_idx = i
-                elif "home (%)" in hl or "home(%)" in hl: pct_col_map["Home"] = i
-                elif "away (%)" in hl or "away(%)" in hl: pct_col_map["Away"] = i
-                elif "draw (%)" in hl or "draw(%)" in hl: pct_col_map["Draw"] = i
-                elif "over (%)" in hl or "over(%)" in hl: pct_col_map["Over"] = i
-                elif "under (%)" in hl or "under(%)" in hl: pct_col_map["Under"] = i
-                elif hl == "home": odd_col_map["Home"] = i
-                elif hl == "draw": odd_col_map["Draw"] = i
-                elif hl == "away": odd_col_map["Away"] = i
-                elif hl == "over": odd_col_map["Over"] = i
-                elif hl == "under": odd_col_map["Under"] = i
-                elif hl == "handicap": odd_col_map["Handicap"] = i
-                elif "penalty" in hl: penalty_idx = i
-                elif "red" in hl: red_card_idx = i
-                elif "drop" in hl or "sharp" in hl or "change" in hl:
-                    key = {"Total": "Over/Under", "HT Total": "Over/Under", "Handicap": "Handicap"}.get(table_name, "Principal")
-                    pct_col_map[key] = i
+            cols = _map_columns(headers, table_name)
+            penalty_idx, red_card_idx = cols["penalty"], cols["red_card"]
 
             # ── Ler linhas buscando classes e ícones ────────────────────────
             data_rows = await table.query_selector_all("tbody tr")
@@ -366,64 +609,13 @@ class DroppingOddsScraper:
                         "has_red_card": has_red_card
                     })
 
-            if not all_row_data:
-                return rows_data
-
-            # ── Histórico e Cálculo de Drops ─────────────────────────────────
-            # Usar a primeira linha como atual e a última como abertura
-            first_row_item = all_row_data[0]
-            first_row      = first_row_item["texts"]
-            last_row       = all_row_data[-1]["texts"]
-
-            # Anomalias de Classe (Red2, Red3 são prioritárias)
-            # Scan em todas as linhas para ver se houve sinal crítico em algum momento
-            anomaly_signals = []
-            for item in all_row_data:
-                combined_cls = item["class"] + " " + " ".join(item["td_classes"])
-                if "Red3" in combined_cls: anomaly_signals.append("CRITICAL_DROP_RED3")
-                elif "Red2" in combined_cls: anomaly_signals.append("STRONG_DROP_RED2")
-                
-                if item["has_penalty"]: anomaly_signals.append("PENALTY_EVENT")
-                if item["has_red_card"]: anomaly_signals.append("RED_CARD_EVENT")
-
-            # Cálculo por seleções
-            if pct_col_map:
-                for sel_name, pct_idx in pct_col_map.items():
-                    if pct_idx >= len(first_row): continue
-                    drop_pct = _parse_pct(first_row[pct_idx])
-                    
-                    current_odd = _parse_odd(first_row[odd_col_map[sel_name]]) if sel_name in odd_col_map else 0.0
-                    open_odd    = _parse_odd(last_row[odd_col_map[sel_name]]) if sel_name in odd_col_map else 0.0
-
-                    rows_data.append({
-                        "selection":   sel_name,
-                        "open_odd":    open_odd,
-                        "current_odd": current_odd,
-                        "drop_pct":    drop_pct,
-                        "score":       first_row[score_idx] if score_idx >= 0 else "",
-                        "signals":     list(set(anomaly_signals)), # Eventos detectados no histórico
-                    })
-
-            elif odd_col_map:
-                for sel_name, oc in odd_col_map.items():
-                    if oc >= len(first_row) or oc >= len(last_row): continue
-                    curr = _parse_odd(first_row[oc])
-                    orig = _parse_odd(last_row[oc])
-                    if orig > 0 and curr > 0:
-                        drop_pct = round(((orig - curr) / orig * 100), 2)
-                        rows_data.append({
-                            "selection":   sel_name,
-                            "open_odd":    orig,
-                            "current_odd": curr,
-                            "drop_pct":    drop_pct,
-                            "score":       first_row[score_idx] if score_idx >= 0 else "",
-                            "signals":     list(set(anomaly_signals)),
-                        })
+            rows_data = _compute_table_drops(all_row_data, cols)
+            odds = _table_odds(all_row_data, cols)
 
         except Exception as e:
             print(f"    [!] Erro ao extrair [{table_name}]: {e}")
 
-        return rows_data
+        return rows_data, odds
 
 
     def _infer_selection_for_pct(
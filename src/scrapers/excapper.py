@@ -4,6 +4,9 @@ import unicodedata
 from typing import List, Dict, Optional
 from playwright.async_api import Page
 
+from ..core import metrics
+from ..config import EXCAPPER_BASE_URL
+
 def normalize_name(text: str) -> str:
     """Remove acentos, converte para minúsculas e simplifica nomes de times."""
     if not text: return ""
@@ -16,15 +19,16 @@ def normalize_name(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
 class ExcapperScraper:
-    BASE_URL = "https://www.excapper.com/"
-    LIVE_URL = "https://www.excapper.com/#live"
+    BASE_URL = EXCAPPER_BASE_URL
+    LIVE_URL = f"{EXCAPPER_BASE_URL}#live"
 
     async def get_live_matches(self, page: Page) -> List[Dict]:
         """Extrai a lista de partidas ao vivo do Money Way."""
         matches = []
         try:
             print("[*] [EXCAPPER] Acessando lista live...")
-            await page.goto(self.LIVE_URL, wait_until="networkidle", timeout=60000)
+            with metrics.track_page_load("excapper", "live"):
+                await page.goto(self.LIVE_URL, wait_until="networkidle", timeout=60000)
             await page.wait_for_timeout(3000)
 
             # Selecionar a aba Live se não estiver ativa
@@ -76,7 +80,8 @@ class ExcapperScraper:
         url = f"{self.BASE_URL}?action=game&id={game_id}"
         try:
             print(f"[*] [EXCAPPER] Acessando detalhes do jogo {game_id}...")
-            await page.goto(url, wait_until="domcontentloaded", timeout=45000)
+            with metrics.track_page_load("excapper", "game"):
+                await page.goto(url, wait_until="domcontentloaded", timeout=45000)
             await page.wait_for_timeout(3000)
 
             # Mapear abas para nomes de mercados e IDs da Betfair
@@ -135,6 +140,7 @@ class ExcapperScraper:
                     })
                 
                 if market_flow:
+                    metrics.ROWS_PARSED.inc(len(market_flow), site="excapper", table=market_name)
                     all_markets_data[market_name] = {
                         "market_id": meta["bf_id"],
                         "betfair_url": meta["bf_url"],
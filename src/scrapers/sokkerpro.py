@@ -1,13 +1,347 @@
 import asyncio
 import re
-from typing import Dict, Optional
+import time
+from typing import Dict, List, Optional
 from playwright.async_api import Page
 
+from ..core import metrics
+from ..core.fixture_cache import FixtureCache
+from ..core.identity import normalize_team
+from ..config import SOKKERPRO_JSON_WAIT_SEC
+
+# ─── Stats via JSON da própria aplicação ──────────────────────────────────────
+# O painel de detalhes é preenchido por respostas XHR/fetch em JSON. Os nomes
+# dos campos variam entre versões da API, então a busca é por apelidos da
+# chave normalizada (minúsculas, só letras e dígitos).
+STAT_ALIASES = {
+    "ataques_perigosos": {"dangerousattacks", "ataquesperigosos", "dangattacks"},
+    "ataques":           {"attacks", "ataques"},
+    "posse":             {"possession", "ballpossession", "possessiontime", "posse"},
+    "appm_5m":           {"appm5", "appm5m", "appm5min", "appmlast5"},
+    "appm_10m":          {"appm10", "appm10m", "appm10min", "appmlast10"},
+    "gols":              {"goals", "score", "gols", "placar"},
+}
+MINUTE_KEYS = ("minute", "currentminute", "matchminute", "elapsed", "minuto", "minutes")
+SIDE_KEYS   = {"home": ("home", "casa", "localteam", "team1", "h"), "away": ("away", "fora", "visitorteam", "team2", "a")}
+LABEL_KEYS  = ("type", "name", "label", "stat", "key")
+LOCATION_KEYS = ("location", "side")
+FIXTURE_ID_KEYS = ("fixtureid", "matchid", "eventid", "gameid")
+# Chaves com o nome do time: "home", "hometeam", "home_name", "localteam", ...
+TEAM_KEYS = {side: tuple(alias + suffix for alias in aliases if len(alias) > 1
+                         for suffix in ("", "team", "name", "teamname"))
+             for side, aliases in SIDE_KEYS.items()}
+JSON_CAPTURE_MAX = 30   # Respostas guardadas por página (as mais recentes)
+
+
+def _norm_key(key) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+def _num(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        m = re.fullmatch(r"\s*(-?\d+(?:[.,]\d+)?)\s*['%]?\s*", value)
+        if m:
+            return float(m.group(1).replace(",", "."))
+    return None
+
+
+def _side_pair(keys: Dict) -> Optional[tuple]:
+    """{"home": x, "away": y} (e variações), com chaves já normalizadas → (x, y)."""
+    home = next((_num(keys[k]) for k in SIDE_KEYS["home"] if k in keys), None)
+    away = next((_num(keys[k]) for k in SIDE_KEYS["away"] if k in keys), None)
+    return (home, away) if home is not None and away is not None else None
+
+
+def _pair_value(value) -> Optional[tuple]:
+    if isinstance(value, dict):
+        return _side_pair({_norm_key(k): v for k, v in value.items()})
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        home, away = _num(value[0]), _num(value[1])
+        if home is not None and away is not None:
+            return (home, away)
+    if isinstance(value, str):                                  # "2-1" / "55:45"
+        m = re.fullmatch(r"\s*(\d+)\s*[-:x]\s*(\d+)\s*", value)
+        if m:
+            return (float(m.group(1)), float(m.group(2)))
+    return None
+
+
+def _walk_stats(node, found: Dict, side: Optional[str] = None, depth: int = 0, skip=None):
+    """
+    Percorre o JSON preenchendo `found` (stat → (casa, fora), "minute" → int); o primeiro achado vale.
+    `skip(chaves)` verdadeiro descarta o objeto e tudo abaixo dele (jogo de outro time).
+    """
+    if depth > 12:
+        return
+    if isinstance(node, list):
+        for item in node:
+            _walk_stats(item, found, side, depth + 1, skip)
+        return
+    if not isinstance(node, dict):
+        return
+
+    keys = {_norm_key(k): v for k, v in node.items()}
+    if skip and depth and skip(keys):
+        return
+    label = next((_norm_key(keys[k]) for k in LABEL_KEYS if isinstance(keys.get(k), str)), None)
+    location = next((_norm_key(keys[k]) for k in LOCATION_KEYS if isinstance(keys.get(k), str)), None)
+    if location in ("home", "away"):
+        side = location
+
+    for stat, aliases in STAT_ALIASES.items():
+        if stat in found:
+            continue
+        pair = None
+        if label in aliases:                                   # {"type": "Dangerous Attacks", "home": 40, "away": 31}
+            pair = _side_pair(keys)
+        for alias in aliases:
+            if pair:
+                break
+            if alias in keys:                                  # {"dangerous_attacks": {"home": 40, "away": 31}} / [40, 31]
+                pair = _pair_value(keys[alias])
+            home = _num(keys.get("home" + alias, keys.get(alias + "home")))
+            away = _num(keys.get("away" + alias, keys.get(alias + "away")))
+            if not pair and home is not None and away is not None:   # {"home_dangerous_attacks": 40, ...}
+                pair = (home, away)
+            if not pair and side and alias in keys and _num(keys[alias]) is not None:
+                found.setdefault(("side", stat), {})[side] = _num(keys[alias])   # Um time por objeto
+        if pair:
+            found[stat] = pair
+
+    if "minute" not in found:
+        for k in MINUTE_KEYS:
+            value = _num(keys.get(k))
+            if value is not None and 0 <= value <= 130:
+                found["minute"] = int(value)
+                break
+
+    for value in node.values():
+        if isinstance(value, (dict, list)):
+            _walk_stats(value, found, side, depth + 1, skip)
+
+
+# ─── Jogo aberto × outros jogos no mesmo JSON ─────────────────────────────────
+# A página também recebe a lista ao vivo e resultados de busca. Só contam as
+# stats de dentro do objeto do jogo aberto (id da URL ou os dois times).
+def fixture_target(url: str, home: str, away: str) -> Dict:
+    """Referência do jogo aberto: id numérico da URL (se houver) e times normalizados."""
+    path = re.sub(r"^[a-z]+://[^/]+", "", url or "").split("?")[0]
+    ids = re.findall(r"\d{4,}", path)
+    return {"id": ids[-1] if ids else None, "home": normalize_team(home), "away": normalize_team(away)}
+
+
+def _team_name(value) -> Optional[str]:
+    """"Flamengo" / {"name": "Flamengo"} / {"data": {"name": ...}} → nome normalizado."""
+    if isinstance(value, dict):
+        keys = {_norm_key(k): v for k, v in value.items()}
+        data = keys.get("data")
+        value = keys.get("name") or keys.get("teamname") or (data.get("name") if isinstance(data, dict) else None)
+    if isinstance(value, str) and _num(value) is None:
+        return normalize_team(value) or None
+    return None
+
+
+def _team_names(keys: Dict) -> Optional[tuple]:
+    """Mandante e visitante de um objeto de jogo ("home": "X", "hometeam": {...}, "localteam": ...)."""
+    names = []
+    for side in ("home", "away"):
+        name = next((n for n in (_team_name(keys[k]) for k in TEAM_KEYS[side] if k in keys) if n), None)
+        if not name:
+            return None
+        names.append(name)
+    return tuple(names)
+
+
+def _same_team(a: str, b: str) -> bool:
+    return a == b or (min(len(a), len(b)) >= 4 and (a in b or b in a))
+
+
+def _fixture_of(keys: Dict, target: Dict) -> Optional[bool]:
+    """True = objeto do jogo aberto; False = de outro jogo; None = não identifica jogo."""
+    if target["id"] and any(str(keys[k]) == target["id"] for k in ("id",) + FIXTURE_ID_KEYS if k in keys):
+        return True
+    names = _team_names(keys)
+    if names:
+        return _same_team(names[0], target["home"]) and _same_team(names[1], target["away"])
+    if target["id"] and any(k in keys for k in FIXTURE_ID_KEYS):
+        return False
+    return None
+
+
+def _identify(node: Dict, target: Dict) -> Optional[bool]:
+    """Como _fixture_of, olhando também os objetos filhos diretos ({"fixture": {...}, "stats": [...]})."""
+    own = _fixture_of({_norm_key(k): v for k, v in node.items()}, target)
+    if own is not None:
+        return own
+    children = {_fixture_of({_norm_key(k): v for k, v in child.items()}, target)
+                for child in node.values() if isinstance(child, dict)} - {None}
+    return children.pop() if len(children) == 1 else None
+
+
+def _find_fixture(node, target: Dict, depth: int = 0) -> Optional[Dict]:
+    """Primeiro objeto (o mais externo) do jogo aberto no payload; objetos de outros jogos são pulados."""
+    if depth > 12:
+        return None
+    if isinstance(node, list):
+        children = node
+    elif isinstance(node, dict):
+        ident = _identify(node, target)
+        if ident is not None:
+            return node if ident else None
+        children = node.values()
+    else:
+        return None
+    for value in children:
+        if isinstance(value, (dict, list)):
+            scope = _find_fixture(value, target, depth + 1)
+            if scope is not None:
+                return scope
+    return None
+
+
+def parse_stats_payloads(payloads: List, target: Dict) -> Optional[Dict]:
+    """
+    Respostas JSON capturadas → mesmo formato de get_live_stats, só com as stats
+    do jogo `target` (fixture_target). Cada payload contribui com um único objeto
+    do jogo; payloads sem ele são ignorados.
+    None se não houver ataques perigosos e APPM (aí vale o caminho pelo DOM).
+    """
+    found: Dict = {}
+    for payload in reversed(payloads):   # Mais recentes primeiro
+        scope = _find_fixture(payload, target)
+        if scope is None:
+            continue
+        _walk_stats(scope, found, skip=lambda keys: _fixture_of(keys, target) is False)
+        if "minute" in found and all(stat in found for stat in STAT_ALIASES):
+            break
+    for stat in STAT_ALIASES:
+        sides = found.get(("side", stat), {})
+        if stat not in found and "home" in sides and "away" in sides:
+            found[stat] = (sides["home"], sides["away"])
+    if "ataques_perigosos" not in found or "appm_5m" not in found:
+        return None
+
+    stats = {
+        "ataques": {"home": 0, "away": 0},
+        "ataques_perigosos": {"home": 0, "away": 0},
+        "posse": {"home": 50, "away": 50},
+        "appm_5m": {"home": 0.0, "away": 0.0},
+        "appm_10m": {"home": 0.0, "away": 0.0},
+        "score_raw": "0-0",
+        "minute": found.get("minute", 0),
+    }
+    for stat in ("ataques", "ataques_perigosos", "posse"):
+        if stat in found:
+            stats[stat] = {"home": int(found[stat][0]), "away": int(found[stat][1])}
+    for stat in ("appm_5m", "appm_10m"):
+        if stat in found:
+            stats[stat] = {"home": float(found[stat][0]), "away": float(found[stat][1])}
+    if "gols" in found:
+        stats["score_raw"] = f"{int(found['gols'][0])}-{int(found['gols'][1])}"
+    return stats
+
+
+def _names_in_text(text: str, home: str, away: str) -> bool:
+    """O texto do resultado da busca traz mandante e visitante (normalizados)?"""
+    text, home, away = normalize_team(text), normalize_team(home), normalize_team(away)
+    return bool(text and home and away) and home in text and away in text
+
+
+class _JsonCapture:
+    """Respostas JSON (XHR/fetch) recebidas pela página desde a criação."""
+
+    def __init__(self, page: Page):
+        self.page     = page
+        self.target: Optional[Dict] = None   # fixture_target do jogo aberto
+        self.payloads: List = []
+        self.arrived  = asyncio.Event()
+        self._reads   = set()
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        try:
+            if response.request.resource_type not in ("xhr", "fetch"):
+                return
+            if "json" not in (response.headers.get("content-type") or ""):
+                return
+        except Exception:
+            return
+        task = asyncio.create_task(self._read(response))
+        self._reads.add(task)
+        task.add_done_callback(self._reads.discard)
+
+    async def _read(self, response):
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        self.payloads.append(payload)
+        del self.payloads[:-JSON_CAPTURE_MAX]
+        self.arrived.set()
+
+    def detach(self):
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+        for task in list(self._reads):
+            task.cancel()
+
+
 class SokkerProScraper:
     BASE_URL = "https://sokkerpro.com/"
 
+    def __init__(self, fixtures: Optional[FixtureCache] = None):
+        # Times normalizados → URL do jogo (None = sempre busca)
+        self.fixtures = fixtures
+        self._captures: Dict[int, _JsonCapture] = {}   # id(page) → captura armada ao abrir o jogo
+
+    def _arm_capture(self, page: Page):
+        """Escuta as respostas JSON a partir daqui: o painel carrega as stats ao abrir o jogo."""
+        self._release_capture(page)
+        self._captures[id(page)] = _JsonCapture(page)
+
+    def _release_capture(self, page: Page) -> Optional[_JsonCapture]:
+        capture = self._captures.pop(id(page), None)
+        if capture:
+            capture.detach()
+        return capture
+
+    async def _open_fixture(self, page: Page, url: str) -> bool:
+        """Navega direto para o jogo em cache; False se o painel de detalhes não abrir."""
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            await page.wait_for_selector(".desktop-details-panel", timeout=8000)
+            return True
+        except Exception as e:
+            print(f"    [!] Jogo em cache não abriu ({url}): {e}")
+            return False
+
     async def search_match(self, page: Page, home: str, away: str) -> Dict:
-        """Busca uma partida no SokkerPro e abre os detalhes."""
+        """Busca uma partida no SokkerPro e abre os detalhes (direto pela URL se já resolvida)."""
+        self._release_capture(page)
+        result = await self._open_match(page, home, away)
+        capture = self._captures.get(id(page))
+        if not result["found"]:
+            self._release_capture(page)
+        elif capture:
+            capture.target = fixture_target(result["url"], home, away)
+        return result
+
+    async def _open_match(self, page: Page, home: str, away: str) -> Dict:
+        if self.fixtures:
+            url = self.fixtures.get(home, away)
+            if url:
+                print(f"[*] [SOKKERPRO] Jogo em cache: {url}")
+                self._arm_capture(page)
+                if await self._open_fixture(page, url):
+                    return {"found": True, "cached": True, "url": url}
+                self.fixtures.forget(home, away)
+
         try:
             print(f"[*] [SOKKERPRO] Buscando partida (Time: {home})...")
             if page.url == "about:blank" or not page.url.startswith(self.BASE_URL):
@@ -26,13 +360,15 @@ class SokkerProScraper:
             # Procuramos por um item que contenha " vs " ou " - " no texto
             results = await page.query_selector_all(".fixture-item, .match-item, .match-card, .search-result-item, .search-item")
             match_item = None
+            match_text = ""
             
             print(f"    [*] Analisando {len(results)} resultados de busca...")
             for item in results:
-                text = await item.inner_text()
+                text = (await item.inner_text()).replace("\n", " ")
                 if " vs " in text or " - " in text:
-                    print(f"    [+] Partida identificada pelo texto: '{text.replace('\n', ' ')}'")
+                    print(f"    [+] Partida identificada pelo texto: '{text}'")
                     match_item = item
+                    match_text = text
                     break
             
             # Fallback caso a detecção por texto falhe (pode ser um jogo muito recente/específico)
@@ -45,10 +381,18 @@ class SokkerProScraper:
                     match_item = results[0]
 
             if match_item:
+                # Só agora: as respostas da busca e da lista ao vivo ficam de fora
+                self._arm_capture(page)
                 await match_item.click()
                 await page.wait_for_timeout(3000)
                 print(f"    [+] Partida selecionada.")
-                return {"found": True}
+                # Só guarda se o clique levou a uma URL própria do jogo e o resultado
+                # veio do texto com os dois times (os fallbacks às cegas não entram no cache)
+                url = page.url
+                if (self.fixtures and url.startswith(self.BASE_URL) and url.rstrip("/") != self.BASE_URL.rstrip("/")
+                        and _names_in_text(match_text, home, away)):
+                    self.fixtures.put(home, away, url)
+                return {"found": True, "cached": False, "url": url}
             
             print(f"    [-] Partida não encontrada na lista.")
             return {"found": False}
@@ -57,7 +401,40 @@ class SokkerProScraper:
             return {"found": False}
 
     async def get_live_stats(self, page: Page) -> Optional[Dict]:
-        """Extrai as estatísticas live (APPM, Ataques, etc.)."""
+        """Extrai as estatísticas live (APPM, Ataques, etc.): JSON capturado, com o DOM como fallback."""
+        t0 = time.perf_counter()
+        capture = self._captures.get(id(page))
+        stats, source = None, "json"
+        if capture:
+            try:
+                stats = await self._stats_from_json(capture)
+            finally:
+                self._release_capture(page)
+        if stats is None:
+            stats, source = await self._stats_from_dom(page), "dom"
+
+        elapsed = time.perf_counter() - t0
+        if stats is not None:
+            metrics.SOKKERPRO_STATS_SECONDS.observe(elapsed, source=source)
+            print(f"    [+] [SOKKERPRO] Stats via {source.upper()} em {elapsed:.2f}s")
+        return stats
+
+    async def _stats_from_json(self, capture: _JsonCapture) -> Optional[Dict]:
+        """Espera até SOKKERPRO_JSON_WAIT_SEC por respostas que tragam as stats."""
+        deadline = time.monotonic() + SOKKERPRO_JSON_WAIT_SEC
+        while True:
+            capture.arrived.clear()
+            stats = parse_stats_payloads(capture.payloads, capture.target)
+            remaining = deadline - time.monotonic()
+            if stats is not None or remaining <= 0:
+                return stats
+            try:
+                await asyncio.wait_for(capture.arrived.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return parse_stats_payloads(capture.payloads, capture.target)
+
+    async def _stats_from_dom(self, page: Page) -> Optional[Dict]:
+        """Caminho antigo: rótulos do painel ESTATÍSTICAS via seletores de texto."""
         try:
             panel = await page.wait_for_selector(".desktop-details-panel", timeout=8000)
             if not panel: return None
@@ -0,0 +1,351 @@
+"""
+backtest.py — Backtest Histórico de Configurações (v1.0)
+
+Reexecuta os snapshots gravados em kairos.db (page_data do DroppingOdds,
+fluxo do Excapper e o veredito da IA, quando houve) pelo caminho de decisão
+do dropping_flow, sob configurações alternativas:
+  - drops ≥ DROP_MIN_PCT recalculados das tabelas gravadas
+  - gatilho AI_TRIGGER_DROP e link Excapper
+  - snapshot da IA com o Smart Money (LEAGUE_PROFILES, LATE_SPIKE_MULTIPLIER, ...)
+  - deduplicação pelo hash do alerta e pré-score (PRESCORE_MIN_SCORE)
+Cada configuração roda num processo do pool; o histórico é lido uma vez
+(somente leitura) e entregue a cada worker na inicialização.
+
+Por configuração: alertas disparados, chamadas de IA (jogos e requisições
+em lote de AI_BATCH_SIZE), sinais Smart Money e a taxa de acerto contra os
+vereditos gravados (positivo = SHARP_ACTION / INSTITUTIONAL_FLOW / SUSPICIOUS),
+com o recall sobre todos os positivos do histórico.
+
+Limite: o banco só tem jogos que passaram pelo gatilho da época. Limites
+mais frouxos que os de produção não "descobrem" jogos novos; os números
+valem para comparar configurações iguais ou mais restritivas.
+
+Parâmetros (--param NOME=v1,v2 ou --grid arquivo.json; produto cartesiano):
+  DROP_MIN_PCT, AI_TRIGGER_DROP, AI_BATCH_SIZE, PRESCORE_MIN_SCORE
+  REQUIRE_EXCAPPER  1 = sem link Excapper não segue (produção); 0 = ignora
+  SM_SAFETY_GATE    1 = descarta o que o filtro de segurança do Smart Money descarta
+  smart_money.<CONSTANTE>   ex.: smart_money.LATE_SPIKE_MULTIPLIER=2,2.5,3
+  smart_money.LEAGUE_PROFILES  {"palavra": {campos}} mesclado aos perfis atuais
+
+Grid (JSON):
+  {"grid":    {"AI_TRIGGER_DROP": [5.5, 7, 9], "smart_money.LATE_SPIKE_MULTIPLIER": [2, 3]},
+   "configs": [{"name": "vietna_rigido",
+                "smart_money.LEAGUE_PROFILES": {"vietnam": {"disp_threshold": 300}}}]}
+
+Uso:
+  python -m src.sim.backtest --param AI_TRIGGER_DROP=5.5,7,9 --param smart_money.LATE_SPIKE_MULTIPLIER=2,3
+  python -m src.sim.backtest --grid data/backtest/grid.json --procs 4
+"""
+
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import math
+import os
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from ..core import smart_money
+from ..core.prescorer import PreScorer, extract_features, _label_from_verdict
+from ..core.storage import KairosDB
+from ..flows.dropping_flow import _build_ai_snapshot
+from ..scrapers.dropping_odds import _drop_entry
+from ..config import (
+    DATA_DIR, DB_FILE, DROP_MIN_PCT, AI_TRIGGER_DROP, AI_BATCH_SIZE, PRESCORE_MIN_SCORE,
+)
+
+
+BACKTEST_DIR = os.path.join(DATA_DIR, "backtest")
+SM_PREFIX = "smart_money."
+
+# Configuração de produção (base de comparação)
+DEFAULTS: Dict[str, object] = {
+    "DROP_MIN_PCT":       DROP_MIN_PCT,
+    "AI_TRIGGER_DROP":    AI_TRIGGER_DROP,
+    "AI_BATCH_SIZE":      AI_BATCH_SIZE,
+    "PRESCORE_MIN_SCORE": PRESCORE_MIN_SCORE,
+    "REQUIRE_EXCAPPER":   1,
+    "SM_SAFETY_GATE":     0,
+}
+
+
+# ── Histórico ──────────────────────────────────────────────────────────────────
+def load_snapshots(path: str, limit: int = 0) -> List[Dict]:
+    """Snapshots do kairos.db em ordem cronológica: {match_id, market_data, label}."""
+    if not os.path.exists(path):
+        return []
+    out = []
+    try:
+        # Somente leitura: o backtest não cria tabelas nem toca no banco de produção
+        db = KairosDB(path, readonly=True)
+    except sqlite3.Error as e:
+        print(f"[!] Falha ao abrir {path}: {e}")
+        return []
+    try:
+        for snap in db.iter_snapshots():
+            md = snap["market_data"]
+            if not (isinstance(md, dict) and md.get("match") and md.get("page_data")):
+                continue
+            out.append({"match_id": snap["match_id"], "market_data": md,
+                        "label": _label_from_verdict(snap["ai_analysis"])})
+            if limit and len(out) >= limit:
+                break
+    except sqlite3.Error as e:
+        print(f"[!] Falha ao ler {path}: {e}")
+    finally:
+        db.close()
+    return out
+
+
+# ── Configurações ──────────────────────────────────────────────────────────────
+def _parse_value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _short(name: str) -> str:
+    return name[len(SM_PREFIX):] if name.startswith(SM_PREFIX) else name
+
+
+def _check_name(name: str):
+    sm_name = name[len(SM_PREFIX):] if name.startswith(SM_PREFIX) else None
+    if name in DEFAULTS or (sm_name and sm_name.isupper() and hasattr(smart_money, sm_name)):
+        return
+    raise ValueError(f"parâmetro desconhecido: {name}")
+
+
+def build_configs(params: List[str], grid_file: Optional[str]) -> List[Dict]:
+    """Base de produção + produto cartesiano de --param/grid + configs nomeadas do grid."""
+    axes: Dict[str, list] = {}
+    named: List[Dict] = []
+    if grid_file:
+        with open(grid_file, encoding="utf-8") as f:
+            data = json.load(f)
+        axes.update(data.get("grid") or {})
+        named.extend(data.get("configs") or [])
+    for item in params:
+        name, _, values = item.partition("=")
+        if not name or not values:
+            raise ValueError(f"--param inválido: {item!r} (esperado NOME=v1,v2)")
+        axes[name.strip()] = [_parse_value(v.strip()) for v in values.split(",")]
+    for name in itertools.chain(axes, *(cfg for cfg in named)):
+        if name != "name":
+            _check_name(name)
+
+    configs = [{"name": "base", "overrides": {}}]
+    names = list(axes)
+    for combo in itertools.product(*(axes[n] for n in names)):
+        overrides = dict(zip(names, combo))
+        label = " ".join(f"{_short(n)}={json.dumps(v, ensure_ascii=False)}" for n, v in overrides.items())
+        configs.append({"name": label, "overrides": overrides})
+    for i, cfg in enumerate(named):
+        overrides = {k: v for k, v in cfg.items() if k != "name"}
+        configs.append({"name": cfg.get("name") or f"config_{i + 1}", "overrides": overrides})
+    return configs
+
+
+# ── Worker ─────────────────────────────────────────────────────────────────────
+_SNAPSHOTS: List[Dict] = []
+_PRISTINE: Dict[str, object] = {}
+
+
+def _init_worker(snapshots: List[Dict]):
+    global _SNAPSHOTS
+    _SNAPSHOTS = snapshots
+    for name in dir(smart_money):
+        if name.isupper():
+            _PRISTINE[name] = copy.deepcopy(getattr(smart_money, name))
+
+
+def _apply_smart_money(overrides: Dict):
+    """Restaura as constantes do smart_money e aplica as da configuração (lidas na hora da chamada)."""
+    for name, value in _PRISTINE.items():
+        setattr(smart_money, name, copy.deepcopy(value))
+    for key, value in overrides.items():
+        if not key.startswith(SM_PREFIX):
+            continue
+        name = key[len(SM_PREFIX):]
+        if name not in _PRISTINE:
+            raise ValueError(f"constante desconhecida em smart_money: {name}")
+        if name == "LEAGUE_PROFILES":
+            profiles = copy.deepcopy(_PRISTINE[name])
+            for keyword, fields in value.items():
+                profiles[keyword] = {**profiles.get(keyword, profiles["_default_"]), **fields}
+            value = profiles
+        elif isinstance(_PRISTINE[name], tuple):
+            value = tuple(value)
+        setattr(smart_money, name, value)
+
+
+def replay(snapshots: List[Dict], overrides: Dict, scorer: PreScorer) -> Dict:
+    """Passa o histórico pelo caminho de decisão do dropping_flow com a configuração dada."""
+    unknown = [k for k in overrides if not k.startswith(SM_PREFIX) and k not in DEFAULTS]
+    if unknown:
+        raise ValueError(f"parâmetro desconhecido: {', '.join(unknown)}")
+    cfg = {**DEFAULTS, **{k: v for k, v in overrides.items() if k in DEFAULTS}}
+    _apply_smart_money(overrides)
+    scorer.min_score = float(cfg["PRESCORE_MIN_SCORE"])
+
+    counts = Counter()
+    sm_signals = Counter()
+    sent = set()
+    for snap in snapshots:
+        md = snap["market_data"]
+        match, page_data = md["match"], md["page_data"]
+        markets = md.get("excapper_markets") or {}
+        teams = match.get("teams", "")
+
+        drops = sorted(
+            (_drop_entry(table, row)
+             for table, rows in (page_data.get("tables") or {}).items()
+             for row in rows if row.get("drop_pct", 0) >= cfg["DROP_MIN_PCT"]),
+            key=lambda d: d["drop_pct"], reverse=True,
+        )
+        max_drop = drops[0]["drop_pct"] if drops else 0.0
+        if not drops or max_drop < cfg["AI_TRIGGER_DROP"]:
+            counts["below_trigger"] += 1
+            continue
+        if cfg["REQUIRE_EXCAPPER"] and not page_data.get("excapper_url"):
+            counts["no_excapper"] += 1
+            continue
+        page = dict(page_data, drops_summary=drops, has_drops=True, max_drop_pct=max_drop)
+
+        snapshot = _build_ai_snapshot(match, page, markets, teams)
+        sm = snapshot["smart_money_result"]
+        sm_signals.update(s["label"] for s in sm["signals"])
+        if sm["safety_filtered"]:
+            counts["sm_filtered"] += 1
+            if cfg["SM_SAFETY_GATE"]:
+                continue
+
+        alert_hash = hashlib.md5(
+            f"{teams}_{snapshot['live_score']}_{drops[0]['table']}_{drops[0]['drop_pct']:.0f}".encode()
+        ).hexdigest()
+        if alert_hash in sent:
+            counts["duplicates"] += 1
+            continue
+        go_ai, _ = scorer.should_analyze(extract_features(match, page, markets))
+        if not go_ai:
+            counts["prescore_cut"] += 1
+            continue
+
+        # No dropping_flow toda análise concluída vira alerta (os assinantes filtram depois)
+        sent.add(alert_hash)
+        counts["alerts"] += 1
+        if sm["signals"]:
+            counts["alerts_sm"] += 1
+        if snap["label"] is None:
+            counts["unlabeled"] += 1
+            continue
+        counts["labeled"] += 1
+        counts["hits"] += snap["label"]
+        if sm["signals"]:
+            counts["labeled_sm"] += 1
+            counts["hits_sm"] += snap["label"]
+
+    positives = sum(1 for s in snapshots if s["label"] == 1)
+    ai_calls = counts["alerts"]
+    return {
+        "snapshots":     len(snapshots),
+        "below_trigger": counts["below_trigger"],
+        "no_excapper":   counts["no_excapper"],
+        "sm_filtered":   counts["sm_filtered"],
+        "duplicates":    counts["duplicates"],
+        "prescore_cut":  counts["prescore_cut"],
+        "ai_calls":      ai_calls,
+        "ai_requests":   math.ceil(ai_calls / max(1, int(cfg["AI_BATCH_SIZE"]))),
+        "alerts":        counts["alerts"],
+        "labeled":       counts["labeled"],
+        "unlabeled":     counts["unlabeled"],
+        "hits":          counts["hits"],
+        "hit_rate":      round(counts["hits"] / counts["labeled"], 3) if counts["labeled"] else None,
+        "recall":        round(counts["hits"] / positives, 3) if positives else None,
+        "alerts_sm":     counts["alerts_sm"],
+        "hit_rate_sm":   round(counts["hits_sm"] / counts["labeled_sm"], 3) if counts["labeled_sm"] else None,
+        "sm_signals":    dict(sm_signals),
+    }
+
+
+def _run_config(config: Dict) -> Dict:
+    t0 = time.perf_counter()
+    result = replay(_SNAPSHOTS, config["overrides"], PreScorer())
+    return {**config, **result, "elapsed_sec": round(time.perf_counter() - t0, 3)}
+
+
+# ── Relatório ──────────────────────────────────────────────────────────────────
+def _fmt_rate(value: Optional[float]) -> str:
+    return f"{value * 100:.1f}%" if value is not None else "-"
+
+
+def _print_table(results: List[Dict]):
+    base = results[0]
+    width = max(12, min(64, max(len(r["name"]) for r in results)))
+    print(f"\n{'config':<{width}} {'IA':>6} {'req':>5} {'alertas':>8} {'acertos':>8} "
+          f"{'taxa':>7} {'recall':>7} {'c/ SM':>6} {'taxa SM':>8} {'Δ IA':>7}")
+    for r in results:
+        delta = r["ai_calls"] - base["ai_calls"]
+        print(f"{r['name'][:width]:<{width}} {r['ai_calls']:>6} {r['ai_requests']:>5} {r['alerts']:>8} "
+              f"{r['hits']:>8} {_fmt_rate(r['hit_rate']):>7} {_fmt_rate(r['recall']):>7} "
+              f"{r['alerts_sm']:>6} {_fmt_rate(r['hit_rate_sm']):>8} {delta:>+7}")
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Kairos — backtest de configurações sobre os snapshots gravados")
+    parser.add_argument("--param", action="append", default=[],
+                        help="NOME=v1,v2 (repetível; produto cartesiano)")
+    parser.add_argument("--grid", help="Arquivo JSON com {'grid': {...}, 'configs': [...]}")
+    parser.add_argument("--db", default=DB_FILE, help="kairos.db de origem (aberto somente leitura)")
+    parser.add_argument("--limit", type=int, default=0, help="Máximo de snapshots (0 = todos)")
+    parser.add_argument("--procs", type=int, default=os.cpu_count() or 1, help="Processos do pool")
+    parser.add_argument("--out", help="Arquivo JSON do relatório (default: data/backtest/backtest_<data>.json)")
+    args = parser.parse_args()
+
+    try:
+        configs = build_configs(args.param, args.grid)
+    except (OSError, ValueError) as e:
+        print(f"[!] Configurações inválidas: {e}")
+        raise SystemExit(1)
+
+    snapshots = load_snapshots(args.db, args.limit)
+    if not snapshots:
+        print(f"[!] Nenhum snapshot em {args.db}.")
+        raise SystemExit(1)
+    labeled = [s["label"] for s in snapshots if s["label"] is not None]
+    print(f"[*] [BACKTEST] {len(snapshots)} snapshots ({len(labeled)} com veredito, {sum(labeled)} positivos) "
+          f"× {len(configs)} configurações em {min(args.procs, len(configs))} processo(s)")
+
+    t0 = time.perf_counter()
+    results: List[Optional[Dict]] = [None] * len(configs)
+    with ProcessPoolExecutor(max_workers=max(1, min(args.procs, len(configs))),
+                             initializer=_init_worker, initargs=(snapshots,)) as pool:
+        futures = {pool.submit(_run_config, cfg): i for i, cfg in enumerate(configs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except ValueError as e:
+                print(f"[!] {configs[i]['name']}: {e}")
+                continue
+            print(f"  [OK] {done}/{len(configs)} {configs[i]['name']} ({results[i]['elapsed_sec']:.2f}s)")
+    results = [r for r in results if r is not None]
+    if not results or results[0]["name"] != "base":
+        raise SystemExit(1)
+
+    _print_table(results)
+    out = args.out or os.path.join(BACKTEST_DIR, f"backtest_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "defaults": DEFAULTS, "configs": results,
+                   "elapsed_sec": round(time.perf_counter() - t0, 2)}, f, indent=2, ensure_ascii=False)
+    print(f"\n[OK] [BACKTEST] Relatório em {out}")
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,381 @@
+"""
+bench.py — Micro-benchmarks de Parsers, Detectores e Prompt (v1.0)
+
+Mede, offline, as partes CPU do ciclo em tamanhos realistas:
+  - _parse_pct / _parse_odd
+  - mapeamento de colunas + cálculo de drops (_map_columns / _compute_table_drops)
+  - format_drops_for_ai e _build_ai_snapshot
+  - cada detector do smart_money (+ run_smart_money_analysis)
+  - _prepare_prompt (modos full e compact)
+  - parse_stats_payloads (stats do SokkerPro a partir do JSON capturado)
+  - regras de manipulação do fluxo legado (core/rules.py), em lote
+  - matriz de probabilidades implícitas do ciclo (core/implied.py)
+  - compressão dos snapshots, com e sem dicionário (core/snapshot_codec.py)
+Entradas sintéticas de 10 a 10.000 linhas e 1 a 50 mercados; com um
+kairos.db presente, também roda sobre snapshots gravados ("recorded").
+
+Resultados vão para um JSON (por caso: melhor/mediana em µs por chamada);
+`--compare` aponta regressões contra um JSON anterior.
+
+Uso:
+  python -m src.sim.bench
+  python -m src.sim.bench --quick --compare data/bench/bench_<rev>_<data>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List
+
+from ..core import smart_money as sm
+from ..core.analyzer import ClaudeProvider
+from ..core.rules import RuleEngine, anomaly_features
+from ..core.implied import ImpliedBook
+from ..core import snapshot_codec
+from ..core.storage import KairosDB
+from ..flows.dropping_flow import _build_ai_snapshot
+from ..flows.legacy_flow import RULE_PARAMS
+from ..scrapers.dropping_odds import (
+    DroppingOddsScraper, TABLE_TABS, _compute_table_drops, _drop_entry, _map_columns, _parse_odd, _parse_pct,
+    _table_odds,
+)
+from ..scrapers.sokkerpro import parse_stats_payloads, fixture_target
+from ..config import BASE_DIR, DATA_DIR, DB_FILE, DROP_MIN_PCT
+
+
+BENCH_DIR  = os.path.join(DATA_DIR, "bench")
+ROW_SIZES  = (10, 100, 1000, 10000)
+MARKET_SIZES = (1, 10, 50)
+
+TABLE_HEADERS = {
+    "1X2":      ["Date", "Time", "Score", "Home", "Draw", "Away", "Home (%)", "Away (%)", "Penalty", "Red"],
+    "HT 1X2":   ["Date", "Time", "Score", "Home", "Draw", "Away", "Home (%)", "Away (%)", "Penalty", "Red"],
+    "Total":    ["Date", "Time", "Score", "Total", "Over", "Under", "Drop"],
+    "HT Total": ["Date", "Time", "Score", "Total", "Over", "Under", "Drop"],
+    "Handicap": ["Date", "Time", "Score", "Handicap", "Home", "Away", "Sharpness"],
+}
+SELECTIONS = ["Home", "Away", "Draw", "Over 2.5", "Under 2.5", "Over 1.5", "Yes", "No"]
+LEAGUES = ["Premier League", "Serie A", "Ligue 1", "Brazil Serie B", "Vietnam V-League", "Friendlies"]
+
+
+# ── Entradas sintéticas ────────────────────────────────────────────────────────
+def synthetic_rows(table_name: str, n_rows: int, rng: random.Random) -> List[Dict]:
+    """Linhas no formato lido por _extract_table_rows (mais recente primeiro)."""
+    headers = TABLE_HEADERS[table_name]
+    rows = []
+    odd = rng.uniform(1.6, 4.5)
+    for i in range(n_rows):
+        minute = max(1, 90 - i * 90 // max(n_rows, 1))
+        texts = []
+        for h in headers:
+            hl = h.lower()
+            if hl == "date":
+                texts.append("19.10")
+            elif hl == "time":
+                texts.append(f"{minute}'")
+            elif hl == "score":
+                texts.append(f"{rng.randint(0, 2)}-{rng.randint(0, 2)}")
+            elif "%" in hl or hl in ("drop", "sharpness"):
+                texts.append(f"-{rng.uniform(0, 25):.1f}%")
+            elif hl in ("penalty", "red"):
+                texts.append("")
+            else:
+                texts.append(f"{odd * rng.uniform(0.9, 1.1):.2f}")
+        roll = rng.random()
+        rows.append({
+            "texts":        texts,
+            "class":        "Red3" if roll < 0.02 else "Red2" if roll < 0.07 else "",
+            "td_classes":   ["Red2"] if roll < 0.05 else [],
+            "has_penalty":  roll > 0.995,
+            "has_red_card": roll > 0.99,
+        })
+        odd *= rng.uniform(1.0, 1.01)   # Abertura (fim da lista) mais alta que a atual
+    return rows
+
+
+def synthetic_flow(n_rows: int, rng: random.Random, minute_hint: int = 80) -> List[Dict]:
+    """Fluxo Excapper (mais recente primeiro) no formato de get_match_flow."""
+    flow = []
+    for i in range(n_rows):
+        minute = max(1, minute_hint - i * minute_hint // max(n_rows, 1))
+        flow.append({
+            "selection":  rng.choice(SELECTIONS[:3]),
+            "change_eur": round(rng.lognormvariate(6.5, 1.2), 2),
+            "time":       f"{minute}'",
+            "score":      f"{rng.randint(0, 2)}-{rng.randint(0, 2)}",
+            "odds":       f"{rng.uniform(1.3, 5.0):.2f}",
+            "change_pct": f"-{rng.uniform(0, 15):.1f}%",
+        })
+    return flow
+
+
+def synthetic_markets(n_markets: int, rows_per_market: int, rng: random.Random) -> Dict[str, Dict]:
+    names = ["Match Odds"] + [f"Over/Under {g}.5 Goals" for g in range(7)] + [f"Market {i}" for i in range(60)]
+    return {
+        names[i]: {"market_id": str(1000 + i), "betfair_url": "", "flow": synthetic_flow(rows_per_market, rng)}
+        for i in range(n_markets)
+    }
+
+
+def synthetic_page_data(rows_per_table: int, rng: random.Random) -> Dict:
+    """page_data como em get_match_full_data, calculado pelas funções reais."""
+    tables, odds, drops = {}, {}, []
+    for table_name in TABLE_TABS:
+        raw, cols = synthetic_rows(table_name, rows_per_table, rng), _map_columns(TABLE_HEADERS[table_name], table_name)
+        rows = _compute_table_drops(raw, cols)
+        tables[table_name] = rows
+        odds[table_name] = _table_odds(raw, cols)
+        drops.extend(_drop_entry(table_name, r) for r in rows if r["drop_pct"] >= DROP_MIN_PCT)
+    drops.sort(key=lambda d: d["drop_pct"], reverse=True)
+    return {
+        "excapper_url": "https://excapper.com/?action=game&id=1", "tables": tables, "odds": odds, "drops_summary": drops,
+        "has_drops": bool(drops), "max_drop_pct": drops[0]["drop_pct"] if drops else 0.0,
+    }
+
+
+def synthetic_sokkerpro_payloads(n: int, rng: random.Random) -> List[Dict]:
+    """Respostas JSON do painel do SokkerPro: n-1 irrelevantes + a de estatísticas."""
+    noise = [{"fixtures": [{"id": i, "league": rng.choice(LEAGUES), "odds": [rng.uniform(1.2, 5) for _ in range(3)]}
+                           for i in range(20)]} for _ in range(n - 1)]
+    stats = {"fixture": {"id": 4242, "home_team": "Bench Home", "away_team": "Bench Away",
+                         "minute": f"{rng.randint(1, 90)}'", "score": "1-0", "stats": [
+        {"type": "Dangerous Attacks", "home": rng.randint(0, 80), "away": rng.randint(0, 80)},
+        {"type": "Attacks", "home": rng.randint(0, 150), "away": rng.randint(0, 150)},
+        {"type": "Ball Possession", "home": "55%", "away": "45%"},
+    ], "appm": {"appm_5": {"home": 1.1, "away": 0.4}, "appm_10": {"home": 0.9, "away": 0.5}}}}
+    return noise + [stats]
+
+
+def synthetic_match(rng: random.Random, minute: int = 80) -> Dict:
+    return {
+        "game_id": "1", "teams": "Bench Home vs Bench Away", "league": rng.choice(LEAGUES),
+        "score": "1-1", "time_text": f"{minute}'", "is_live": True, "match_url": "",
+    }
+
+
+def recorded_inputs(path: str, limit: int) -> List[Dict]:
+    """Snapshots reais do kairos.db (market_data com match, page_data e excapper_markets)."""
+    if not os.path.exists(path):
+        return []
+    # Somente leitura: o benchmark não cria tabelas nem toca no banco de produção
+    out = []
+    try:
+        db = KairosDB(path, readonly=True)
+    except sqlite3.Error:
+        return []
+    try:
+        for snap in db.iter_snapshots():
+            md = snap["market_data"]
+            if isinstance(md, dict) and md.get("match") and md.get("page_data"):
+                out.append(md)
+                if len(out) >= limit:
+                    break
+    except sqlite3.Error:
+        pass
+    finally:
+        db.close()
+    return out
+
+
+# ── Medição ────────────────────────────────────────────────────────────────────
+def measure(fn: Callable, min_time: float, repeat: int) -> Dict:
+    """Calibra o nº de chamadas por rodada (~min_time) e devolve µs por chamada."""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    runs = [elapsed / loops]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        runs.append((time.perf_counter() - t0) / loops)
+    return {
+        "loops":     loops,
+        "best_us":   round(min(runs) * 1e6, 3),
+        "median_us": round(statistics.median(runs) * 1e6, 3),
+    }
+
+
+def build_cases(rng: random.Random, row_sizes, market_sizes, recorded: List[Dict]) -> List[tuple]:
+    """(nome, parâmetros, função sem argumentos)."""
+    cases = []
+    scraper = DroppingOddsScraper()
+    provider_full = ClaudeProvider()
+    provider_compact = ClaudeProvider()
+    provider_full.prompt_mode, provider_compact.prompt_mode = "full", "compact"
+    profile = sm.get_league_profile("Premier League")
+
+    pcts = [f"-{rng.uniform(0, 40):.1f}%" for _ in range(1000)] + ["", "-", "n/a"]
+    odds = [f"{rng.uniform(1.01, 20):.2f}" for _ in range(1000)] + ["", "—", "1,85"]
+    cases.append(("parse_pct", {"n": len(pcts)}, lambda: [_parse_pct(t) for t in pcts]))
+    cases.append(("parse_odd", {"n": len(odds)}, lambda: [_parse_odd(t) for t in odds]))
+
+    for table_name in ("1X2", "Total"):
+        headers = TABLE_HEADERS[table_name]
+        cases.append(("map_columns", {"table": table_name}, lambda h=headers, t=table_name: _map_columns(h, t)))
+        cols = _map_columns(headers, table_name)
+        for n in row_sizes:
+            rows = synthetic_rows(table_name, n, rng)
+            cases.append(("compute_table_drops", {"table": table_name, "rows": n},
+                          lambda r=rows, c=cols: _compute_table_drops(r, c)))
+
+    for n in row_sizes:
+        flow = synthetic_flow(n, rng)
+        params = {"rows": n}
+        cases.append(("detect_market_disproportion", params, lambda f=flow: sm.detect_market_disproportion(f, profile)))
+        cases.append(("detect_late_game_spike", params, lambda f=flow: sm.detect_late_game_spike(f, 85, profile)))
+        cases.append(("detect_ht_drop", params, lambda f=flow: sm.detect_ht_drop(f, 46, True, profile)))
+        cases.append(("apply_safety_filters", params, lambda f=flow: sm.apply_safety_filters(f, 2.1, 5000.0, profile)))
+        cases.append(("detect_lay_cancellation", params, lambda f=flow: sm._detect_lay_cancellation(f, 5000.0)))
+        cases.append(("run_smart_money_analysis", params, lambda f=flow: sm.run_smart_money_analysis(
+            f, "Premier League", 85, False, 2.1, 5000.0, "Over/Under 2.5 Goals")))
+
+    for n_markets in market_sizes:
+        for rows in (10, 100):
+            match = synthetic_match(rng)
+            page_data = synthetic_page_data(rows, rng)
+            markets = synthetic_markets(n_markets, rows, rng)
+            params = {"markets": n_markets, "rows": rows}
+            cases.append(("format_drops_for_ai", params,
+                          lambda m=match, p=page_data: scraper.format_drops_for_ai(m, p)))
+            cases.append(("build_ai_snapshot", params,
+                          lambda m=match, p=page_data, x=markets: _build_ai_snapshot(m, p, x, m["teams"])))
+            snapshot = _build_ai_snapshot(match, page_data, markets, match["teams"])
+            snapshot["dropping_context_text"] = scraper.format_drops_for_ai(match, page_data)
+            cases.append(("prepare_prompt_full", params, lambda s=snapshot: provider_full._prepare_prompt(s)))
+            cases.append(("prepare_prompt_compact", params, lambda s=snapshot: provider_compact._prepare_prompt(s)))
+
+    target = fixture_target("https://sokkerpro.com/fixture/4242", "Bench Home", "Bench Away")
+    for n in (1, 10, 30):
+        payloads = synthetic_sokkerpro_payloads(n, rng)
+        cases.append(("sokkerpro_parse_stats", {"payloads": n}, lambda p=payloads: parse_stats_payloads(p, target)))
+
+    rules = RuleEngine(RULE_PARAMS)
+    for n in (1, 10, 50):
+        markets = synthetic_markets(n, 1, rng)
+        rows = [
+            anomaly_features({"market": name, "selection": m["flow"][0]["selection"], "details": m["flow"][0]},
+                             True, False, 85, 0.1)
+            for name, m in markets.items()
+        ]
+        cases.append(("manipulation_rules", {"anomalies": n}, lambda r=rows: rules.evaluate(r)))
+
+    for n in (50, 200, 1000):
+        book = ImpliedBook()
+        for gid in range(n):
+            book.store(str(gid), synthetic_page_data(5, rng))
+        live = [str(gid) for gid in range(n)]
+        cases.append(("implied_refresh", {"matches": n}, lambda b=book, l=live: b.refresh(l)))
+
+    docs = [{"match": synthetic_match(rng), "page_data": synthetic_page_data(10, rng),
+             "excapper_markets": synthetic_markets(4, 20, rng)} for _ in range(60)]
+    zdict = snapshot_codec.train_dict([snapshot_codec.dumps(d) for d in docs[:50]])
+    for label, zd in (("zlib", None), ("zlib_dict", zdict)):
+        blobs = [snapshot_codec.encode(d, zd) for d in docs[50:]]
+        cases.append(("snapshot_encode", {"codec": label, "snapshots": len(blobs)},
+                      lambda z=zd: [snapshot_codec.encode(d, z) for d in docs[50:]]))
+        cases.append(("snapshot_decode", {"codec": label, "snapshots": len(blobs)},
+                      lambda b=blobs, z=zd: [snapshot_codec.decode(x, z) for x in b]))
+
+    if recorded:
+        def _replay():
+            for md in recorded:
+                match, page_data, markets = md["match"], md["page_data"], md.get("excapper_markets") or {}
+                snap = _build_ai_snapshot(match, page_data, markets, match.get("teams", ""))
+                snap["dropping_context_text"] = scraper.format_drops_for_ai(match, page_data)
+                provider_compact._prepare_prompt(snap)
+        cases.append(("recorded_snapshot_to_prompt", {"snapshots": len(recorded)}, _replay))
+
+    return cases
+
+
+# ── Resultado ──────────────────────────────────────────────────────────────────
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _case_id(name: str, params: Dict) -> str:
+    return name + "".join(f"[{k}={v}]" for k, v in sorted(params.items()))
+
+
+def compare(results: List[Dict], baseline_path: str, threshold: float) -> int:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {_case_id(r["name"], r["params"]): r for r in json.load(f).get("results", [])}
+    regressions = 0
+    print(f"\n[*] Comparação com {baseline_path} (limite {threshold:.2f}x):")
+    for r in results:
+        old = baseline.get(_case_id(r["name"], r["params"]))
+        if not old or not old["best_us"]:
+            continue
+        ratio = r["best_us"] / old["best_us"]
+        if ratio >= threshold:
+            regressions += 1
+            print(f"   [!] {_case_id(r['name'], r['params'])}: {old['best_us']:.1f} → {r['best_us']:.1f}µs ({ratio:.2f}x)")
+    if not regressions:
+        print("   [OK] Nenhuma regressão.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks offline do Kairos")
+    parser.add_argument("--quick", action="store_true", help="Tamanhos menores e menos repetições")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Tempo mínimo por rodada (s)")
+    parser.add_argument("--only", default="", help="Roda só casos cujo nome contém este texto")
+    parser.add_argument("--recorded", default=DB_FILE, help="kairos.db com snapshots gravados")
+    parser.add_argument("--recorded-limit", type=int, default=200)
+    parser.add_argument("--out", default="", help="JSON de saída (padrão: data/bench/bench_<rev>_<data>.json)")
+    parser.add_argument("--compare", default="", help="JSON anterior para apontar regressões")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Razão considerada regressão")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    row_sizes = ROW_SIZES[:3] if args.quick else ROW_SIZES
+    market_sizes = MARKET_SIZES[:2] if args.quick else MARKET_SIZES
+    repeat, min_time = (3, 0.05) if args.quick else (args.repeat, args.min_time)
+
+    recorded = recorded_inputs(args.recorded, args.recorded_limit)
+    print(f"[*] Entradas gravadas: {len(recorded)} snapshot(s) de {args.recorded}")
+
+    results = []
+    for name, params, fn in build_cases(rng, row_sizes, market_sizes, recorded):
+        if args.only and args.only not in name:
+            continue
+        r = dict(name=name, params=params, **measure(fn, min_time, repeat))
+        results.append(r)
+        print(f"   {_case_id(name, params):<58} {r['best_us']:>12.1f}µs  (mediana {r['median_us']:.1f})")
+
+    rev = _git_rev()
+    out = args.out or os.path.join(BENCH_DIR, f"bench_{rev or 'local'}_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": 1, "git_rev": rev, "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(), "machine": platform.machine(),
+            "seed": args.seed, "quick": args.quick, "results": results,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n[OK] {len(results)} casos → {out}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+llm_load.py — Carga Offline no KairosAnalyzer (v1.0)
+
+Dispara N análises sintéticas contra o provedor configurado (normalmente o
+src.sim.llm_server local) com concorrência controlada, exercitando fila,
+modo lote e failover dos provedores sem acesso à rede.
+
+Uso:
+  python -m src.sim.llm_server --port 8089 --error-rate 0.1 &
+  DEEPSEEK_BASE_URL=http://127.0.0.1:8089 AI_PROVIDER=deepseek \
+      python -m src.sim.llm_load --matches 200 --concurrency 20 --batch 6
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List
+
+from ..core.analyzer import KairosAnalyzer
+from ..config import AI_PROVIDER, GEMINI_API_KEY, DEEPSEEK_API_KEY
+
+
+def synthetic_snapshot(i: int, rng: random.Random) -> Dict:
+    """Snapshot no formato do dropping_flow com drops/fluxo aleatórios."""
+    is_live = rng.random() < 0.8
+    drops = []
+    for table, sel in rng.sample(
+        [("1X2", "Home"), ("1X2", "Away"), ("Total", "Over"), ("Handicap", "Handicap"), ("HT 1X2", "Draw")],
+        k=rng.randint(1, 4),
+    ):
+        open_odd = rng.uniform(1.5, 4.0)
+        pct = rng.uniform(5.0, 25.0)
+        drops.append({
+            "table": table, "selection": sel, "open_odd": open_odd,
+            "current_odd": open_odd * (1 - pct / 100), "drop_pct": pct,
+            "severity": "🟠 FORTE", "signals": rng.sample(["STRONG_DROP_RED2", "CRITICAL_DROP_RED3"], k=rng.randint(0, 1)),
+        })
+    drops.sort(key=lambda d: d["drop_pct"], reverse=True)
+    flow = [
+        {"selection": drops[0]["selection"], "change_eur": rng.uniform(100, 20000),
+         "time": f"{rng.randint(1, 90)}'", "score": "0-0", "odds": f"{rng.uniform(1.5, 4):.2f}",
+         "change_pct": f"-{rng.uniform(1, 15):.1f}%"}
+        for _ in range(rng.randint(0, 10))
+    ]
+    return {
+        "match_name": f"Stub Home {i} vs Stub Away {i}",
+        "live_score": "0-0",
+        "is_live": is_live,
+        "current_minute": rng.randint(1, 90) if is_live else 0,
+        "league": "Stub League",
+        "dropping_odds_drops": drops,
+        "primary_excapper_flow": flow,
+        "primary_excapper_market": "Match Odds",
+        "excapper_markets": {"Match Odds": {"flow": flow}},
+        "primary_anomaly": {"market": drops[0]["table"], "selection": drops[0]["selection"],
+                            "short_id": "p", "details": {}},
+        "all_anomalies": [],
+        "sokkerpro_live": None,
+        "sokkerpro_pre": None,
+        "smart_money_result": {"league_profile": {"tier": "MID"}, "signals": []},
+        "strategic_context": {"manipulation_labels": []},
+    }
+
+
+def _pct(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+async def run_load(matches: int, concurrency: int, batch: int, provider: str, seed: int = 7) -> Dict:
+    rng = random.Random(seed)
+    key = DEEPSEEK_API_KEY if provider == "deepseek" else GEMINI_API_KEY
+    analyzer = KairosAnalyzer(key or "stub-key", provider_type=provider)
+    snapshots = {str(i): synthetic_snapshot(i, rng) for i in range(matches)}
+    keys = list(snapshots)
+    groups = [keys[i:i + batch] for i in range(0, len(keys), max(batch, 1))]
+
+    sem = asyncio.Semaphore(concurrency)
+    latencies, verdicts = [], {}
+    failures = 0
+
+    async def _one(group: List[str]):
+        nonlocal failures
+        async with sem:
+            t0 = time.perf_counter()
+            raw = await analyzer.analyze_batch({k: snapshots[k] for k in group})
+            latencies.append(time.perf_counter() - t0)
+        for k in group:
+            try:
+                data = json.loads(raw.get(k, ""))
+                if "error" in data:
+                    raise ValueError(data["error"])
+                verdicts[data.get("verdict", "?")] = verdicts.get(data.get("verdict", "?"), 0) + 1
+            except (ValueError, TypeError):
+                failures += 1
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(_one(g) for g in groups))
+    elapsed = time.perf_counter() - t_start
+
+    return {
+        "provider":       provider,
+        "matches":        matches,
+        "requests":       len(groups),
+        "concurrency":    concurrency,
+        "batch":          batch,
+        "elapsed_s":      round(elapsed, 2),
+        "matches_per_s":  round(matches / elapsed, 2) if elapsed else 0,
+        "latency_p50_s":  round(_pct(latencies, 0.50), 3),
+        "latency_p95_s":  round(_pct(latencies, 0.95), 3),
+        "latency_p99_s":  round(_pct(latencies, 0.99), 3),
+        "failed_matches": failures,
+        "verdicts":       verdicts,
+    }
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Kairos — carga offline no analisador de IA")
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=1, help="Partidas por requisição (1 = sem lote)")
+    parser.add_argument("--provider", default=AI_PROVIDER, choices=["gemini", "deepseek", "claude"])
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args.matches, args.concurrency, args.batch, args.provider))
+    print(json.dumps(report, indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,227 @@
+"""
+llm_server.py — Servidor Stub de LLM para Testes Offline (v1.0)
+
+Substituto local compatível com:
+  - OpenAI / DeepSeek:  POST /chat/completions  (e /v1/chat/completions)
+  - Gemini (REST):      POST /v1beta/models/{model}:generateContent
+
+Responde com vereditos JSON enlatados, com distribuição de latência e taxa
+de erro configuráveis. Entende o modo lote do analyzer (PARTIDA [chave]) e
+devolve um array JSON com um veredito por match_key.
+
+Uso:
+  python -m src.sim.llm_server --port 8089 --latency lognormal --latency-ms 1800 --error-rate 0.05
+
+Depois aponte os provedores para ele:
+  DEEPSEEK_BASE_URL=http://127.0.0.1:8089
+  GEMINI_API_ENDPOINT=http://127.0.0.1:8089
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+
+DEFAULT_VERDICTS = [
+    # (peso, veredito) — a maioria das chamadas reais volta como NOISE
+    (70, {
+        "category": "#KAIROS_ANALYSIS", "verdict": "NOISE", "risk": "Alto", "confidence": 3,
+        "reasoning": "[STUB] Drop sem confirmação de fluxo; correção natural de mercado.",
+        "betting_tip": "N/A", "suggested_odd": "N/A", "stake_suggestion": "Mínimo",
+        "alert_headline": "[STUB] Movimento sem confirmação",
+    }),
+    (20, {
+        "category": "#KAIROS_ANALYSIS", "verdict": "SUSPICIOUS", "risk": "Médio", "confidence": 6,
+        "reasoning": "[STUB] Drop em múltiplas tabelas com fluxo parcial na mesma direção.",
+        "betting_tip": "BACK OVER 2.5", "suggested_odd": "Live", "stake_suggestion": "Normal",
+        "alert_headline": "[STUB] Fluxo suspeito em múltiplos mercados",
+    }),
+    (10, {
+        "category": "#KAIROS_ANALYSIS", "verdict": "SHARP_ACTION", "risk": "Baixo", "confidence": 8,
+        "reasoning": "[STUB] Volume anômalo confirmando drop forte (Red3).",
+        "betting_tip": "BACK Home", "suggested_odd": "1.80", "stake_suggestion": "Alto",
+        "alert_headline": "[STUB] Sharp action confirmada",
+    }),
+]
+
+BATCH_KEY_RE = re.compile(r"^#{2,5} PARTIDA \[([^\]]+)\]", re.M)   # Só os cabeçalhos das seções (o schema também cita "PARTIDA [..]")
+
+
+class StubLLM:
+    """Estado e comportamento do servidor (latência, erros, vereditos, métricas)."""
+
+    def __init__(
+        self,
+        latency: str = "lognormal",
+        latency_ms: float = 1500.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        error_codes: Optional[List[int]] = None,
+        verdicts: Optional[List] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency       = latency
+        self.latency_ms    = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate    = error_rate
+        self.error_codes   = error_codes or [429, 500, 503]
+        self.verdicts      = verdicts or DEFAULT_VERDICTS
+        self.rng           = random.Random(seed)
+        self.stats         = {"requests": 0, "errors": 0, "batch_requests": 0, "matches": 0, "in_flight": 0}
+
+    def _delay(self) -> float:
+        base = self.latency_ms / 1000.0
+        if self.latency == "fixed":
+            return base
+        if self.latency == "uniform":
+            return self.rng.uniform(0.5 * base, 1.5 * base)
+        # lognormal com mediana = latency_ms (cauda longa como APIs reais)
+        return base * math.exp(self.rng.gauss(0.0, self.latency_sigma))
+
+    def _pick_verdict(self) -> Dict:
+        total = sum(w for w, _ in self.verdicts)
+        r = self.rng.uniform(0, total)
+        for w, v in self.verdicts:
+            r -= w
+            if r <= 0:
+                return dict(v)
+        return dict(self.verdicts[-1][1])
+
+    def completion_text(self, prompt: str) -> str:
+        keys = BATCH_KEY_RE.findall(prompt)
+        if keys:
+            self.stats["batch_requests"] += 1
+            self.stats["matches"] += len(keys)
+            return json.dumps([dict(self._pick_verdict(), match_key=k) for k in keys], ensure_ascii=False)
+        self.stats["matches"] += 1
+        return json.dumps(self._pick_verdict(), ensure_ascii=False)
+
+    async def handle(self, prompt: str):
+        """Aplica latência/erro. Retorna (status, texto) — texto None em erro."""
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        try:
+            await asyncio.sleep(self._delay())
+            if self.rng.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return self.rng.choice(self.error_codes), None
+            return 200, self.completion_text(prompt)
+        finally:
+            self.stats["in_flight"] -= 1
+
+
+def _usage(prompt: str, text: str) -> Dict:
+    p, c = len(prompt) // 4, len(text) // 4
+    return {"prompt_tokens": p, "completion_tokens": c, "total_tokens": p + c}
+
+
+def build_app(stub: StubLLM) -> web.Application:
+    async def chat_completions(request: web.Request) -> web.Response:
+        body = await request.json()
+        messages = body.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "user")
+        status, text = await stub.handle(prompt)
+        if text is None:
+            return web.json_response({"error": {"message": "stub error", "code": status}}, status=status)
+        return web.json_response({
+            "id":      f"stub-{stub.stats['requests']}",
+            "object":  "chat.completion",
+            "created": int(time.time()),
+            "model":   body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": _usage(prompt, text),
+        })
+
+    async def gemini_generate(request: web.Request) -> web.Response:
+        body = await request.json()
+        prompt = "\n".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        status, text = await stub.handle(prompt)
+        if text is None:
+            return web.json_response(
+                {"error": {"code": status, "message": "stub error", "status": "UNAVAILABLE"}}, status=status
+            )
+        usage = _usage(prompt, text)
+        return web.json_response({
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount":     usage["prompt_tokens"],
+                "candidatesTokenCount": usage["completion_tokens"],
+                "totalTokenCount":      usage["total_tokens"],
+            },
+        })
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(stub.stats)
+
+    app = web.Application(client_max_size=16 * 1024 * 1024)
+    app.router.add_post("/chat/completions", chat_completions)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post(r"/v1beta/models/{model:[^:/]+}:generateContent", gemini_generate)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+async def start_server(stub: StubLLM, host: str = "127.0.0.1", port: int = 8089) -> web.AppRunner:
+    """Sobe o servidor dentro de um loop existente (usado pelos harnesses de carga)."""
+    runner = web.AppRunner(build_app(stub), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def _load_verdicts(path: str) -> List:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    return [(1, v) for v in data]
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Kairos — servidor stub de LLM (OpenAI/DeepSeek/Gemini)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=1500.0, help="Mediana da latência (ms)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Sigma do lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas com erro HTTP")
+    parser.add_argument("--error-codes", default="429,500,503")
+    parser.add_argument("--verdicts", help="Arquivo JSON com veredito(s) enlatado(s)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    stub = StubLLM(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        error_codes=[int(c) for c in args.error_codes.split(",") if c.strip()],
+        verdicts=_load_verdicts(args.verdicts) if args.verdicts else None,
+        seed=args.seed,
+    )
+    print(f"[*] Stub LLM em http://{args.host}:{args.port} "
+          f"(latência {args.latency} ~{args.latency_ms:.0f}ms, erro {args.error_rate:.0%})")
+    web.run_app(build_app(stub), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,295 @@
+"""
+loadtest.py — Teste de Carga Ponta a Ponta do dropping_flow (v1.0)
+
+Sobe os substitutos locais (src.sim.sites: DroppingOdds, Excapper, Telegram
++ src.sim.llm_server), roda `python -m src.main --mode dropping` apontado
+para eles com 50/200/1000 jogos ao vivo e mede, por nível:
+  - ciclo: duração da listagem e intervalo real entre revisitas de cada jogo
+  - cobertura: jogos visitados e capacidade estimada por ciclo de 90s
+  - latência drop visível → 1ª visita e → alerta recebido no "Telegram"
+  - CPU (% de um núcleo) e RSS (pico/médio) do bot + Chromium, via /proc
+  - métricas do próprio bot (GET /metrics: page loads, IA, estágios)
+
+O Chromium do Playwright precisa estar instalado. Cada nível usa um
+KAIROS_DATA_DIR temporário (o kairos.db real não é tocado).
+
+Uso:
+  python -m src.sim.loadtest                                  # 50, 200 e 1000 jogos, 300s cada
+  python -m src.sim.loadtest --matches 200 --duration 600 --workers 2
+  python -m src.sim.loadtest --page-budget 180                # com o orçamento de produção
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from .sites import SiteSim, start_sites
+from .llm_server import StubLLM, start_server
+from ..core.browser_pool import process_tree_rss_mb
+from ..config import BASE_DIR, DATA_DIR
+
+
+LOADTEST_DIR = os.path.join(DATA_DIR, "loadtest")
+HOST = "127.0.0.1"
+CYCLE_TARGET_SEC = 90
+
+
+def _free_ports(count: int) -> List[int]:
+    socks, ports = [], []
+    for _ in range(count):
+        s = socket.socket()
+        s.bind((HOST, 0))
+        socks.append(s)
+        ports.append(s.getsockname()[1])
+    for s in socks:
+        s.close()
+    return ports
+
+
+def _pct(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def _tree_cpu_seconds(root_pid: int) -> float:
+    """CPU (user+sys, incluindo filhos já encerrados) do processo e descendentes, via /proc."""
+    tick = os.sysconf("SC_CLK_TCK")
+    children: Dict[int, List[int]] = {}
+    times: Dict[int, float] = {}
+    for d in os.listdir("/proc"):
+        if not d.isdigit():
+            continue
+        try:
+            with open(f"/proc/{d}/stat", "rb") as f:
+                stat = f.read()
+            fields = stat[stat.rindex(b")") + 2:].split()
+        except (OSError, ValueError):
+            continue
+        pid = int(d)
+        children.setdefault(int(fields[1]), []).append(pid)
+        times[pid] = sum(int(x) for x in fields[11:15]) / tick
+
+    total, stack = 0.0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        total += times.get(pid, 0.0)
+    return total
+
+
+def _metric_values(text: str, name: str) -> Dict[str, float]:
+    """Linhas `name{rótulos} valor` do formato texto do Prometheus → {rótulos: valor}."""
+    out = {}
+    for line in text.splitlines():
+        if line.startswith(name + "{") or line.startswith(name + " "):
+            series, _, value = line.rpartition(" ")
+            try:
+                out[series[len(name):]] = float(value)
+            except ValueError:
+                continue
+    return out
+
+
+def _metrics_summary(text: str) -> Dict:
+    if not text:
+        return {}
+
+    def _mean(name: str) -> Dict[str, float]:
+        sums, counts = _metric_values(text, name + "_sum"), _metric_values(text, name + "_count")
+        return {k or "-": round(sums[k] / counts[k], 3) for k in sums if counts.get(k)}
+
+    return {
+        "page_loads":       sum(_metric_values(text, "kairos_page_loads_total").values()),
+        "page_load_mean_s": _mean("kairos_page_load_seconds"),
+        "listing_mean_s":   _mean("kairos_cycle_seconds"),
+        "visit_mean_s":     _mean("kairos_visit_seconds"),
+        "stage_wait_mean_s": _mean("kairos_stage_wait_seconds"),
+        "ai_calls":         sum(_metric_values(text, "kairos_ai_calls_total").values()),
+        "ai_mean_s":        _mean("kairos_ai_seconds"),
+        "telegram_sends":   sum(_metric_values(text, "kairos_telegram_sends_total").values()),
+    }
+
+
+async def _fetch_metrics(port: int) -> str:
+    from aiohttp import ClientSession, ClientTimeout
+    try:
+        async with ClientSession(timeout=ClientTimeout(total=5)) as session:
+            async with session.get(f"http://{HOST}:{port}/metrics") as resp:
+                return await resp.text()
+    except Exception as e:
+        print(f"[!] [LOAD] /metrics indisponível: {e}")
+        return ""
+
+
+# ── Um nível de carga ──────────────────────────────────────────────────────────
+async def run_level(matches: int, duration: float, workers: int = 1, page_budget: int = 0,
+                    llm_latency_ms: float = 1500.0, tick_sec: float = 15.0, drop_share: float = 0.25,
+                    sample_sec: float = 5.0, seed: int = 42, keep: bool = False) -> Dict:
+    do_port, exc_port, tg_port, llm_port, metrics_port = _free_ports(5)
+    sim = SiteSim(matches, seed=seed, tick_sec=tick_sec, drop_share=drop_share,
+                  drop_window=(20.0, max(30.0, duration * 0.6)), excapper_base=f"http://{HOST}:{exc_port}")
+    runners = await start_sites(sim, HOST, do_port, exc_port, tg_port)
+    stub = StubLLM(latency_ms=llm_latency_ms, seed=seed)
+    runners.append(await start_server(stub, HOST, llm_port))
+
+    data_dir = tempfile.mkdtemp(prefix=f"kairos_load_{matches}_")
+    env = dict(
+        os.environ,
+        PYTHONUNBUFFERED="1",
+        KAIROS_DATA_DIR=data_dir,
+        DROPPING_ODDS_BASE_URL=f"http://{HOST}:{do_port}",
+        EXCAPPER_BASE_URL=f"http://{HOST}:{exc_port}",
+        TELEGRAM_API_URL=f"http://{HOST}:{tg_port}",
+        TELEGRAM_TOKEN="load-test",
+        TELEGRAM_CHAT_ID="1",
+        AI_PROVIDER="deepseek",
+        DEEPSEEK_BASE_URL=f"http://{HOST}:{llm_port}",
+        GEMINI_API_KEY="load-test",
+        DEEPSEEK_API_KEY="load-test",
+        METRICS_PORT=str(metrics_port),
+        # Sem orçamento (0) mede o limite do pipeline, não o limite de cortesia com o site
+        SCHED_PAGE_BUDGET_PER_MIN=str(page_budget or 1_000_000),
+    )
+    log_path = os.path.join(data_dir, "bot.log")
+    print(f"\n[*] [LOAD] {matches} jogos | {duration:.0f}s | workers {workers} | log {log_path}")
+
+    samples = []
+    metrics_text = ""
+    with open(log_path, "wb") as log:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "src.main", "--mode", "dropping", "--workers", str(workers),
+            cwd=BASE_DIR, env=env, stdout=log, stderr=asyncio.subprocess.STDOUT,
+        )
+        started = time.monotonic()
+        try:
+            while time.monotonic() - started < duration and proc.returncode is None:
+                try:
+                    await asyncio.wait_for(proc.wait(), timeout=sample_sec)
+                except asyncio.TimeoutError:
+                    pass
+                if proc.returncode is None:
+                    samples.append((time.monotonic(), _tree_cpu_seconds(proc.pid), process_tree_rss_mb(proc.pid)))
+            if proc.returncode is None:
+                metrics_text = await _fetch_metrics(metrics_port)
+        finally:
+            if proc.returncode is None:
+                proc.send_signal(signal.SIGINT)
+                try:
+                    await asyncio.wait_for(proc.wait(), timeout=30)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+            for runner in runners:
+                await runner.cleanup()
+
+    elapsed = time.monotonic() - started
+    if proc.returncode not in (0, -signal.SIGINT) and elapsed < duration:
+        print(f"[!] [LOAD] O bot saiu antes do fim (código {proc.returncode}). Veja {log_path}")
+
+    cpu_pct, rss = [], [s[2] for s in samples]
+    for (t0, c0, _), (t1, c1, _) in zip(samples, samples[1:]):
+        if t1 > t0:
+            cpu_pct.append((c1 - c0) / (t1 - t0) * 100)
+    span = samples[-1][0] - samples[0][0] if len(samples) > 1 else 0.0
+    revisits = sim.revisit_intervals()
+    latency = sim.alert_latencies()
+    visits = sum(len(v) for v in sim.visits.values())
+
+    report = {
+        "matches":          matches,
+        "duration_s":       round(elapsed, 1),
+        "workers":          workers,
+        "page_budget":      page_budget or None,
+        "exit_code":        proc.returncode,
+        "games_visited":    len(sim.visits),
+        "visits":           visits,
+        # Jogos que o pipeline consegue visitar num ciclo de 90s, no ritmo medido
+        "capacity_per_90s": round(visits / elapsed * CYCLE_TARGET_SEC, 1) if elapsed else 0.0,
+        "revisit_p50_s":    round(_pct(revisits, 0.50), 1),
+        "revisit_p95_s":    round(_pct(revisits, 0.95), 1),
+        "revisit_max_s":    round(max(revisits), 1) if revisits else 0.0,
+        "within_90s":       bool(revisits) and _pct(revisits, 0.95) <= CYCLE_TARGET_SEC
+                            and len(sim.visits) == matches,
+        "drops":            latency["drops"],
+        "drops_detected":   len(latency["detect"]),
+        "drops_alerted":    len(latency["alert"]),
+        "detect_p50_s":     round(_pct(latency["detect"], 0.50), 1),
+        "detect_p95_s":     round(_pct(latency["detect"], 0.95), 1),
+        "alert_p50_s":      round(_pct(latency["alert"], 0.50), 1),
+        "alert_p95_s":      round(_pct(latency["alert"], 0.95), 1),
+        "telegram_msgs":    len(sim.telegram),
+        "cpu_mean_pct":     round(sum(cpu_pct) / len(cpu_pct), 1) if cpu_pct else 0.0,
+        "cpu_peak_pct":     round(max(cpu_pct), 1) if cpu_pct else 0.0,
+        "cpu_total_s":      round(samples[-1][1] - samples[0][1], 1) if span else 0.0,
+        "rss_mean_mb":      round(sum(rss) / len(rss), 1) if rss else 0.0,
+        "rss_peak_mb":      round(max(rss), 1) if rss else 0.0,
+        "site_hits":        dict(sim.hits),
+        "llm":              dict(stub.stats),
+        "bot_metrics":      _metrics_summary(metrics_text),
+        "data_dir":         data_dir if keep else None,
+    }
+    if not keep:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return report
+
+
+def _print_table(reports: List[Dict]):
+    print(f"\n{'jogos':>6} {'visit.':>6} {'cap/90s':>8} {'revis.p50':>9} {'revis.p95':>9} "
+          f"{'alerta p50':>10} {'alerta p95':>10} {'drops':>9} {'CPU%':>6} {'RSS MB':>7}  90s?")
+    for r in reports:
+        print(f"{r['matches']:>6} {r['games_visited']:>6} {r['capacity_per_90s']:>8} {r['revisit_p50_s']:>9} "
+              f"{r['revisit_p95_s']:>9} {r['alert_p50_s']:>10} {r['alert_p95_s']:>10} "
+              f"{str(r['drops_alerted']) + '/' + str(r['drops']):>9} {r['cpu_mean_pct']:>6} {r['rss_peak_mb']:>7}  "
+              f"{'sim' if r['within_90s'] else 'não'}")
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Kairos — teste de carga ponta a ponta com sites substitutos")
+    parser.add_argument("--matches", type=int, nargs="+", default=[50, 200, 1000], help="Níveis de carga")
+    parser.add_argument("--duration", type=float, default=300.0, help="Segundos por nível")
+    parser.add_argument("--workers", type=int, default=1, help="--workers repassado ao bot")
+    parser.add_argument("--page-budget", type=int, default=0,
+                        help="SCHED_PAGE_BUDGET_PER_MIN do bot (0 = sem limite)")
+    parser.add_argument("--llm-latency-ms", type=float, default=1500.0)
+    parser.add_argument("--tick-sec", type=float, default=15.0, help="Nova linha nas tabelas a cada N segundos")
+    parser.add_argument("--drop-share", type=float, default=0.25, help="Fração dos jogos que sofrem drop")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Mantém o DATA_DIR temporário (log do bot, kairos.db)")
+    parser.add_argument("--out", help="Arquivo JSON do relatório (default: data/loadtest/loadtest_<data>.json)")
+    args = parser.parse_args()
+
+    async def _run_all() -> List[Dict]:
+        reports = []
+        for n in args.matches:
+            report = await run_level(n, args.duration, args.workers, args.page_budget, args.llm_latency_ms,
+                                     args.tick_sec, args.drop_share, seed=args.seed, keep=args.keep)
+            print(json.dumps(report, indent=4, ensure_ascii=False))
+            reports.append(report)
+        return reports
+
+    try:
+        reports = asyncio.run(_run_all())
+    except KeyboardInterrupt:
+        print("\n[!] Teste de carga interrompido.")
+        return
+
+    _print_table(reports)
+    out = args.out or os.path.join(LOADTEST_DIR, f"loadtest_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "levels": reports}, f, indent=2, ensure_ascii=False)
+    print(f"\n[OK] [LOAD] Relatório em {out}")
+
+
+if __name__ == "__main__":
+    _cli()
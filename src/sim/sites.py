@@ -0,0 +1,330 @@
+"""
+sites.py — Sites Substitutos para o Teste de Carga (v1.0)
+
+Servidores aiohttp locais que imitam o DOM lido pelos scrapers:
+  - DroppingOdds:  /index.php?view=live, /event.php?id=X e /event.php?id=X&t=<aba>
+                   N jogos ao vivo cujas tabelas ganham uma linha a cada `tick_sec`
+  - Excapper:      /?action=game&id=X  com abas de mercado e fluxo crescente
+  - Telegram:      /bot<token>/<método>  aceita tudo e registra a hora de chegada
+
+Uma fração dos jogos (`drop_share`) sofre um drop forte num instante sorteado;
+a hora em que o drop fica visível na tabela é guardada para medir a latência
+drop → alerta. As visitas à página base de cada jogo também são registradas
+(intervalo efetivo entre revisitas).
+
+Uso (manual, com o bot apontado para os substitutos):
+  python -m src.sim.sites --matches 200 --do-port 8501 --exc-port 8502 --tg-port 8503
+  DROPPING_ODDS_BASE_URL=http://127.0.0.1:8501 EXCAPPER_BASE_URL=http://127.0.0.1:8502 \\
+  TELEGRAM_API_URL=http://127.0.0.1:8503 python -m src.main --mode dropping
+"""
+
+import argparse
+import asyncio
+import html
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from .bench import TABLE_HEADERS, LEAGUES
+from ..scrapers.dropping_odds import TABLE_TABS
+
+
+TAB_BY_PARAM = {param: name for name, param in TABLE_TABS.items()}
+EXCAPPER_MARKETS = ["Match Odds", "Over/Under 2.5 Goals", "Both teams to Score?",
+                    "First Half Goals 1.5", "Asian Handicap", "Correct Score"]
+MARKET_SELECTIONS = {
+    "Match Odds": ["Home", "Draw", "Away"], "Over/Under 2.5 Goals": ["Over 2.5", "Under 2.5"],
+    "Both teams to Score?": ["Yes", "No"], "First Half Goals 1.5": ["Over 1.5", "Under 1.5"],
+    "Asian Handicap": ["Home -0.5", "Away +0.5"], "Correct Score": ["1 - 0", "1 - 1", "0 - 1"],
+}
+TEAM_RE = re.compile(r"Load Home (\d+)")
+
+
+# ── Mundo simulado ─────────────────────────────────────────────────────────────
+class SimGame:
+    def __init__(self, gid: int, rng: random.Random, started: float, drop_at: Optional[float], max_rows: int):
+        self.gid       = gid
+        self.home      = f"Load Home {gid}"
+        self.away      = f"Load Away {gid}"
+        self.league    = rng.choice(LEAGUES)
+        self.minute0   = rng.randint(1, 80)
+        self.score     = f"{rng.randint(0, 2)}-{rng.randint(0, 2)}"
+        self.rng       = rng
+        self.max_rows  = max_rows
+        self.ticks     = 0
+        self.started   = started
+        self.drop_at   = drop_at          # Instante planejado do drop (None = jogo sem drop)
+        self.drop_seen: Optional[float] = None   # Primeira linha da tabela já com o drop
+        self.drop_size = rng.uniform(8.0, 20.0)
+        # aba → [odds atuais]; aba → linhas (mais recente primeiro, abertura no fim)
+        self.odds   = {t: [rng.uniform(1.6, 4.5) for _ in range(3)] for t in TABLE_TABS}
+        self.opens  = {t: list(v) for t, v in self.odds.items()}
+        self.rows: Dict[str, List[Dict]] = {t: [] for t in TABLE_TABS}
+        self.flows: Dict[str, List[Dict]] = {m: [] for m in EXCAPPER_MARKETS}
+        self._append_rows(started)
+
+    @property
+    def teams(self) -> str:
+        return f"{self.home} vs {self.away}"
+
+    def minute(self, now: float) -> int:
+        return (self.minute0 + int((now - self.started) / 60)) % 90 + 1
+
+    def advance(self, now: float, tick_sec: float):
+        due = int((now - self.started) / tick_sec)
+        while self.ticks < due:
+            self.ticks += 1
+            self._append_rows(self.started + self.ticks * tick_sec)
+
+    def _trim(self, rows: List):
+        # A abertura (última linha) fica; as intermediárias mais antigas saem
+        if len(rows) > self.max_rows:
+            del rows[-2]
+
+    def _append_rows(self, at: float):
+        rng, minute = self.rng, self.minute(at)
+        dropping = self.drop_at is not None and at >= self.drop_at and self.drop_seen is None
+        for table, odds in self.odds.items():
+            for i in range(len(odds)):
+                odds[i] *= rng.uniform(0.998, 1.002)
+            if dropping and table in ("1X2", "Total"):
+                odds[0] = self.opens[table][0] * (1 - self.drop_size / 100)
+            pcts = [(o_open - o) / o_open * 100 for o_open, o in zip(self.opens[table], odds)]
+            rows = self.rows[table]
+            rows.insert(0, {"minute": minute, "odds": list(odds), "pcts": pcts,
+                            "red": "Red3" if pcts[0] >= 15 else "Red2" if pcts[0] >= 10 else ""})
+            self._trim(rows)
+        if dropping:
+            self.drop_seen = at
+
+        heavy = self.drop_seen is not None and at - self.drop_seen < 120
+        for market, flow in self.flows.items():
+            if rng.random() > 0.5 and not (heavy and market == "Match Odds"):
+                continue
+            sel = MARKET_SELECTIONS[market]
+            flow.insert(0, {
+                "selection": sel[0] if heavy and market == "Match Odds" else rng.choice(sel),
+                "change_eur": rng.lognormvariate(9.5, 0.4) if heavy else rng.lognormvariate(6.0, 1.0),
+                "minute": minute, "odds": rng.uniform(1.3, 5.0), "pct": rng.uniform(0, 12),
+            })
+            self._trim(flow)
+
+
+class SiteSim:
+    """Estado compartilhado pelos três substitutos."""
+
+    def __init__(self, n_matches: int, seed: int = 42, tick_sec: float = 15.0, drop_share: float = 0.25,
+                 drop_window: tuple = (20.0, 240.0), max_rows: int = 40, excapper_base: str = ""):
+        self.rng      = random.Random(seed)
+        self.tick_sec = tick_sec
+        self.excapper_base = excapper_base.rstrip("/") + "/"
+        now = time.time()
+        self.games: Dict[str, SimGame] = {}
+        for i in range(n_matches):
+            gid = 700000 + i
+            drop_at = now + self.rng.uniform(*drop_window) if self.rng.random() < drop_share else None
+            self.games[str(gid)] = SimGame(gid, random.Random(seed * 100003 + gid), now, drop_at, max_rows)
+        self.visits: Dict[str, List[float]] = {}
+        self.telegram: List[Dict] = []
+        self.hits = {"live": 0, "event": 0, "tab": 0, "excapper": 0, "telegram": 0}
+
+    def game(self, gid: str) -> Optional[SimGame]:
+        game = self.games.get(gid)
+        if game:
+            game.advance(time.time(), self.tick_sec)
+        return game
+
+    # ── Relatório ──────────────────────────────────────────────────────────────
+    def revisit_intervals(self) -> List[float]:
+        out = []
+        for times in self.visits.values():
+            out.extend(b - a for a, b in zip(times, times[1:]))
+        return out
+
+    def alert_latencies(self) -> Dict:
+        """Latências drop visível → 1ª visita depois dele e → 1º alerta do jogo no Telegram."""
+        alerts_by_game: Dict[str, List[float]] = {}
+        for msg in self.telegram:
+            m = TEAM_RE.search(msg["text"])
+            if m:
+                alerts_by_game.setdefault(m.group(1), []).append(msg["at"])
+        detect, alert = [], []
+        for gid, game in self.games.items():
+            if game.drop_seen is None:
+                continue
+            visit = next((t for t in self.visits.get(gid, []) if t >= game.drop_seen), None)
+            if visit is not None:
+                detect.append(visit - game.drop_seen)
+            sent = next((t for t in alerts_by_game.get(gid, []) if t >= game.drop_seen), None)
+            if sent is not None:
+                alert.append(sent - game.drop_seen)
+        return {"detect": detect, "alert": alert,
+                "drops": sum(1 for g in self.games.values() if g.drop_seen is not None),
+                "alerted_games": len(alerts_by_game)}
+
+
+def _page(body: str) -> web.Response:
+    return web.Response(text=f"<!DOCTYPE html><html><body>{body}</body></html>", content_type="text/html")
+
+
+# ── DroppingOdds ───────────────────────────────────────────────────────────────
+def build_dropping_odds_app(sim: SiteSim) -> web.Application:
+    async def index(request: web.Request) -> web.Response:
+        sim.hits["live"] += 1
+        now = time.time()
+        rows = []
+        for gid in sim.games:
+            game = sim.game(gid)
+            rows.append(
+                f'<tr class="a_link" game_id="{gid}"><td>{game.minute(now)}\'</td>'
+                f"<td>{html.escape(game.league)}</td>"
+                f'<td><a href="/event.php?id={gid}">{game.teams}</a></td><td>{game.score}</td></tr>'
+            )
+        return _page(f"<table>{''.join(rows)}</table>")
+
+    async def event(request: web.Request) -> web.Response:
+        gid, tab = request.query.get("id", ""), request.query.get("t")
+        game = sim.game(gid)
+        if game is None:
+            return web.Response(status=404, text="not found")
+        if not tab:
+            sim.hits["event"] += 1
+            sim.visits.setdefault(gid, []).append(time.time())
+            return _page(f"<h1>{game.teams}</h1>"
+                         f'<a href="{sim.excapper_base}?action=game&id={gid}">Excapper</a>')
+
+        sim.hits["tab"] += 1
+        table = TAB_BY_PARAM.get(tab)
+        if table is None:
+            return _page("")
+        headers = TABLE_HEADERS[table]
+        body = []
+        for row in game.rows[table]:
+            # Colunas de %: primeira e última seleção (Home/Away, Over)
+            odds, pcts = iter(row["odds"]), iter((row["pcts"][0], row["pcts"][-1]))
+            cells = []
+            for h in headers:
+                hl = h.lower()
+                if hl == "date":
+                    cells.append("<td>19.10</td>")
+                elif hl == "time":
+                    cells.append(f"<td>{row['minute']}'</td>")
+                elif hl == "score":
+                    cells.append(f"<td>{game.score}</td>")
+                elif "%" in hl or hl in ("drop", "sharpness"):
+                    pct = next(pcts, 0.0)
+                    cls = f' class="{row["red"]}"' if row["red"] else ""
+                    cells.append(f"<td{cls}>{-pct:.1f}%</td>")
+                elif hl in ("penalty", "red"):
+                    cells.append("<td></td>")
+                elif hl in ("total", "handicap"):
+                    cells.append("<td>2.5</td>" if hl == "total" else "<td>-0.5</td>")
+                else:
+                    cells.append(f"<td>{next(odds, 2.0):.2f}</td>")
+            body.append(f"<tr>{''.join(cells)}</tr>")
+        head = "".join(f"<th>{h}</th>" for h in headers)
+        return _page(f'<div class="tablediv"><table><thead><tr>{head}</tr></thead>'
+                     f"<tbody>{''.join(body)}</tbody></table></div>")
+
+    app = web.Application()
+    app.router.add_get("/index.php", index)
+    app.router.add_get("/event.php", event)
+    return app
+
+
+# ── Excapper ───────────────────────────────────────────────────────────────────
+def build_excapper_app(sim: SiteSim) -> web.Application:
+    async def game_page(request: web.Request) -> web.Response:
+        if request.query.get("action") != "game":
+            return _page("<div id='live'></div>")
+        sim.hits["excapper"] += 1
+        gid = request.query.get("id", "")
+        game = sim.game(gid)
+        if game is None:
+            return web.Response(status=404, text="not found")
+        tabs, panes = [], []
+        for i, (market, flow) in enumerate(game.flows.items()):
+            bf_id = f"{gid}{i:02d}"
+            tabs.append(f'<a class="tab" data-tab="tab_content_{bf_id}">{html.escape(market)}</a>')
+            rows = ["<tr>" + "<th></th>" * 9 + "</tr>"]
+            for r in flow:
+                rows.append(
+                    f"<tr><td>19.10</td><td>{html.escape(market)}</td><td>{html.escape(r['selection'])}</td>"
+                    f"<td>Back</td><td>{r['change_eur']:,.0f}€</td><td>{r['minute']}'</td><td>{game.score}</td>"
+                    f"<td>{r['odds']:.2f}</td><td>-{r['pct']:.1f}%</td></tr>"
+                )
+            panes.append(f'<div id="tab_content_{bf_id}"><table>{"".join(rows)}</table></div>')
+        return _page("".join(tabs) + "".join(panes))
+
+    app = web.Application()
+    app.router.add_get("/", game_page)
+    return app
+
+
+# ── Telegram ───────────────────────────────────────────────────────────────────
+def build_telegram_app(sim: SiteSim) -> web.Application:
+    async def bot_method(request: web.Request) -> web.Response:
+        sim.hits["telegram"] += 1
+        try:
+            payload = await request.json()
+        except Exception:
+            payload = dict(await request.post())
+        sim.telegram.append({"at": time.time(), "method": request.match_info["method"],
+                             "chat_id": payload.get("chat_id"), "text": str(payload.get("text", ""))})
+        return web.json_response({"ok": True, "result": {"message_id": len(sim.telegram)}})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", bot_method)
+    return app
+
+
+async def start_sites(sim: SiteSim, host: str = "127.0.0.1", do_port: int = 8501,
+                      exc_port: int = 8502, tg_port: int = 8503) -> List[web.AppRunner]:
+    runners = []
+    for app, port in ((build_dropping_odds_app(sim), do_port), (build_excapper_app(sim), exc_port),
+                      (build_telegram_app(sim), tg_port)):
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        runners.append(runner)
+    return runners
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Substitutos locais de DroppingOdds/Excapper/Telegram")
+    parser.add_argument("--matches", type=int, default=200)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--do-port", type=int, default=8501)
+    parser.add_argument("--exc-port", type=int, default=8502)
+    parser.add_argument("--tg-port", type=int, default=8503)
+    parser.add_argument("--tick-sec", type=float, default=15.0, help="Nova linha nas tabelas a cada N segundos")
+    parser.add_argument("--drop-share", type=float, default=0.25, help="Fração dos jogos que sofrem drop")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sim = SiteSim(args.matches, seed=args.seed, tick_sec=args.tick_sec, drop_share=args.drop_share,
+                  excapper_base=f"http://{args.host}:{args.exc_port}")
+
+    async def _serve():
+        runners = await start_sites(sim, args.host, args.do_port, args.exc_port, args.tg_port)
+        print(f"[*] [SITES] {args.matches} jogos | DO :{args.do_port} | Excapper :{args.exc_port} | "
+              f"Telegram :{args.tg_port}")
+        try:
+            while True:
+                await asyncio.sleep(30)
+                print(f"[.] [SITES] {sim.hits}")
+        finally:
+            for runner in runners:
+                await runner.cleanup()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    _cli()